@@ -0,0 +1,347 @@
+import re
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from fiat_toolbox import FiatColumns
+from fiat_toolbox.utils import extract_variables, matches_pattern
+
+from flood_adapt.adapter.fiat_adapter import FiatAdapter
+from flood_adapt.config.impacts import FloodmapType
+from flood_adapt.misc.log import FloodAdaptLogging
+from flood_adapt.objects.events.events import Mode
+from flood_adapt.objects.forcing import unit_system as us
+from flood_adapt.objects.scenarios.scenarios import Scenario
+
+logger = FloodAdaptLogging.getLogger("DamageEngine")
+
+# Objects with an inundation depth above the ground of at most this value are dry, like in Delft-FIAT
+DRY_DEPTH_THRESHOLD = 0.0001
+
+
+class DamageEngineAdapter(FiatAdapter):
+    """
+    ImpactAdapter that calculates the damages of a Delft-FIAT model in-process with NumPy.
+
+    The projection and impact measures are applied to the exposure like `FiatAdapter` does, but instead of writing
+    the model and running the Delft-FIAT executable, the depth-damage functions are evaluated for all objects at
+    once with the hazard values from `FiatAdapter.get_hazard_samples`. The resulting table has the columns of the
+    Delft-FIAT output, so the postprocessing of `FiatAdapter` is used unchanged.
+
+    This is meant for fast screening runs. Compared to Delft-FIAT, objects with the 'area' extraction method use
+    the mean over their wet pixels without a reduction factor for the dry part of the area. The outputs are therefore
+    recorded with a different `impact_engine`, so they are never reused by a delta run of `FiatAdapter`.
+    """
+
+    impact_engine = "Damage engine (screening)"
+
+    def preprocess(self, scenario: Scenario) -> None:
+        """
+        Add the projection and impact measures of a scenario to the exposure of the model.
+
+        Parameters
+        ----------
+        scenario : Scenario
+            The scenario to preprocess.
+        """
+        logger.info("Pre-processing the exposure for the damage engine")
+        self._remove_impact_record(scenario)
+        self.add_projection_and_measures(scenario)
+
+    def run(self, scenario: Scenario) -> None:
+        """
+        Calculate the impacts of a scenario and create all impact outputs.
+
+        Parameters
+        ----------
+        scenario : Scenario
+            The scenario to calculate the impacts of.
+        """
+        self.preprocess(scenario)
+        self.outputs = {
+            "path": self.database.get_impacts_path(scenario_name=scenario.name),
+            "table": self.calculate_impacts(scenario),
+        }
+        self.postprocess(scenario)
+
+    def calculate_impacts(self, scenario: Scenario) -> pd.DataFrame:
+        """
+        Calculate the damages of all objects in the exposure of the model for the hazard of a scenario.
+
+        Parameters
+        ----------
+        scenario : Scenario
+            The scenario to calculate the damages for, its hazard needs to be run.
+
+        Returns
+        -------
+        pd.DataFrame
+            The exposure with the inundation depths and damages, with the Delft-FIAT column names.
+        """
+        floodmap = self.database.get_floodmap(scenario.name)
+        samples = self.get_hazard_samples(floodmap)
+
+        exposure_db = self.model.exposure.exposure_db
+        object_ids = exposure_db[self.fiat_columns.object_id]
+        if samples.index.dtype == object:
+            object_ids = object_ids.astype(str)
+        conversion_factor = us.UnitfulLength(
+            value=1.0, units=us.UnitTypesLength.meters
+        ).convert(self.model.exposure.unit)
+        hazard = samples.reindex(object_ids.to_numpy()).to_numpy() * conversion_factor
+
+        return_periods = None
+        if floodmap.mode == Mode.risk:
+            return_periods = [
+                int(re.search(r"RP_(\d+)", column).group(1))
+                for column in samples.columns
+            ]
+
+        vulnerability = self.model.vulnerability
+        logger.info(f"Calculating damages of {len(exposure_db)} objects")
+        return calculate_damages(
+            exposure_db=exposure_db,
+            hazard=hazard,
+            vulnerability_depths=np.asarray(vulnerability.hazard_values, dtype=float),
+            vulnerability_functions={
+                name: np.asarray(fractions, dtype=float)
+                for name, fractions in vulnerability.functions.items()
+            },
+            columns=self.fiat_columns,
+            elevation_reference="datum"
+            if floodmap.map_type == FloodmapType.water_level
+            else "dem",
+            return_periods=return_periods,
+            decimals=int(self.model.get_config("vulnerability.round", fallback=2)),
+        )
+
+    def fiat_completed(self) -> bool:
+        """Check if the damages have been calculated."""
+        return getattr(self, "outputs", None) is not None
+
+    def delete_model(self):
+        """Do nothing, the damage engine does not write a simulation folder."""
+        pass
+
+    def save_roads(self, output_path: Path, owner: Optional[str] = None):
+        """
+        Save the impacts on roads to a spatial file.
+
+        Parameters
+        ----------
+        output_path : Path
+            The path where the output spatial file will be saved.
+        owner : str, optional
+            Name of the scenario the output belongs to, see `GeometryStore.write`.
+        """
+        logger.info("Calculating road impacts")
+        exposure = self.model.exposure
+        roads = exposure.exposure_geoms[
+            exposure.geom_names.index(Path(self.config.roads_file_name).stem)
+        ]
+        roads = roads.rename(
+            columns={self.fiat_columns.object_id: self.impact_columns.object_id}
+        )
+        columns = [
+            name
+            for name in self.outputs["table"].columns
+            if self.impact_columns.aggregation_label in name
+            or self.impact_columns.inundation_depth in name
+        ]
+        roads = roads[[self.impact_columns.object_id, "geometry"]].merge(
+            self.outputs["table"][
+                [self.impact_columns.object_id, self.impact_columns.primary_object_type]
+                + columns
+            ],
+            on=self.impact_columns.object_id,
+        )
+        self.geometry_store.write(roads, output_path, owner=owner)
+
+
+def calculate_damages(
+    exposure_db: pd.DataFrame,
+    hazard: np.ndarray,
+    vulnerability_depths: np.ndarray,
+    vulnerability_functions: dict[str, np.ndarray],
+    columns: FiatColumns,
+    elevation_reference: str = "dem",
+    return_periods: Optional[list[int]] = None,
+    decimals: int = 2,
+) -> pd.DataFrame:
+    """
+    Calculate the damages of exposure objects with the Delft-FIAT depth-damage method.
+
+    The inundation depth of an object is the hazard value minus its ground elevation (for a hazard relative to a
+    datum) and minus its ground floor height. Objects with a hazard value at most 0.1 mm above the ground are dry.
+    The damage per damage type is the fraction of the depth-damage function at the inundation depth, rounded to
+    `decimals` and clipped to the range of the function, times the maximum potential damage.
+
+    Parameters
+    ----------
+    exposure_db : pd.DataFrame
+        The exposure, with the Delft-FIAT columns.
+    hazard : np.ndarray
+        The hazard value of every object in the exposure in the units of the exposure, with shape
+        (objects, return periods) in risk mode or (objects,) or (objects, 1) for an event. NaN where dry.
+    vulnerability_depths : np.ndarray
+        The (ascending) inundation depths of the depth-damage functions.
+    vulnerability_functions : dict[str, np.ndarray]
+        The damage fractions of every depth-damage function at `vulnerability_depths`.
+    columns : FiatColumns
+        The column names of the exposure and output.
+    elevation_reference : str, optional
+        'datum' if the hazard is a water level, 'dem' if it is a water depth. Defaults to 'dem'.
+    return_periods : Optional[list[int]], optional
+        The return periods of the columns of `hazard` in risk mode. Defaults to None for an event.
+    decimals : int, optional
+        Number of decimals the inundation depth is rounded to when evaluating the depth-damage functions.
+        Defaults to 2.
+
+    Returns
+    -------
+    pd.DataFrame
+        The exposure with the inundation depth, reduction factor and damage columns (per return period in risk mode)
+        and, in risk mode, the expected annual damage.
+
+    Raises
+    ------
+    ValueError
+        If the exposure refers to a depth-damage function that is not in `vulnerability_functions`.
+    """
+    hazard = np.asarray(hazard, dtype=float).reshape(len(exposure_db), -1)
+    ground_floor_height = exposure_db[columns.ground_floor_height].to_numpy(float)
+    ground_elevation = 0.0
+    if elevation_reference == "datum" and columns.ground_elevation in exposure_db:
+        ground_elevation = np.nan_to_num(
+            exposure_db[columns.ground_elevation].to_numpy(float), nan=0.0
+        )
+    damage_names = [
+        extract_variables(col, columns.damage_function)["name"]
+        for col in exposure_db.columns
+        if matches_pattern(col, columns.damage_function)
+    ]
+
+    output_columns = {}
+    total_damages = []
+    for i, rp in enumerate(return_periods or [None]):
+        depth = hazard[:, i] - ground_elevation
+        with np.errstate(invalid="ignore"):
+            depth = np.where(
+                depth > DRY_DEPTH_THRESHOLD, depth - ground_floor_height, np.nan
+            )
+        reduction_factor = np.where(np.isnan(depth), np.nan, 1.0)
+
+        total_damage = np.zeros(len(exposure_db))
+        damages = {}
+        for name in damage_names:
+            damage = _calculate_damage(
+                depth=depth,
+                functions=exposure_db[
+                    columns.damage_function.format(name=name)
+                ].to_numpy(),
+                max_damage=exposure_db[
+                    columns.max_potential_damage.format(name=name)
+                ].to_numpy(float),
+                vulnerability_depths=vulnerability_depths,
+                vulnerability_functions=vulnerability_functions,
+                decimals=decimals,
+            )
+            damages[name] = damage
+            total_damage += np.nan_to_num(damage)
+        total_damages.append(total_damage)
+
+        if rp is None:
+            output_columns[columns.inundation_depth] = depth
+            output_columns[columns.reduction_factor] = reduction_factor
+            for name, damage in damages.items():
+                output_columns[columns.damage.format(name=name)] = damage
+            output_columns[columns.total_damage] = total_damage
+        else:
+            output_columns[columns.inundation_depth_rp.format(years=rp)] = depth
+            output_columns[columns.reduction_factor_rp.format(years=rp)] = (
+                reduction_factor
+            )
+            for name, damage in damages.items():
+                output_columns[columns.damage_rp.format(name=name, years=rp)] = damage
+            output_columns[columns.total_damage_rp.format(years=rp)] = total_damage
+
+    if return_periods:
+        output_columns[columns.risk_ead] = np.column_stack(
+            total_damages
+        ) @ risk_coefficients(return_periods)
+
+    return pd.concat(
+        [
+            exposure_db.reset_index(drop=True),
+            pd.DataFrame(output_columns, index=pd.RangeIndex(len(exposure_db))),
+        ],
+        axis=1,
+    )
+
+
+def _calculate_damage(
+    depth: np.ndarray,
+    functions: np.ndarray,
+    max_damage: np.ndarray,
+    vulnerability_depths: np.ndarray,
+    vulnerability_functions: dict[str, np.ndarray],
+    decimals: int,
+) -> np.ndarray:
+    """Calculate the damage of a single damage type, NaN for dry objects and objects without a damage function."""
+    wet = ~np.isnan(depth)
+    lookup_depth = np.round(
+        np.clip(depth, vulnerability_depths[0], vulnerability_depths[-1]), decimals
+    )
+    fractions = np.full(depth.shape, np.nan)
+    # evaluate every depth-damage function once for all objects that use it
+    for function in pd.unique(functions[wet & pd.notna(functions)]):
+        if function not in vulnerability_functions:
+            raise ValueError(
+                f"Depth-damage function '{function}' of the exposure is not in the vulnerability curves."
+            )
+        rows = wet & (functions == function)
+        fractions[rows] = np.interp(
+            lookup_depth[rows],
+            vulnerability_depths,
+            vulnerability_functions[function],
+        )
+    return fractions * max_damage
+
+
+def risk_coefficients(return_periods: list[int]) -> np.ndarray:
+    """
+    Get the coefficients to calculate the expected annual damage from the damages per return period.
+
+    The damage is interpolated linearly in the logarithm of the exceedance frequency between return periods,
+    and taken constant beyond the largest return period, like in Delft-FIAT.
+
+    Parameters
+    ----------
+    return_periods : list[int]
+        The return periods, in any order.
+
+    Returns
+    -------
+    np.ndarray
+        The coefficient of every return period, in the order of `return_periods`.
+    """
+    order = np.argsort(return_periods)
+    f = 1 / np.asarray(return_periods, dtype=float)[order]
+    if f.size == 1:
+        return f
+
+    lf = np.log(f)
+    c = 1 / (lf[:-1] - lf[1:])
+    g = f * lf - f
+    a = (1 + c * lf[1:]) * (f[:-1] - f[1:]) + c * (g[1:] - g[:-1])
+    b = c * (g[:-1] - g[1:] + lf[1:] * (f[1:] - f[:-1]))
+
+    alpha = np.empty_like(f)
+    alpha[0] = b[0]
+    alpha[1:-1] = a[:-1] + b[1:]
+    alpha[-1] = f[-1] + a[-1]
+
+    coefficients = np.empty_like(alpha)
+    coefficients[order] = alpha
+    return coefficients
@@ -1,27 +1,36 @@
+import json
 import logging
 import math
 import os
 import shutil
-import subprocess
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Optional, Union
+from typing import Any, Iterator, Optional, Union
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 import tomli
 from fiat_toolbox import FiatColumns, get_fiat_columns
 from fiat_toolbox.equity.equity import Equity
 from fiat_toolbox.infographics.infographics_factory import InforgraphicFactory
-from fiat_toolbox.metrics_writer.fiat_write_metrics_file import MetricsFileWriter
 from fiat_toolbox.metrics_writer.fiat_write_return_period_threshold import (
     ExceedanceProbabilityCalculator,
 )
-from fiat_toolbox.spatial_output.aggregation_areas import AggregationAreas
-from fiat_toolbox.spatial_output.footprints import Footprints
 from fiat_toolbox.utils import extract_variables, matches_pattern, replace_pattern
 from hydromt_fiat.fiat import FiatModel
 
+from flood_adapt.adapter.fiat_exposure import ExposureModifier
+from flood_adapt.adapter.footprint_index import get_footprint_index
+from flood_adapt.adapter.impact_geometries import (
+    GeometryStore,
+    copy_spatial_output,
+    read_static_geometries,
+    spatial_output_exists,
+)
+from flood_adapt.adapter.infometrics import MetricsEvaluator
 from flood_adapt.adapter.interface.impact_adapter import IImpactAdapter
+from flood_adapt.adapter.model_run import ModelRun
 from flood_adapt.config.fiat import FiatConfigModel
 from flood_adapt.config.impacts import FloodmapType
 from flood_adapt.misc.log import FloodAdaptLogging
@@ -38,6 +47,7 @@ from flood_adapt.objects.measures.measures import (
     Measure,
     MeasureType,
 )
+from flood_adapt.objects.output.floodmap import FloodMap
 from flood_adapt.objects.projections.projections import Projection
 from flood_adapt.objects.scenarios.scenarios import Scenario
 
@@ -72,6 +82,29 @@ _FIAT_COLUMNS: FiatColumns = get_fiat_columns(
 
 logger = FloodAdaptLogging.getLogger("FiatAdapter")
 
+# Record of the engine and impact key of the impact outputs of a scenario, see `FiatAdapter._write_impact_record`
+_IMPACT_RECORD_FILE = "impact_record.json"
+
+
+def read_impact_record(impacts_path: Path) -> dict[str, Any]:
+    """Read the record of the impact outputs in an ``Impacts`` folder, see `FiatAdapter._write_impact_record`.
+
+    Parameters
+    ----------
+    impacts_path : Path
+        The ``Impacts`` folder of a scenario.
+
+    Returns
+    -------
+    dict[str, Any]
+        The `impact_engine` that produced the outputs and their `impact_key`, or an empty dictionary if the outputs
+        were not recorded, e.g. because they are unfinished or were produced by an older version.
+    """
+    try:
+        return json.loads(Path(impacts_path).joinpath(_IMPACT_RECORD_FILE).read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+
 
 class FiatAdapter(IImpactAdapter):
     """
@@ -86,6 +119,9 @@ class FiatAdapter(IImpactAdapter):
     # TODO deal with all the relative paths for the files used
     # TODO IImpactAdapter and general Adapter class should NOT use the database
 
+    # name of the engine that calculates the impacts, recorded with the impact outputs
+    impact_engine: str = "Delft-FIAT"
+
     _model: Optional[FiatModel] = None
     config: Optional[FiatConfigModel] = None
     exe_path: Optional[os.PathLike] = None
@@ -109,6 +145,11 @@ class FiatAdapter(IImpactAdapter):
         self._model_root = model_root.resolve().as_posix()
         self.fiat_columns = _FIAT_COLUMNS
         self.impact_columns = _IMPACT_COLUMNS  # columns of FA impact output
+        self._exposure_modifier: Optional[ExposureModifier] = None
+        # Scenario whose impacts are reused for the objects that are not run, see `_get_delta_run`
+        self._delta_baseline: Optional[Scenario] = None
+        # Impact key of the scenario that is run, recorded with its outputs if delta runs are enabled, see `_write_impact_record`
+        self._impact_key: Optional[str] = None
 
     @property
     def model(self) -> FiatModel:
@@ -240,14 +281,11 @@ class FiatAdapter(IImpactAdapter):
             None
         """
         logger.info("Pre-processing Delft-FIAT model")
-        # Projection
-        projection = self.database.projections.get(scenario.projection)
-        self.add_projection(projection)
+        self._remove_impact_record(scenario)
+        self.add_projection_and_measures(scenario)
 
-        # Measures
-        strategy = self.database.strategies.get(scenario.strategy)
-        for measure in strategy.get_impact_measures():
-            self.add_measure(measure)
+        # Objects to run, if the impacts of the other objects can be reused from another scenario
+        self._delta_baseline, delta_object_ids = self._get_delta_run(scenario)
 
         # Hazard
         floodmap = self.database.get_floodmap(scenario.name)
@@ -265,7 +303,174 @@ class FiatAdapter(IImpactAdapter):
         output_path = (
             self.database.get_impacts_path(scenario_name=scenario.name) / "fiat_model"
         )
-        self.write(path_out=output_path)
+        if self._delta_baseline is None:
+            self.write(path_out=output_path)
+            return
+        with self._select_exposure(delta_object_ids):
+            self.write(path_out=output_path)
+
+    def add_projection_and_measures(self, scenario: Scenario) -> None:
+        """
+        Add the socioeconomic changes of the projection and the impact measures of the strategy of a scenario to the model.
+
+        Parameters
+        ----------
+        scenario : Scenario
+            The scenario to add the projection and impact measures of.
+        """
+        # Changes to the max potential damages of the projection and measures are applied together
+        with self._collect_exposure_changes():
+            # Projection
+            projection = self.database.projections.get(scenario.projection)
+            self.add_projection(projection)
+
+            # Measures
+            strategy = self.database.strategies.get(scenario.strategy)
+            for measure in strategy.get_impact_measures():
+                self.add_measure(measure)
+
+    def _get_delta_run(
+        self, scenario: Scenario
+    ) -> tuple[Optional[Scenario], Optional[np.ndarray]]:
+        """
+        Find a scenario whose impacts can be reused and the objects that have to be run again.
+
+        A scenario that has already been run with the same impact key (see `DbsScenario.impact_key`) only differs in
+        its impact measures, so the impacts of all objects that are not affected by the impact measures of either
+        scenario are the same. The impact key of every scenario is recorded with its impact outputs, see
+        `_write_impact_record`. Only the outputs of the same impact engine are reused, so the outputs of a screening
+        run are never used for a Delft-FIAT run. Of these scenarios the one with the fewest impact measures is used.
+
+        Parameters
+        ----------
+        scenario : Scenario
+            The scenario to run.
+
+        Returns
+        -------
+        tuple[Optional[Scenario], Optional[np.ndarray]]
+            The scenario to reuse the impacts of and the object IDs to run, or None and None if no scenario can be reused.
+        """
+        if not self.config.delta_runs:
+            return None, None
+
+        self._impact_key = self.database.scenarios.impact_key(scenario)
+        names = [
+            name
+            for name in self.database.scenarios.summarize_objects()["name"]
+            if name != scenario.name and self._can_reuse_impacts(name)
+        ]
+        if not names:
+            return None, None
+
+        candidates = self.database.scenarios.get_many(names)
+        strategies = {
+            other.strategy: self.database.strategies.get(other.strategy)
+            for other in [scenario, *candidates]
+        }
+        baseline = min(
+            candidates,
+            key=lambda other: len(strategies[other.strategy].get_impact_measures()),
+        )
+        measures = (
+            strategies[scenario.strategy].get_impact_measures()
+            + strategies[baseline.strategy].get_impact_measures()
+        )
+        object_ids = np.unique(
+            np.concatenate(
+                [np.asarray(self.get_object_ids(measure)) for measure in measures]
+                or [np.array([])]
+            )
+        )
+        logger.info(
+            f"Running the {len(object_ids)} objects affected by the impact measures, "
+            f"the impacts of the other objects are reused from scenario '{baseline.name}'"
+        )
+        return baseline, object_ids
+
+    def _can_reuse_impacts(self, scenario_name: str) -> bool:
+        """Check if the impact outputs of a scenario were recorded with the same engine and impact key, and if all outputs that are copied in a delta run exist."""
+        impacts_path = self.database.get_impacts_path(scenario_name=scenario_name)
+        record = read_impact_record(impacts_path)
+        if (
+            record.get("impact_engine") != self.impact_engine
+            or record.get("impact_key") != self._impact_key
+        ):
+            return False
+        if not impacts_path.joinpath(f"Impacts_detailed_{scenario_name}.csv").exists():
+            return False
+        if self.config.roads_file_name:
+            return spatial_output_exists(
+                impacts_path.joinpath(f"Impacts_roads_{scenario_name}")
+            )
+        return True
+
+    def _remove_impact_record(self, scenario: Scenario) -> None:
+        """Remove the record of the impact outputs of a scenario that is run again, its outputs are replaced."""
+        self.database.get_impacts_path(scenario.name).joinpath(
+            _IMPACT_RECORD_FILE
+        ).unlink(missing_ok=True)
+        self._impact_key = None
+
+    def _write_impact_record(self, scenario: Scenario) -> None:
+        """Record which engine produced the impact outputs of a scenario, and their impact key if delta runs are enabled.
+
+        The impact key is None if delta runs are disabled, in which case the outputs are never reused.
+        """
+        record_path = self.database.get_impacts_path(scenario.name).joinpath(
+            _IMPACT_RECORD_FILE
+        )
+        record_path.write_text(
+            json.dumps(
+                {"impact_engine": self.impact_engine, "impact_key": self._impact_key}
+            )
+        )
+
+    @contextmanager
+    def _select_exposure(self, object_ids: np.ndarray) -> Iterator[None]:
+        """Reduce the exposure of the model to the given objects in the context, e.g. to write a model that runs them.
+
+        Every exposure geometry file keeps at least one object, so the model configuration stays the same.
+        Running an additional object does not change the results, since it is the same in both scenarios.
+        """
+        exposure = self.model.exposure
+        exposure_db, exposure_geoms = exposure.exposure_db, exposure.exposure_geoms
+        id_col = self.fiat_columns.object_id
+
+        selected_geoms = []
+        for gdf in exposure_geoms:
+            rows = gdf[id_col].isin(object_ids).to_numpy()
+            if not rows.any() and len(gdf) > 0:
+                rows[0] = True
+            selected_geoms.append(gdf.loc[rows])
+        selected_ids = np.concatenate(
+            [np.asarray(object_ids)]
+            + [gdf[id_col].to_numpy() for gdf in selected_geoms]
+        )
+        try:
+            exposure.exposure_db = exposure_db.loc[
+                exposure_db[id_col].isin(selected_ids)
+            ]
+            exposure.exposure_geoms = selected_geoms
+            yield
+        finally:
+            exposure.exposure_db, exposure.exposure_geoms = exposure_db, exposure_geoms
+
+    @staticmethod
+    def _merge_delta_impacts(
+        baseline: pd.DataFrame, delta: pd.DataFrame, object_id_column: str
+    ) -> pd.DataFrame:
+        """Replace the impacts of the objects in `delta` in the impacts of `baseline`, keeping the order of `baseline`."""
+        kept = baseline.loc[~baseline[object_id_column].isin(delta[object_id_column])]
+        merged = pd.concat([kept, delta[baseline.columns]], ignore_index=True)
+        position = pd.Series(
+            np.arange(len(baseline)), index=baseline[object_id_column].to_numpy()
+        )
+        order = np.argsort(
+            position.reindex(merged[object_id_column].to_numpy()).to_numpy(),
+            kind="stable",
+        )
+        return merged.iloc[order].reset_index(drop=True)
 
     def run(self, scenario) -> None:
         """
@@ -292,10 +497,13 @@ class FiatAdapter(IImpactAdapter):
         exe_path: Optional[os.PathLike] = None,
         delete_crashed_runs: Optional[bool] = None,
         strict=True,
+        timeout: Optional[float] = None,
     ) -> bool:
         """
         Execute the FIAT model.
 
+        The output of FIAT is streamed to the log while it runs.
+
         Parameters
         ----------
         path : Optional[os.PathLike], optional
@@ -306,6 +514,9 @@ class FiatAdapter(IImpactAdapter):
             Whether to delete files from crashed runs. If not provided, defaults to `self.delete_crashed_runs`.
         strict : bool, optional
             Whether to raise an error if the FIAT model fails to run. Defaults to True.
+        timeout : Optional[float], optional
+            Maximum wall-clock time of the run in seconds, after which it is stopped and considered failed.
+            Defaults to None, which means no maximum.
 
         Returns
         -------
@@ -319,6 +530,42 @@ class FiatAdapter(IImpactAdapter):
         RuntimeError
             If the FIAT model fails to run and `strict` is True.
         """
+        return self._create_model_run(
+            path, exe_path, delete_crashed_runs, strict, timeout
+        ).run()
+
+    def start_execution(
+        self,
+        path: Optional[os.PathLike] = None,
+        exe_path: Optional[os.PathLike] = None,
+        delete_crashed_runs: Optional[bool] = None,
+        strict=True,
+        timeout: Optional[float] = None,
+    ) -> ModelRun:
+        """
+        Start the FIAT model in a background thread.
+
+        See `execute` for the parameters. The returned handle can be used to cancel the run and wait for it,
+        from a thread (`ModelRun.result`) or an asyncio event loop (`ModelRun.wait_async`).
+        The result of the handle is the return value of `execute`.
+
+        Returns
+        -------
+        ModelRun
+            Handle of the running model.
+        """
+        return self._create_model_run(
+            path, exe_path, delete_crashed_runs, strict, timeout
+        ).start()
+
+    def _create_model_run(
+        self,
+        path: Optional[os.PathLike],
+        exe_path: Optional[os.PathLike],
+        delete_crashed_runs: Optional[bool],
+        strict: bool,
+        timeout: Optional[float],
+    ) -> ModelRun:
         if path is None:
             path = self.model_root
         if exe_path is None:
@@ -330,40 +577,52 @@ class FiatAdapter(IImpactAdapter):
         if delete_crashed_runs is None:
             delete_crashed_runs = self.delete_crashed_runs
         path = Path(path)
-        fiat_log = path / "fiat.log"
-        with cd(path):
-            with FloodAdaptLogging.to_file(file_path=fiat_log):
-                FiatAdapter._ensure_correct_hash_spacing_in_csv(path)
-
-                logger.info(f"Running FIAT in {path}")
-                process = subprocess.run(
-                    args=[Path(exe_path).resolve().as_posix(), "run", "settings.toml"],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                )
-                logger.debug(process.stdout)
-
-        if process.returncode != 0:
-            if delete_crashed_runs:
-                # Remove all files in the simulation folder except for the log files
-                for subdir, dirs, files in os.walk(path, topdown=False):
-                    for file in files:
-                        if not file.endswith(".log"):
-                            os.remove(os.path.join(subdir, file))
+        # a relative executable path is relative to the model directory
+        exe_path = (path / exe_path).resolve()
+        if not exe_path.exists():
+            raise FileNotFoundError(
+                f"FIAT binary not found at {exe_path}. Please check your settings."
+            )
 
-                    if not os.listdir(subdir):
-                        shutil.rmtree(subdir, ignore_errors=True)
+        FiatAdapter._ensure_correct_hash_spacing_in_csv(path)
+
+        # the log file is closed when the run is finished, see `_finish_execution`
+        FloodAdaptLogging.add_file_handler(path / "fiat.log")
+        logger.info(f"Running FIAT in {path}")
+        return ModelRun(
+            args=[exe_path.as_posix(), "run", "settings.toml"],
+            cwd=path,
+            on_line=logger.debug,
+            on_exit=lambda run: self._finish_execution(
+                path, run, delete_crashed_runs, strict
+            ),
+            timeout=timeout,
+        )
 
-            if strict:
-                raise RuntimeError(f"FIAT model failed to run in {path}.")
-            else:
-                logger.error(f"FIAT model failed to run in {path}.")
+    def _finish_execution(
+        self, path: Path, run: ModelRun, delete_crashed_runs: bool, strict: bool
+    ) -> bool:
+        FloodAdaptLogging.remove_file_handler(path / "fiat.log")
 
-        if process.returncode == 0:
+        if run.failure_reason is None:
             self.read_outputs()
-
-        return process.returncode == 0
+            return True
+
+        if delete_crashed_runs:
+            # Remove all files in the simulation folder except for the log files
+            for subdir, dirs, files in os.walk(path, topdown=False):
+                for file in files:
+                    if not file.endswith(".log"):
+                        os.remove(os.path.join(subdir, file))
+
+                if not os.listdir(subdir):
+                    shutil.rmtree(subdir, ignore_errors=True)
+
+        message = f"FIAT model failed to run in {path}: {run.failure_reason}."
+        if strict:
+            raise RuntimeError(message)
+        logger.error(message)
+        return False
 
     def read_outputs(self) -> None:
         """
@@ -387,7 +646,7 @@ class FiatAdapter(IImpactAdapter):
             csv_path = outputs_path.joinpath(
                 self.model.config["output"]["csv"][output_csv]
             )
-            output_csv_df = pd.read_csv(csv_path)
+            output_csv_df = self._read_output_csv(csv_path)
             csv_outputs_df.append(output_csv_df)
         output_csv = pd.concat(csv_outputs_df)
 
@@ -396,6 +655,109 @@ class FiatAdapter(IImpactAdapter):
         self.outputs["path"] = outputs_path
         self.outputs["table"] = output_csv
 
+    def _read_output_csv(self, csv_path: Path) -> pd.DataFrame:
+        """Read a FIAT output CSV with the multithreaded pyarrow CSV reader.
+
+        The dtypes of the known FIAT columns are set explicitly, so they do not have to be inferred from the data.
+        """
+        columns = pd.read_csv(csv_path, nrows=0).columns
+        return pd.read_csv(
+            csv_path, engine="pyarrow", dtype=self._get_output_dtypes(columns)
+        )
+
+    def _get_output_dtypes(self, columns: list[str]) -> dict[str, str]:
+        """Get the dtypes of the known columns of the FIAT output."""
+        text_fields = [
+            "object_name",
+            "primary_object_type",
+            "secondary_object_type",
+            "extraction_method",
+            "damage_function",
+            "aggregation_label",
+        ]
+        numeric_fields = [
+            "ground_floor_height",
+            "ground_elevation",
+            "max_potential_damage",
+            "inundation_depth",
+            "inundation_depth_rp",
+            "reduction_factor",
+            "reduction_factor_rp",
+            "damage",
+            "damage_rp",
+            "total_damage",
+            "total_damage_rp",
+            "risk_ead",
+            "segment_length",
+        ]
+        dtypes = {}
+        for col in columns:
+            for fields, dtype in [(text_fields, "str"), (numeric_fields, "float64")]:
+                if any(
+                    matches_pattern(col, getattr(self.fiat_columns, field))
+                    for field in fields
+                ):
+                    dtypes[col] = dtype
+                    break
+        return dtypes
+
+    def read_detailed_impacts(self, scenario_name: str) -> pd.DataFrame:
+        """
+        Read the impacts per object of a scenario.
+
+        The Parquet copy of the impacts is read if it exists, since it is much faster to read than the CSV file.
+
+        Parameters
+        ----------
+        scenario_name : str
+            The name of the scenario.
+
+        Returns
+        -------
+        pd.DataFrame
+            The impacts per object, with the FloodAdapt column names.
+        """
+        impacts_path = self.database.get_impacts_path(scenario_name=scenario_name)
+        parquet_path = impacts_path / f"Impacts_detailed_{scenario_name}.parquet"
+        if parquet_path.exists():
+            return pd.read_parquet(parquet_path)
+        return pd.read_csv(
+            impacts_path / f"Impacts_detailed_{scenario_name}.csv", engine="pyarrow"
+        )
+
+    def get_hazard_samples(self, floodmap: FloodMap) -> pd.DataFrame:
+        """
+        Get the values of the flood maps at every exposure object of the model.
+
+        The values are sampled like FIAT does: at the centroid of the object, or averaged over its area for objects
+        with the 'area' extraction method. Samples are cached per combination of flood maps and exposure geometries,
+        so scenarios with the same hazard that only differ in their impact measures sample the flood maps only once.
+        The samples are evicted when no scenario uses them anymore, see `HazardSampleCache`.
+
+        Parameters
+        ----------
+        floodmap : FloodMap
+            The flood maps of the scenario.
+
+        Returns
+        -------
+        pd.DataFrame
+            The flood map values in the units of the maps, with the object IDs as index and one column per flood map.
+        """
+        exposure = self.model.exposure.get_full_gdf(self.model.exposure.exposure_db)
+        use_area = (
+            exposure[self.fiat_columns.extraction_method].eq("area").to_numpy()
+            if self.fiat_columns.extraction_method in exposure.columns
+            else None
+        )
+        return self.database.hazard_samples.get_samples(
+            map_paths=sorted(floodmap.paths),
+            exposure=exposure,
+            object_id_column=self.fiat_columns.object_id,
+            use_area=use_area,
+            owner=floodmap.name,
+        )
+
     def _get_aggr_ind(self, aggr_label: str):
         """
         Retrieve the index of the aggregation configuration that matches the given label.
@@ -485,11 +847,23 @@ class FiatAdapter(IImpactAdapter):
         # Rename save outputs
         self.outputs["table"] = self.outputs["table"].rename(columns=self.name_mapping)
 
+        # Complete the impacts of a delta run with the impacts of the objects that were not run
+        if self._delta_baseline is not None:
+            self.outputs["table"] = self._merge_delta_impacts(
+                baseline=self.read_detailed_impacts(self._delta_baseline.name),
+                delta=self.outputs["table"],
+                object_id_column=self.impact_columns.object_id,
+            )
+
         # Save impacts per object
         fiat_results_path = impacts_output_path.joinpath(
             f"Impacts_detailed_{scenario.name}.csv"
         )
         self.outputs["table"].to_csv(fiat_results_path, index=False)
+        # Columnar copy of the impacts per object, which is much faster to read, see `read_detailed_impacts`
+        self.outputs["table"].to_parquet(
+            fiat_results_path.with_suffix(".parquet"), index=False
+        )
 
         # Add exceedance probabilities if needed (only for risk)
         if mode == Mode.risk:
@@ -558,30 +932,47 @@ class FiatAdapter(IImpactAdapter):
                 aggr_label = file.stem.split(f"{metrics_outputs_path.stem}_")[-1]
                 self.add_equity(aggr_label=aggr_label, metrics_path=file)
 
-        # Save aggregated metrics to shapefiles
+        # Save aggregated metrics to spatial files
         for file in aggr_metrics_paths:
             aggr_label = file.stem.split(f"{metrics_outputs_path.stem}_")[-1]
             output_path = impacts_output_path.joinpath(
-                f"Impacts_aggregated_{scenario.name}_{aggr_label}.gpkg"
+                f"Impacts_aggregated_{scenario.name}_{aggr_label}"
             )
             self.save_aggregation_spatial(
-                aggr_label=aggr_label, metrics_path=file, output_path=output_path
+                aggr_label=aggr_label,
+                metrics_path=file,
+                output_path=output_path,
+                owner=scenario.name,
             )
 
         # Merge points data to building footprints
         self.save_building_footprints(
             output_path=impacts_output_path.joinpath(
-                f"Impacts_building_footprints_{scenario.name}.gpkg"
-            )
+                f"Impacts_building_footprints_{scenario.name}"
+            ),
+            owner=scenario.name,
         )
 
         # Create a roads spatial file
         if self.config.roads_file_name:
-            self.save_roads(
-                output_path=impacts_output_path.joinpath(
-                    f"Impacts_roads_{scenario.name}.gpkg"
-                )
+            roads_output_path = impacts_output_path.joinpath(
+                f"Impacts_roads_{scenario.name}"
             )
+            if self._delta_baseline is None:
+                self.save_roads(output_path=roads_output_path, owner=scenario.name)
+            else:
+                # Roads are not affected by impact measures, so they are the same as in the reused scenario
+                baseline_name = self._delta_baseline.name
+                copy_spatial_output(
+                    self.database.get_impacts_path(baseline_name).joinpath(
+                        f"Impacts_roads_{baseline_name}"
+                    ),
+                    roads_output_path,
+                )
+                self.geometry_store.add_reference(scenario.name, roads_output_path)
+
+        # Only record the outputs once they all exist
+        self._write_impact_record(scenario)
 
         logger.info("Delft-FIAT post-processing complete!")
 
@@ -748,33 +1139,8 @@ class FiatAdapter(IImpactAdapter):
             A list of object IDs to which the economic growth should be applied. If None, the growth is applied to all buildings.
         """
         logger.info(f"Applying economic growth of {economic_growth} %.")
-        # Get columns that include max damage
-        damage_cols = [
-            c
-            for c in self.model.exposure.exposure_db.columns
-            if matches_pattern(c, self.fiat_columns.max_potential_damage)
-        ]
-
-        # Get objects that are buildings (using site info)
-        buildings_rows = ~self.model.exposure.exposure_db[
-            self.fiat_columns.primary_object_type
-        ].isin(self.config.non_building_names)
-
-        # If ids are given use that as an additional filter
-        if ids:
-            buildings_rows = buildings_rows & self.model.exposure.exposure_db[
-                self.fiat_columns.object_id
-            ].isin(ids)
-
-        # Update columns using economic growth value
-        updated_max_pot_damage = self.model.exposure.exposure_db.copy()
-        updated_max_pot_damage.loc[buildings_rows, damage_cols] *= (
-            1.0 + economic_growth / 100.0
-        )
-
-        # update fiat model
-        self.model.exposure.update_max_potential_damage(
-            updated_max_potential_damages=updated_max_pot_damage
+        self._multiply_max_potential_damage(
+            rows=self._get_building_rows(ids), factor=1.0 + economic_growth / 100.0
         )
 
     def apply_population_growth_existing(
@@ -795,33 +1161,8 @@ class FiatAdapter(IImpactAdapter):
             A list of object IDs to filter the updates. If None, the updates are applied to all buildings.
         """
         logger.info(f"Applying population growth of {population_growth} %.")
-        # Get columns that include max damage
-        damage_cols = [
-            c
-            for c in self.model.exposure.exposure_db.columns
-            if matches_pattern(c, self.fiat_columns.max_potential_damage)
-        ]
-
-        # Get objects that are buildings (using site info)
-        buildings_rows = ~self.model.exposure.exposure_db[
-            self.fiat_columns.primary_object_type
-        ].isin(self.config.non_building_names)
-
-        # If ids are given use that as an additional filter
-        if ids:
-            buildings_rows = buildings_rows & self.model.exposure.exposure_db[
-                self.fiat_columns.object_id
-            ].isin(ids)
-
-        # Update columns using economic growth value
-        updated_max_pot_damage = self.model.exposure.exposure_db.copy()
-        updated_max_pot_damage.loc[buildings_rows, damage_cols] *= (
-            1.0 + population_growth / 100.0
-        )
-
-        # update fiat model
-        self.model.exposure.update_max_potential_damage(
-            updated_max_potential_damages=updated_max_pot_damage
+        self._multiply_max_potential_damage(
+            rows=self._get_building_rows(ids), factor=1.0 + population_growth / 100.0
         )
 
     def apply_population_growth_new(
@@ -883,6 +1224,9 @@ class FiatAdapter(IImpactAdapter):
             for aggr in self.config.aggregation
         ]
         new_dev_geom_name = Path(self.config.new_development_file_name).stem
+        # The new areas are based on the current max potential damages, so pending changes are applied first
+        if self._exposure_modifier is not None:
+            self._exposure_modifier.apply(self.model.exposure.exposure_db)
         # Ensure new_devs geom is in the correct CRS
         new_dev_geom = gpd.read_file(area_path)
         if new_dev_geom.crs != self.model.exposure.crs:
@@ -908,6 +1252,53 @@ class FiatAdapter(IImpactAdapter):
             **kwargs,
         )
 
+    @contextmanager
+    def _collect_exposure_changes(self) -> Iterator[None]:
+        """Collect the changes to the max potential damages made in the context and apply them once on exit."""
+        self._exposure_modifier = self._create_exposure_modifier()
+        try:
+            yield
+            self._exposure_modifier.apply(self.model.exposure.exposure_db)
+        finally:
+            self._exposure_modifier = None
+
+    def _create_exposure_modifier(self) -> ExposureModifier:
+        return ExposureModifier(
+            object_ids=self.model.exposure.exposure_db[
+                self.fiat_columns.object_id
+            ].to_numpy(),
+            object_id_column=self.fiat_columns.object_id,
+            damage_column_pattern=self.fiat_columns.max_potential_damage,
+        )
+
+    def _get_building_rows(self, ids: Optional[list] = None) -> pd.Series:
+        """Get the rows of the exposure that are buildings, optionally only those with the given object IDs."""
+        exposure_db = self.model.exposure.exposure_db
+        # Get objects that are buildings (using site info)
+        buildings_rows = ~exposure_db[self.fiat_columns.primary_object_type].isin(
+            self.config.non_building_names
+        )
+        # If ids are given use that as an additional filter
+        if ids:
+            buildings_rows &= exposure_db[self.fiat_columns.object_id].isin(ids)
+        return buildings_rows
+
+    def _multiply_max_potential_damage(self, rows: pd.Series, factor: float) -> None:
+        """Multiply the max potential damages of the given rows of the exposure by a factor.
+
+        Within `_collect_exposure_changes` the change is collected and applied on exit, otherwise it is applied directly.
+        """
+        object_ids = self.model.exposure.exposure_db.loc[
+            rows, self.fiat_columns.object_id
+        ].to_numpy()
+        if self._exposure_modifier is not None:
+            self._exposure_modifier.multiply(object_ids, factor)
+            return
+
+        modifier = self._create_exposure_modifier()
+        modifier.multiply(object_ids, factor)
+        modifier.apply(self.model.exposure.exposure_db)
+
     # MEASURES
     @staticmethod
     def _get_area_name(measure: Measure):
@@ -998,33 +1389,12 @@ class FiatAdapter(IImpactAdapter):
         """
         area = self._get_area_name(buyout)
         logger.info(f"Buying-out '{buyout.property_type}' type properties in '{area}'.")
-        # Get columns that include max damage
-        damage_cols = [
-            c
-            for c in self.model.exposure.exposure_db.columns
-            if matches_pattern(c, self.fiat_columns.max_potential_damage)
-        ]
-
-        # Get objects that are buildings (using site info)
-        buildings_rows = ~self.model.exposure.exposure_db[
-            self.fiat_columns.primary_object_type
-        ].isin(self.config.non_building_names)
-
         # Get rows that are affected
         objectids = self.get_object_ids(buyout)
-        rows = (
-            self.model.exposure.exposure_db[self.fiat_columns.object_id].isin(objectids)
-            & buildings_rows
-        )
-
-        # Update columns
-        updated_max_pot_damage = self.model.exposure.exposure_db.copy()
-        updated_max_pot_damage.loc[rows, damage_cols] *= 0
-
-        # update fiat model
-        self.model.exposure.update_max_potential_damage(
-            updated_max_potential_damages=updated_max_pot_damage
-        )
+        rows = self._get_building_rows() & self.model.exposure.exposure_db[
+            self.fiat_columns.object_id
+        ].isin(objectids)
+        self._multiply_max_potential_damage(rows=rows, factor=0.0)
 
     def floodproof_properties(self, floodproof: FloodProof) -> None:
         """
@@ -1225,26 +1595,17 @@ class FiatAdapter(IImpactAdapter):
         # Get the metrics configuration
         logger.info("Calculating infometrics")
 
+        # All metric configurations are evaluated with the same compiled filters and aggregation areas
+        evaluator = MetricsEvaluator(
+            self.outputs["table"],
+            aggregation_label_fmt=self.impact_columns.aggregation_label,
+        )
+
         # Write the metrics to file
         # Check if type of metric configuration is available
         for metric_file in metric_config_paths:
             if metric_file.exists():
-                metrics_writer = MetricsFileWriter(
-                    metric_file,
-                    aggregation_label_fmt=self.impact_columns.aggregation_label,
-                )
-
-                metrics_writer.parse_metrics_to_file(
-                    df_results=self.outputs["table"],
-                    metrics_path=metrics_output_path,
-                    write_aggregate=None,
-                )
-
-                metrics_writer.parse_metrics_to_file(
-                    df_results=self.outputs["table"],
-                    metrics_path=metrics_output_path,
-                    write_aggregate="all",
-                )
+                evaluator.write_metrics_files(metric_file, metrics_output_path)
             else:
                 if "mandatory" in metric_file.name.lower():
                     raise FileNotFoundError(
@@ -1373,8 +1734,17 @@ class FiatAdapter(IImpactAdapter):
         metrics_new.index.name = None
         metrics_new.to_csv(metrics_path)
 
+    @property
+    def geometry_store(self) -> GeometryStore:
+        """The store of the geometries of the spatial impact outputs, shared by all scenarios."""
+        return self.database.geometries
+
     def save_aggregation_spatial(
-        self, aggr_label: str, metrics_path: os.PathLike, output_path: os.PathLike
+        self,
+        aggr_label: str,
+        metrics_path: os.PathLike,
+        output_path: os.PathLike,
+        owner: Optional[str] = None,
     ):
         """
         Save aggregated metrics to a spatial file.
@@ -1386,11 +1756,13 @@ class FiatAdapter(IImpactAdapter):
         metrics_path : os.PathLike
             The path to the metrics file.
         output_path : os.PathLike
-            The path where the output spatial file will be saved.
+            The path where the output spatial file will be saved, the geometries are stored in the `geometry_store`.
+        owner : str, optional
+            Name of the scenario the output belongs to, see `GeometryStore.write`.
         """
         logger.info(f"Saving impacts for aggregation areas type: '{aggr_label}'")
 
-        metrics = pd.read_csv(metrics_path)
+        metrics = pd.read_csv(metrics_path, index_col=0)
 
         # Load aggregation areas
         ind = self._get_aggr_ind(aggr_label)
@@ -1399,25 +1771,45 @@ class FiatAdapter(IImpactAdapter):
             self.config.aggregation[ind].file
         )
 
-        aggr_areas = gpd.read_file(aggr_areas_path, engine="pyogrio")
+        aggr_areas = read_static_geometries(aggr_areas_path)
+
+        # Only keep the metrics that are supposed to be shown in the metrics map, like AggregationAreas does
+        if "Show In Metrics Map" in metrics.index:
+            metrics = metrics.loc[
+                :, metrics.loc["Show In Metrics Map", :].astype(str) == "True"
+            ]
+        metrics = metrics.drop(
+            [
+                "Description",
+                "Show In Metrics Table",
+                "Show In Metrics Map",
+                "Long Name",
+            ],
+            errors="ignore",
+        ).apply(pd.to_numeric)
 
         # Save file
-        AggregationAreas.write_spatial_file(
-            metrics,
-            aggr_areas,
+        self.geometry_store.write(
+            aggr_areas.join(metrics, on=self.config.aggregation[ind].field_name),
             output_path,
-            id_name=self.config.aggregation[ind].field_name,
-            file_format="geopackage",
+            owner=owner,
         )
 
-    def save_building_footprints(self, output_path: os.PathLike):
+    def save_building_footprints(
+        self, output_path: os.PathLike, owner: Optional[str] = None
+    ):
         """
         Aggregate impacts at a building footprint level and then saves to an output file.
 
+        The footprint of every building is looked up in a `FootprintIndex`, which is only built once for the same
+        buildings and footprints file.
+
         Parameters
         ----------
         output_path : os.PathLike
             The path where the output spatial file will be saved.
+        owner : str, optional
+            Name of the scenario the output belongs to, see `GeometryStore.write`.
 
         Raises
         ------
@@ -1433,60 +1825,41 @@ class FiatAdapter(IImpactAdapter):
             return_gdf=True,
         )
 
-        # Change names
-        buildings = buildings[[self.fiat_columns.object_id, "geometry"]]
-        buildings = buildings.rename(
-            columns={self.fiat_columns.object_id: self.impact_columns.object_id}
-        )
-
-        # Get all results per building
-        fiat_results_df = gpd.GeoDataFrame(
-            self.outputs["table"].merge(
-                buildings,
-                on=self.impact_columns.object_id,
-                how="inner",
-            )
-        )
-
-        # Check which footprint case we have
-        # If FIAT has points and external footprints are provided
+        # If FIAT has points and external footprints are provided, they are connected with the BF_FID column
+        footprints_path = None
+        field_name = None
         if self.config.building_footprints:
-            method = "external_footprints"
-            # Get footprints file
             footprints_path = self.config_base_path.joinpath(
                 self.config.building_footprints
             )
-            # Read building footprints
-            footprints_gdf = gpd.read_file(footprints_path, engine="pyogrio")
             field_name = "BF_FID"
-        # If FIAT has footprints already
-        elif all(buildings.geometry.geom_type.isin(["Polygon", "MultiPolygon"])):
-            method = "internal_footprints"
-            footprints_gdf = buildings[[self.impact_columns.object_id, "geometry"]]
-            field_name = self.impact_columns.object_id
-        # If FIAT has points and no external footprints are available
+            buildings = buildings[[self.fiat_columns.object_id, field_name, "geometry"]]
         else:
-            method = "no_footprints"
-
-        # Based on case follow different workflow
-        if method in ["external_footprints", "internal_footprints"]:
-            footprints = Footprints(
-                footprints=footprints_gdf,
-                fiat_columns=self.impact_columns,
-                field_name=field_name,
-            )
-            footprints.aggregate(fiat_results_df)
-        elif method == "no_footprints":
-            footprints = Footprints(fiat_columns=self.impact_columns)
-            footprints.set_point_data(fiat_results_df)
+            buildings = buildings[[self.fiat_columns.object_id, "geometry"]]
 
-        # Normalize damages
-        footprints.calc_normalized_damages()
+        # Change names
+        buildings = buildings.rename(
+            columns={self.fiat_columns.object_id: self.impact_columns.object_id}
+        )
+
+        # Get the footprint of every building, which is only built once for the same exposure
+        index = get_footprint_index(
+            index_dir=self.database.static_path / "geometries",
+            buildings=buildings,
+            object_id_column=self.impact_columns.object_id,
+            footprints_path=footprints_path,
+            field_name=field_name,
+        )
+
+        # Aggregate the results per footprint and normalize damages
+        footprints = index.aggregate(
+            self.outputs["table"], fiat_columns=self.impact_columns
+        )
 
         # Save footprint
-        footprints.write(output_path)
+        self.geometry_store.write(footprints, output_path, owner=owner)
 
-    def save_roads(self, output_path: os.PathLike):
+    def save_roads(self, output_path: os.PathLike, owner: Optional[str] = None):
         """
         Save the impacts on roads to a spatial file.
 
@@ -1494,6 +1867,8 @@ class FiatAdapter(IImpactAdapter):
         ----------
         output_path : os.PathLike
             The path where the output spatial file will be saved.
+        owner : str, optional
+            Name of the scenario the output belongs to, see `GeometryStore.write`.
         """
         logger.info("Calculating road impacts")
         # Read roads spatial file
@@ -1520,18 +1895,19 @@ class FiatAdapter(IImpactAdapter):
             ],
             on=self.impact_columns.object_id,
         )
-        # Save as geopackage
-        roads.to_file(output_path, driver="GPKG")
+        # Save attributes and shared geometries
+        self.geometry_store.write(roads, output_path, owner=owner)
 
     @staticmethod
     def _ensure_correct_hash_spacing_in_csv(
         model_root: Path, hash_spacing: int = 1
     ) -> None:
         """
-        Ensure that the CSV file has the correct number of spaces between hashes.
+        Ensure that the CSV files have the correct number of spaces between hashes.
 
         When writing csv files, FIAT does not add spaces between the hashes and the line, which leads to errors on linux.
 
+        Files are streamed line by line and only rewritten if any of their comment lines needs fixing.
 
         Parameters
         ----------
@@ -1540,20 +1916,40 @@ class FiatAdapter(IImpactAdapter):
         hash_spacing : int, optional
             The number of spaces between hashes, by default 1.
         """
-        for dirpath, _, filenames in os.walk(model_root):
-            for filename in filenames:
-                if not filename.lower().endswith(".csv"):
-                    continue
-                file_path = os.path.join(dirpath, filename)
+        for csv_path in sorted(Path(model_root).rglob("*")):
+            if csv_path.is_file() and csv_path.suffix.lower() == ".csv":
+                FiatAdapter._normalize_csv_comment_lines(csv_path, hash_spacing)
 
-                with open(file_path, "r") as file:
-                    lines = file.readlines()
+    @staticmethod
+    def _normalize_csv_comment_lines(csv_path: Path, hash_spacing: int) -> bool:
+        """
+        Rewrite the comment lines of a CSV file to `hash_spacing` spaces after the hash, if any of them differ.
 
-                with open(file_path, "w") as file:
-                    for line in lines:
-                        if line.startswith("#"):
-                            line = "#" + " " * hash_spacing + line.lstrip("#")
-                        file.write(line)
+        Returns
+        -------
+        bool
+            True if the file was rewritten, False if it was already correct.
+        """
+        prefix = b"#" + b" " * hash_spacing
+
+        def normalize(line: bytes) -> bytes:
+            if line.startswith(b"#"):
+                return prefix + line.lstrip(b"#").lstrip(b" ")
+            return line
+
+        # First pass: only read, most files do not need any changes
+        with open(csv_path, "rb") as file:
+            if all(normalize(line) == line for line in file):
+                return False
+
+        # Second pass: stream the normalized lines to a temporary file and replace the original
+        logger.debug(f"Normalizing comment lines in {csv_path}")
+        tmp_path = csv_path.with_name(f"{csv_path.name}.tmp")
+        with open(csv_path, "rb") as src, open(tmp_path, "wb") as dst:
+            for line in src:
+                dst.write(normalize(line))
+        os.replace(tmp_path, csv_path)
+        return True
 
     def _delete_simulation_folder(self, scn: Scenario):
         """
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+from fiat_toolbox.utils import matches_pattern
+
+from flood_adapt.misc.log import FloodAdaptLogging
+
+logger = FloodAdaptLogging.getLogger("FiatExposure")
+
+
+class ExposureModifier:
+    """Collect multiplicative changes to the maximum potential damages of the exposure and apply them at once.
+
+    Economic growth, population growth of existing objects and buyouts all multiply the maximum potential damages
+    of a selection of objects by a factor. Instead of applying every change to a copy of the exposure, the factors
+    are composed into a single factor per object, which `apply` multiplies into the damage columns in place.
+
+    Parameters
+    ----------
+    object_ids : np.ndarray
+        Object IDs of the exposure the changes are collected for.
+    object_id_column : str
+        Name of the object ID column of the exposure.
+    damage_column_pattern : str
+        Pattern of the maximum potential damage columns of the exposure, e.g. ``"max_damage_{name}"``.
+    """
+
+    def __init__(
+        self,
+        object_ids: np.ndarray,
+        object_id_column: str,
+        damage_column_pattern: str,
+    ):
+        self.object_id_column = object_id_column
+        self.damage_column_pattern = damage_column_pattern
+        self._factors = pd.Series(1.0, index=pd.Index(object_ids))
+
+    @property
+    def has_changes(self) -> bool:
+        """Return True if there are changes that are not applied yet."""
+        return bool((self._factors != 1.0).any())
+
+    def multiply(self, object_ids: np.ndarray, factor: float) -> None:
+        """Multiply the maximum potential damages of the given objects by a factor.
+
+        Objects that were added to the exposure after this modifier was created, like new development areas, are
+        added to the collected changes.
+
+        Parameters
+        ----------
+        object_ids : np.ndarray
+            Object IDs of the objects to change.
+        factor : float
+            Factor to multiply the maximum potential damages with.
+        """
+        object_ids = pd.Index(object_ids)
+        new_ids = object_ids.difference(self._factors.index)
+        if len(new_ids) > 0:
+            self._factors = pd.concat([self._factors, pd.Series(1.0, index=new_ids)])
+        self._factors.loc[object_ids] *= factor
+
+    def apply(self, exposure_db: pd.DataFrame) -> None:
+        """Apply the collected changes to the exposure in place and reset them.
+
+        Objects of the exposure without collected changes are left unchanged.
+
+        Parameters
+        ----------
+        exposure_db : pd.DataFrame
+            Exposure to apply the changes to.
+        """
+        factors = (
+            self._factors.reindex(exposure_db[self.object_id_column].to_numpy())
+            .fillna(1.0)
+            .to_numpy()
+        )
+        self._factors[:] = 1.0
+
+        changed = factors != 1.0
+        if not changed.any():
+            return
+
+        damage_cols = [
+            col
+            for col in exposure_db.columns
+            if matches_pattern(col, self.damage_column_pattern)
+        ]
+        logger.info(
+            f"Updating the maximum potential damage of {np.count_nonzero(changed)} objects."
+        )
+        for col in damage_cols:
+            values = exposure_db[col].to_numpy(dtype=float, copy=True)
+            values[changed] *= factors[changed]
+            exposure_db[col] = values
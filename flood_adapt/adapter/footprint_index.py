@@ -0,0 +1,344 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from fiat_toolbox import FiatColumns
+from fiat_toolbox.spatial_output.footprints import Footprints
+
+from flood_adapt.adapter.impact_geometries import read_static_geometries
+from flood_adapt.misc.fingerprint import file_fingerprint
+from flood_adapt.misc.log import FloodAdaptLogging
+
+logger = FloodAdaptLogging.getLogger("FootprintIndex")
+
+FOOTPRINT_KEY = "footprint_key"
+# Number of saved indexes that are kept, e.g. for the exposure with and without the new developments of projections
+MAX_SAVED_INDEXES = 4
+
+
+class FootprintIndex:
+    """Index of the building footprint that every building object of an impact model belongs to.
+
+    The footprint of an object is the external building footprint it refers to, its own geometry if it is a
+    polygon without a footprint, or a small shape around it if it is a point without a footprint. This only depends
+    on the exposure and the footprints file, so the index is built once and persisted, after which aggregating the
+    impacts of a scenario to the footprints is a grouped reduction over the index.
+
+    Parameters
+    ----------
+    objects : pd.DataFrame
+        The object ID and the `footprint_key` of every building object.
+    geometries : gpd.GeoSeries
+        The geometry of every footprint, where the index is the `footprint_key`.
+    object_id_column : str
+        Name of the object ID column.
+    """
+
+    def __init__(
+        self,
+        objects: pd.DataFrame,
+        geometries: gpd.GeoSeries,
+        object_id_column: str,
+    ):
+        self.objects = objects
+        self.geometries = geometries
+        self.object_id_column = object_id_column
+
+    @classmethod
+    def build(
+        cls,
+        buildings: gpd.GeoDataFrame,
+        object_id_column: str,
+        footprints: Optional[gpd.GeoDataFrame] = None,
+        field_name: Optional[str] = None,
+        no_footprints_shape: str = "triangle",
+        no_footprints_diameter: float = 10.0,
+    ) -> "FootprintIndex":
+        """Build the index of the footprint of every building object.
+
+        Parameters
+        ----------
+        buildings : gpd.GeoDataFrame
+            The building objects, with their object ID, geometry and, with external footprints, the footprint ID.
+        object_id_column : str
+            Name of the object ID column of `buildings`.
+        footprints : Optional[gpd.GeoDataFrame], optional
+            The external building footprints. Defaults to None.
+        field_name : Optional[str], optional
+            Name of the footprint ID column in `footprints` and `buildings`. Required with `footprints`.
+        no_footprints_shape : str, optional
+            The shape around points without a footprint. Defaults to 'triangle'.
+        no_footprints_diameter : float, optional
+            The diameter of the shape around points without a footprint, in meters. Defaults to 10.0.
+
+        Returns
+        -------
+        FootprintIndex
+            The index, with the geometries in the CRS of the footprints, or else of the buildings.
+        """
+        buildings = buildings.reset_index(drop=True)
+        crs = buildings.crs if footprints is None else footprints.crs
+        footprint_keys = np.full(len(buildings), -1, dtype=np.int64)
+        geometries = []
+
+        has_footprint = np.zeros(len(buildings), dtype=bool)
+        if footprints is not None:
+            has_footprint = (
+                buildings[field_name].isin(footprints[field_name]).to_numpy()
+            )
+            codes, footprint_ids = pd.factorize(
+                buildings.loc[has_footprint, field_name]
+            )
+            footprint_keys[has_footprint] = codes
+            geometries.append(
+                footprints.drop_duplicates(field_name)
+                .set_index(field_name)
+                .geometry.loc[footprint_ids]
+            )
+
+        # objects without a footprint are a footprint of their own
+        others = buildings.loc[~has_footprint, [object_id_column, "geometry"]]
+        n_footprints = sum(len(geometry) for geometry in geometries)
+        footprint_keys[~has_footprint] = n_footprints + np.arange(len(others))
+        points = others.geometry.geom_type == "Point"
+        if points.any():
+            others.loc[points, "geometry"] = (
+                Footprints._no_footprint_points_to_polygons(
+                    others.loc[points], no_footprints_shape, no_footprints_diameter
+                ).geometry
+            )
+        geometries.append(others.geometry.to_crs(crs))
+
+        geometries = gpd.GeoSeries(
+            pd.concat([geometry.reset_index(drop=True) for geometry in geometries]),
+            crs=crs,
+        ).reset_index(drop=True)
+        objects = pd.DataFrame(
+            {
+                object_id_column: buildings[object_id_column].to_numpy(),
+                FOOTPRINT_KEY: footprint_keys,
+            }
+        )
+        return cls(objects, geometries, object_id_column)
+
+    @staticmethod
+    def get_key(
+        buildings: gpd.GeoDataFrame,
+        object_id_column: str,
+        footprints_path: Optional[Path] = None,
+        field_name: Optional[str] = None,
+        no_footprints_shape: str = "triangle",
+        no_footprints_diameter: float = 10.0,
+    ) -> str:
+        """Get the key of the index, which changes when the buildings or the contents of the footprints file change.
+
+        The key does not depend on the location of the footprints file, so it is the same after moving the database.
+        """
+        sha = hashlib.sha256()
+        sha.update(str(buildings.crs).encode("utf-8"))
+        sha.update(buildings[object_id_column].to_numpy().astype(str).tobytes())
+        for wkb in shapely.to_wkb(buildings.geometry.to_numpy()):
+            sha.update(wkb)
+        if footprints_path is not None:
+            sha.update(file_fingerprint(footprints_path).encode("utf-8"))
+            sha.update(buildings[field_name].to_numpy().astype(str).tobytes())
+        sha.update(f"{no_footprints_shape}{no_footprints_diameter}".encode("utf-8"))
+        return sha.hexdigest()
+
+    def save(self, index_dir: Path) -> None:
+        """Save the index as Parquet files in a directory.
+
+        Parameters
+        ----------
+        index_dir : Path
+            The directory to save the index in.
+        """
+        index_dir = Path(index_dir)
+        tmp_dir = index_dir.with_name(f"{index_dir.name}.{os.getpid()}.tmp")
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.objects.to_parquet(tmp_dir / "objects.parquet", index=False)
+        gpd.GeoDataFrame(
+            {FOOTPRINT_KEY: self.geometries.index},
+            geometry=self.geometries.values,
+            crs=self.geometries.crs,
+        ).to_parquet(tmp_dir / "footprints.parquet", index=False)
+        # the directory with the final name is always complete
+        try:
+            os.replace(tmp_dir, index_dir)
+        except OSError:
+            # saved by another process in the meantime
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    @classmethod
+    def load(cls, index_dir: Path, object_id_column: str) -> "FootprintIndex":
+        """Load an index saved with `save`.
+
+        Parameters
+        ----------
+        index_dir : Path
+            The directory the index is saved in.
+        object_id_column : str
+            Name of the object ID column.
+
+        Returns
+        -------
+        FootprintIndex
+            The loaded index.
+        """
+        index_dir = Path(index_dir)
+        footprints = gpd.read_parquet(index_dir / "footprints.parquet")
+        return cls(
+            objects=pd.read_parquet(index_dir / "objects.parquet"),
+            geometries=footprints.set_index(FOOTPRINT_KEY).geometry.sort_index(),
+            object_id_column=object_id_column,
+        )
+
+    def aggregate(
+        self,
+        results: pd.DataFrame,
+        fiat_columns: FiatColumns,
+        depth_rounding: int = 2,
+        damage_rounding: int = 0,
+    ) -> gpd.GeoDataFrame:
+        """Aggregate the impacts of the building objects to their footprints.
+
+        Like `fiat_toolbox.spatial_output.footprints.Footprints`, the depths of the objects with the same footprint
+        are averaged and their damages summed. The most common primary object types are joined with '_', the most
+        common aggregation label is used and the object IDs are joined with '_'. The normalized damages are added
+        with `Footprints.calc_normalized_damages`.
+
+        Parameters
+        ----------
+        results : pd.DataFrame
+            The impacts of the objects, objects that are not in the index are ignored.
+        fiat_columns : FiatColumns
+            The column names of `results`.
+        depth_rounding : int, optional
+            Number of decimals of the depths. Defaults to 2.
+        damage_rounding : int, optional
+            Number of decimals of the damages. Defaults to 0.
+
+        Returns
+        -------
+        gpd.GeoDataFrame
+            The impacts per footprint.
+        """
+        footprints = Footprints(
+            fiat_columns=fiat_columns,
+            depth_rounding=depth_rounding,
+            damage_rounding=damage_rounding,
+        )
+        columns = footprints._get_column_names(results)
+        table = results.merge(self.objects, on=self.object_id_column, how="inner")
+        keys = table[FOOTPRINT_KEY]
+        grouped = table.groupby(FOOTPRINT_KEY, sort=True)
+
+        gdf = pd.DataFrame(index=grouped.size().index)
+        if (grouped.size() > 1).any():
+            gdf[fiat_columns.object_id] = (
+                table[fiat_columns.object_id].astype(str).groupby(keys).agg("_".join)
+            )
+        else:
+            gdf[fiat_columns.object_id] = grouped[fiat_columns.object_id].first()
+        for col in columns["string"]:
+            modes = _get_modes(keys, table[col].astype(str))
+            if col == fiat_columns.primary_object_type:
+                gdf[col] = modes.agg("_".join)
+            else:
+                gdf[col] = modes.first()
+        gdf = gdf.join(grouped[columns["depth"]].mean()).join(
+            grouped[columns["damage"]].sum()
+        )
+
+        for col in columns["depth"]:
+            gdf[col] = gdf[col].round(depth_rounding)
+        for col in columns["damage"]:
+            gdf[col] = gdf[col].round(damage_rounding).fillna(0)
+
+        footprints.results = gpd.GeoDataFrame(
+            gdf.reset_index(drop=True),
+            geometry=self.geometries.loc[gdf.index].to_numpy(),
+            crs=self.geometries.crs,
+        )
+        footprints.calc_normalized_damages()
+        return footprints.results
+
+
+def _get_modes(keys: pd.Series, values: pd.Series) -> "pd.core.groupby.SeriesGroupBy":
+    """Group the most common values per key, in sorted order."""
+    counts = pd.DataFrame({"key": keys.to_numpy(), "value": values.to_numpy()})
+    counts = counts.groupby(["key", "value"], sort=True).size()
+    modes = counts[counts == counts.groupby(level="key").transform("max")]
+    return modes.reset_index().groupby("key")["value"]
+
+
+def get_footprint_index(
+    index_dir: Path,
+    buildings: gpd.GeoDataFrame,
+    object_id_column: str,
+    footprints_path: Optional[Path] = None,
+    field_name: Optional[str] = None,
+) -> FootprintIndex:
+    """Load the footprint index of the buildings, or build and save it if it does not exist yet.
+
+    Only the `MAX_SAVED_INDEXES` most recently used indexes are kept, older ones are removed when a new index is saved.
+
+    Parameters
+    ----------
+    index_dir : Path
+        The directory with the saved indexes.
+    buildings : gpd.GeoDataFrame
+        The building objects, see `FootprintIndex.build`.
+    object_id_column : str
+        Name of the object ID column of `buildings`.
+    footprints_path : Optional[Path], optional
+        Path of the external building footprints. Defaults to None.
+    field_name : Optional[str], optional
+        Name of the footprint ID column. Required with `footprints_path`.
+
+    Returns
+    -------
+    FootprintIndex
+        The index of the buildings.
+    """
+    key = FootprintIndex.get_key(
+        buildings, object_id_column, footprints_path, field_name
+    )
+    path = Path(index_dir) / f"footprint_index_{key}"
+    if path.exists():
+        # mark the index as recently used
+        os.utime(path)
+        return FootprintIndex.load(path, object_id_column)
+
+    logger.info("Building the index of the building footprints")
+    footprints = None
+    if footprints_path is not None:
+        footprints = read_static_geometries(footprints_path)
+    index = FootprintIndex.build(
+        buildings, object_id_column, footprints=footprints, field_name=field_name
+    )
+    index.save(path)
+    _remove_old_indexes(Path(index_dir))
+    return index
+
+
+def _remove_old_indexes(index_dir: Path) -> None:
+    """Remove all but the `MAX_SAVED_INDEXES` most recently used indexes in a directory."""
+    indexes = sorted(
+        (
+            path
+            for path in index_dir.glob("footprint_index_*")
+            if path.is_dir() and not path.name.endswith(".tmp")
+        ),
+        key=lambda path: path.stat().st_mtime_ns,
+        reverse=True,
+    )
+    for path in indexes[MAX_SAVED_INDEXES:]:
+        logger.debug(f"Removing old building footprint index {path.name}")
+        shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,302 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import rasterio
+import rioxarray  # noqa: F401, registers the `rio` accessor
+import shapely
+import xarray as xr
+from pyproj import CRS
+from rasterio.features import rasterize
+from rasterio.transform import Affine
+
+from flood_adapt.misc.log import FloodAdaptLogging
+from flood_adapt.misc.references import ReferenceCounter
+
+logger = FloodAdaptLogging.getLogger("HazardSampling")
+
+
+class HazardSampleCache:
+    """Cache of hazard map values sampled at the exposure objects of an impact model.
+
+    Sampling the flood maps at every exposure object is the same for all scenarios with identical hazard maps and
+    exposure geometries, e.g. the scenarios of a benefit analysis that only differ in their impact measures.
+    The sampled values are therefore cached with a key that combines the content hash of the hazard maps and the
+    hash of the exposure geometries, so they are only sampled once.
+
+    The cached values are the raw values of the hazard maps, in the units of the maps.
+
+    Every entry is referenced by the scenarios (owners) that use it. An entry is evicted as soon as no scenario
+    references it anymore: when its scenarios are deleted (`release`, `prune`) or sample a different hazard, see
+    `ReferenceCounter`.
+
+    Parameters
+    ----------
+    cache_dir : Path
+        Directory to store the sampled values in.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self._references = ReferenceCounter(
+            self.cache_dir / "references", self._evict_unreferenced
+        )
+
+    def get_samples(
+        self,
+        map_paths: list[Path],
+        exposure: gpd.GeoDataFrame,
+        object_id_column: str,
+        use_area: Optional[np.ndarray] = None,
+        area_method: str = "mean",
+        owner: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """Get the hazard values of every exposure object, sampling the maps only if they are not cached yet.
+
+        Parameters
+        ----------
+        map_paths : list[Path]
+            Paths to the hazard maps (GeoTIFF or netCDF), e.g. one per return period.
+        exposure : gpd.GeoDataFrame
+            Exposure objects, with their object ID and geometry.
+        object_id_column : str
+            Name of the object ID column of the exposure.
+        use_area : np.ndarray, optional
+            Boolean mask of the objects whose value is aggregated over their area instead of sampled at their
+            centroid. By default, all objects are sampled at their centroid.
+        area_method : str, optional
+            Aggregation over the area of an object, either 'mean' or 'max', by default 'mean'.
+        owner : str, optional
+            Name of the scenario the maps belong to. The entry is kept until the scenario is released or samples
+            other maps. By default, the entry is not referenced and removed by the next `prune`.
+
+        Returns
+        -------
+        pd.DataFrame
+            Hazard values with the object IDs as index and one column per map, named after the map file.
+        """
+        if use_area is None:
+            use_area = np.zeros(len(exposure), dtype=bool)
+        object_ids = exposure[object_id_column].to_numpy()
+        if object_ids.dtype == object:
+            # object arrays can only be stored with pickle
+            object_ids = object_ids.astype(str)
+        key = self.get_key(map_paths, exposure, object_id_column, use_area, area_method)
+        cache_path = self.cache_dir / f"{key}.npz"
+        columns = [Path(path).stem for path in map_paths]
+        if owner is not None:
+            self._references.set_reference(owner, key)
+
+        if cache_path.exists():
+            logger.info("Reusing hazard values sampled for an identical hazard")
+            with np.load(cache_path, allow_pickle=False) as cached:
+                return pd.DataFrame(
+                    cached["values"], index=cached["object_ids"], columns=columns
+                )
+
+        logger.info(
+            f"Sampling {len(map_paths)} hazard map(s) at {len(exposure)} objects"
+        )
+        values = np.column_stack(
+            [
+                sample_hazard_map(path, exposure.geometry, use_area, area_method)
+                for path in map_paths
+            ]
+        )
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first, so an interrupted write never leaves an incomplete cache entry
+        tmp_path = cache_path.with_name(f"{cache_path.stem}.tmp.npz")
+        np.savez(tmp_path, object_ids=object_ids, values=values)
+        os.replace(tmp_path, cache_path)
+        return pd.DataFrame(values, index=object_ids, columns=columns)
+
+    def release(self, owner: str) -> None:
+        """Remove the reference of a scenario, e.g. after it is deleted, and evict the entries nobody references.
+
+        Parameters
+        ----------
+        owner : str
+            Name of the scenario.
+        """
+        self._references.release(owner)
+
+    def prune(self, owners: Iterable[str]) -> None:
+        """Remove the references of all scenarios except `owners` and evict the entries nobody references.
+
+        Parameters
+        ----------
+        owners : Iterable[str]
+            Names of the scenarios that still exist.
+        """
+        self._references.prune(owners)
+
+    def _evict_unreferenced(self, referenced: set[str]) -> None:
+        if not self.cache_dir.is_dir():
+            return
+        for path in self.cache_dir.glob("*.npz"):
+            if path.stem not in referenced and not path.stem.endswith(".tmp"):
+                logger.debug(f"Evicting unused hazard samples {path.name}")
+                path.unlink(missing_ok=True)
+
+    @staticmethod
+    def get_key(
+        map_paths: list[Path],
+        exposure: gpd.GeoDataFrame,
+        object_id_column: str,
+        use_area: np.ndarray,
+        area_method: str,
+    ) -> str:
+        """Get the cache key, which changes when the contents of the maps or the exposure geometries change."""
+        sha = hashlib.sha256()
+        for path in map_paths:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    sha.update(chunk)
+        sha.update(str(exposure.crs).encode("utf-8"))
+        sha.update(exposure[object_id_column].to_numpy().astype(str).tobytes())
+        for wkb in shapely.to_wkb(exposure.geometry.to_numpy()):
+            sha.update(wkb)
+        sha.update(np.asarray(use_area, dtype=bool).tobytes())
+        sha.update(area_method.encode("utf-8"))
+        return sha.hexdigest()
+
+
+def sample_hazard_map(
+    path: Path,
+    geometries: gpd.GeoSeries,
+    use_area: np.ndarray,
+    area_method: str = "mean",
+) -> np.ndarray:
+    """Sample a hazard map at geometries.
+
+    Geometries are sampled at the pixel that contains their centroid. For the geometries in `use_area`, the values of
+    the pixels with their center inside the geometry are aggregated with `area_method`, ignoring dry (NaN) pixels.
+    Geometries that do not cover any pixel center are sampled at their centroid.
+
+    Parameters
+    ----------
+    path : Path
+        Path to the hazard map, a GeoTIFF or a netCDF file with a single variable on a regular grid.
+    geometries : gpd.GeoSeries
+        Geometries to sample the map at.
+    use_area : np.ndarray
+        Boolean mask of the geometries whose values are aggregated over their area.
+    area_method : str, optional
+        Aggregation over the area of a geometry, either 'mean' or 'max', by default 'mean'.
+
+    Returns
+    -------
+    np.ndarray
+        Hazard value per geometry, NaN outside the map or where the map is dry.
+    """
+    if area_method not in ("mean", "max"):
+        raise ValueError(f"Unknown area method '{area_method}', use 'mean' or 'max'.")
+    data, transform, crs = _read_hazard_map(Path(path))
+    if crs is not None and geometries.crs is not None and CRS(geometries.crs) != crs:
+        geometries = geometries.to_crs(crs)
+
+    centroids = geometries.centroid
+    values = _sample_points(
+        data, transform, centroids.x.to_numpy(), centroids.y.to_numpy()
+    )
+
+    area_idx = np.flatnonzero(use_area)
+    if area_idx.size == 0:
+        return values
+
+    # overlapping geometries (e.g. several objects on one footprint) would take each other's pixels in a single
+    # rasterization, so every group of non-overlapping geometries is rasterized separately
+    area_geometries = geometries.to_numpy()[area_idx]
+    groups = _get_non_overlapping_groups(area_geometries)
+    ids, pixel_values = [], []
+    for group in range(groups.max() + 1):
+        members = np.flatnonzero(groups == group)
+        burned = rasterize(
+            ((area_geometries[i], i) for i in members),
+            out_shape=data.shape,
+            transform=transform,
+            fill=-1,
+            dtype="int32",
+        )
+        inside = (burned >= 0) & ~np.isnan(data)
+        ids.append(burned[inside])
+        pixel_values.append(data[inside])
+    ids, pixel_values = np.concatenate(ids), np.concatenate(pixel_values)
+    if area_method == "mean":
+        counts = np.bincount(ids, minlength=area_idx.size)
+        sums = np.bincount(ids, weights=pixel_values, minlength=area_idx.size)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            area_values = sums / counts
+    else:
+        area_values = np.full(area_idx.size, -np.inf)
+        np.maximum.at(area_values, ids, pixel_values)
+        area_values[np.isneginf(area_values)] = np.nan
+
+    covered = ~np.isnan(area_values)
+    values[area_idx[covered]] = area_values[covered]
+    return values
+
+
+def _get_non_overlapping_groups(geometries: np.ndarray) -> np.ndarray:
+    """Assign every geometry to a group, so that the geometries within a group do not intersect.
+
+    The groups are assigned greedily in the order of the geometries, so geometries without overlaps are all in group 0.
+    """
+    groups = np.zeros(len(geometries), dtype=np.int64)
+    left, right = shapely.STRtree(geometries).query(geometries, predicate="intersects")
+    # only the overlaps with geometries that are already assigned to a group matter
+    earlier = right < left
+    left, right = left[earlier], right[earlier]
+    if left.size == 0:
+        return groups
+
+    order = np.argsort(left, kind="stable")
+    left, right = left[order], right[order]
+    starts = np.searchsorted(left, np.arange(len(geometries) + 1))
+    for i in np.unique(left):
+        taken = set(groups[right[starts[i] : starts[i + 1]]].tolist())
+        group = 0
+        while group in taken:
+            group += 1
+        groups[i] = group
+    return groups
+
+
+def _sample_points(
+    data: np.ndarray, transform: Affine, x: np.ndarray, y: np.ndarray
+) -> np.ndarray:
+    """Return the values of the pixels that contain the points, NaN outside the map."""
+    # only north-up grids are supported, so the pixel indices follow directly from the transform coefficients
+    cols = np.floor((x - transform.c) / transform.a)
+    rows = np.floor((y - transform.f) / transform.e)
+    n_rows, n_cols = data.shape
+    valid = (rows >= 0) & (rows < n_rows) & (cols >= 0) & (cols < n_cols)
+
+    values = np.full(x.shape, np.nan)
+    values[valid] = data[rows[valid].astype(np.int64), cols[valid].astype(np.int64)]
+    return values
+
+
+def _read_hazard_map(path: Path) -> tuple[np.ndarray, Affine, Optional[CRS]]:
+    """Read a hazard map as a 2D float array with NaN for nodata, and its transform and CRS."""
+    if path.suffix.lower() in (".tif", ".tiff"):
+        with rasterio.open(path) as src:
+            if src.transform.b != 0 or src.transform.d != 0:
+                raise ValueError(f"Rotated hazard maps are not supported: {path}")
+            data = src.read(1, masked=True).astype(np.float64).filled(np.nan)
+            return data, src.transform, CRS(src.crs) if src.crs else None
+
+    with xr.open_dataset(path) as ds:
+        da = ds[list(ds.data_vars)[0]].squeeze(drop=True)
+        da = da.transpose("y", "x").load()
+        crs = da.rio.crs
+
+    x, y = da["x"].to_numpy(), da["y"].to_numpy()
+    dx = x[1] - x[0] if x.size > 1 else 1.0
+    dy = y[1] - y[0] if y.size > 1 else -1.0
+    transform = Affine(dx, 0.0, x[0] - dx / 2, 0.0, dy, y[0] - dy / 2)
+    return da.to_numpy().astype(np.float64), transform, CRS(crs) if crs else None
@@ -0,0 +1,306 @@
+import functools
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Iterable, Optional
+
+import geopandas as gpd
+import pandas as pd
+
+from flood_adapt.misc.log import FloodAdaptLogging
+from flood_adapt.misc.references import ReferenceCounter
+
+logger = FloodAdaptLogging.getLogger("ImpactGeometries")
+
+GEOMETRY_KEY = "geometry_key"
+
+
+class GeometryStore:
+    """Store of the geometries of spatial impact outputs, shared by all scenarios.
+
+    The spatial impact outputs of a scenario (aggregation areas, building footprints and roads) have the same
+    geometries for most scenarios, only their attributes differ. Instead of writing a GeoPackage with all
+    geometries per output, the geometries are written once to a GeoParquet file in the store, with a name that
+    is the content hash of the geometries. Every output then only consists of a Parquet table with the attributes
+    and a `geometry_key` column that refers to a row of the geometry file, and a small JSON file with the
+    location of the geometry file. Use `read_spatial_output` to join them into a GeoDataFrame again, or
+    `export_spatial_outputs` to write self-contained GeoPackages, e.g. to use the outputs outside FloodAdapt.
+
+    Every output written for a scenario references its geometry file. Geometry files that no output references
+    anymore are evicted when the scenario is released or the store is pruned, see `ReferenceCounter`.
+
+    Parameters
+    ----------
+    geometry_dir : Path
+        Directory to store the geometry files in.
+    """
+
+    def __init__(self, geometry_dir: Path):
+        self.geometry_dir = Path(geometry_dir)
+        self._references = ReferenceCounter(
+            self.geometry_dir / "references", self._evict_unreferenced
+        )
+
+    def write(
+        self,
+        gdf: gpd.GeoDataFrame,
+        output_path: os.PathLike,
+        owner: Optional[str] = None,
+    ) -> Path:
+        """Write a spatial output as an attribute table that refers to the shared geometries.
+
+        Parameters
+        ----------
+        gdf : gpd.GeoDataFrame
+            The spatial output to write.
+        output_path : os.PathLike
+            Path of the attribute table, a suffix is replaced by or set to '.parquet'.
+        owner : str, optional
+            Name of the scenario the output belongs to, see `add_reference`. By default, the geometries are not
+            referenced and removed by the next `prune`.
+
+        Returns
+        -------
+        Path
+            Path of the written attribute table.
+        """
+        output_path = _with_suffix(Path(output_path), ".parquet")
+        if any(gdf.index.names) or not isinstance(gdf.index, pd.RangeIndex):
+            # keep a meaningful index as a column, like when writing a GeoPackage
+            gdf = gdf.reset_index()
+        geometry = gdf.geometry
+        # identical geometries are stored once
+        keys, wkbs = pd.factorize(geometry.to_wkb())
+        geometry_path = self._write_geometries(wkbs, geometry.crs)
+
+        attributes = pd.DataFrame(gdf.drop(columns=gdf.geometry.name))
+        attributes[GEOMETRY_KEY] = keys
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        attributes.to_parquet(output_path, index=False)
+        with open(_get_manifest_path(output_path), "w") as f:
+            json.dump(
+                {
+                    "geometry": Path(
+                        os.path.relpath(geometry_path, output_path.parent)
+                    ).as_posix(),
+                    "key": GEOMETRY_KEY,
+                },
+                f,
+            )
+        if owner is not None:
+            self.add_reference(owner, output_path)
+        return output_path
+
+    def add_reference(self, owner: str, output_path: os.PathLike) -> None:
+        """Let a spatial output of a scenario reference its geometry file, e.g. after copying it.
+
+        The geometry file referenced by an earlier output with the same name is evicted if nobody else references it.
+
+        Parameters
+        ----------
+        owner : str
+            Name of the scenario the output belongs to.
+        output_path : os.PathLike
+            Path of the spatial output.
+        """
+        output_path = _with_suffix(Path(output_path), ".parquet")
+        with open(_get_manifest_path(output_path)) as f:
+            key = Path(json.load(f)["geometry"]).stem
+        self._references.set_reference(owner, key, name=output_path.stem)
+
+    def release(self, owner: str) -> None:
+        """Remove the references of a scenario, e.g. after it is deleted, and evict the geometries nobody references.
+
+        Parameters
+        ----------
+        owner : str
+            Name of the scenario.
+        """
+        self._references.release(owner)
+
+    def prune(self, owners: Iterable[str]) -> None:
+        """Remove the references of all scenarios except `owners` and evict the geometries nobody references.
+
+        Parameters
+        ----------
+        owners : Iterable[str]
+            Names of the scenarios that still exist.
+        """
+        self._references.prune(owners)
+
+    def _evict_unreferenced(self, referenced: set[str]) -> None:
+        if not self.geometry_dir.is_dir():
+            return
+        for path in self.geometry_dir.glob("*.parquet"):
+            if path.stem not in referenced:
+                logger.debug(f"Evicting unused geometries {path.name}")
+                path.unlink(missing_ok=True)
+
+    def _write_geometries(self, wkbs: pd.Index, crs) -> Path:
+        """Write the geometries to the store if they are not in it yet, and return the path of their file."""
+        hasher = hashlib.sha256(str(crs.to_wkt() if crs else None).encode())
+        for wkb in wkbs:
+            hasher.update(len(wkb).to_bytes(8, "little"))
+            hasher.update(wkb)
+        geometry_path = self.geometry_dir / f"{hasher.hexdigest()}.parquet"
+        if geometry_path.exists():
+            return geometry_path
+
+        logger.debug(f"Storing {len(wkbs)} geometries in {geometry_path}")
+        self.geometry_dir.mkdir(parents=True, exist_ok=True)
+        geometries = gpd.GeoDataFrame(
+            {GEOMETRY_KEY: range(len(wkbs))},
+            geometry=gpd.GeoSeries.from_wkb(wkbs.to_numpy()),
+            crs=crs,
+        )
+        # write to a temporary file first, so a file with the final name is always complete
+        tmp_path = geometry_path.with_suffix(f".{os.getpid()}.tmp")
+        geometries.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, geometry_path)
+        return geometry_path
+
+
+def read_spatial_output(path: os.PathLike, crs=None) -> gpd.GeoDataFrame:
+    """Read a spatial output written by a `GeometryStore`, or a GeoPackage written by an earlier version.
+
+    Parameters
+    ----------
+    path : os.PathLike
+        Path of the attribute table. If it does not exist, the GeoPackage with the same name is read.
+    crs : optional
+        The CRS to return the geometries in. Defaults to None, for the CRS they are stored in.
+
+    Returns
+    -------
+    gpd.GeoDataFrame
+        The attributes joined with their geometries.
+    """
+    path = _with_suffix(Path(path), ".parquet")
+    if not path.exists():
+        gdf = gpd.read_file(_with_suffix(path, ".gpkg"), engine="pyogrio")
+        return gdf if crs is None else gdf.to_crs(crs)
+
+    with open(_get_manifest_path(path)) as f:
+        manifest = json.load(f)
+    attributes = pd.read_parquet(path)
+    geometries = _read_geometries(
+        path.parent.joinpath(manifest["geometry"]).resolve(), crs
+    )
+    keys = attributes.pop(manifest["key"]).to_numpy()
+    return gpd.GeoDataFrame(
+        attributes,
+        geometry=geometries.take(keys).reset_index(drop=True),
+        crs=geometries.crs,
+    )
+
+
+def spatial_output_exists(path: os.PathLike) -> bool:
+    """Check if a spatial output exists, in the shared geometry layout or as a GeoPackage."""
+    path = Path(path)
+    return (
+        _with_suffix(path, ".parquet").exists() or _with_suffix(path, ".gpkg").exists()
+    )
+
+
+def copy_spatial_output(src: os.PathLike, dst: os.PathLike) -> None:
+    """Copy a spatial output, without copying its shared geometries.
+
+    Parameters
+    ----------
+    src : os.PathLike
+        Path of the spatial output to copy.
+    dst : os.PathLike
+        Path to copy it to. The suffix is replaced by the suffix of the copied file(s).
+    """
+    src, dst = Path(src), Path(dst)
+    if not _with_suffix(src, ".parquet").exists():
+        shutil.copy2(_with_suffix(src, ".gpkg"), _with_suffix(dst, ".gpkg"))
+        return
+
+    src, dst = _with_suffix(src, ".parquet"), _with_suffix(dst, ".parquet")
+    shutil.copy2(src, dst)
+    with open(_get_manifest_path(src)) as f:
+        manifest = json.load(f)
+    # the geometry path is relative to the attribute table
+    geometry_path = src.parent.joinpath(manifest["geometry"]).resolve()
+    manifest["geometry"] = Path(os.path.relpath(geometry_path, dst.parent)).as_posix()
+    with open(_get_manifest_path(dst), "w") as f:
+        json.dump(manifest, f)
+
+
+def export_spatial_outputs(
+    impacts_path: os.PathLike, output_dir: Optional[os.PathLike] = None
+) -> list[Path]:
+    """Export the spatial outputs of a scenario as self-contained GeoPackages.
+
+    The spatial outputs written by a `GeometryStore` only hold attributes and refer to geometries in the
+    `static/geometries` folder of the database, so they cannot be opened or copied on their own. The exported
+    GeoPackages contain the attributes and geometries, like the outputs of earlier versions.
+
+    Parameters
+    ----------
+    impacts_path : os.PathLike
+        Path of the folder with the spatial outputs, e.g. the `Impacts` folder of a scenario.
+    output_dir : os.PathLike, optional
+        Folder to write the GeoPackages to. Defaults to `impacts_path`.
+
+    Returns
+    -------
+    list[Path]
+        Paths of the exported GeoPackages.
+    """
+    impacts_path = Path(impacts_path)
+    output_dir = impacts_path if output_dir is None else Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    exported = []
+    for path in sorted(impacts_path.glob("*.parquet")):
+        if not _get_manifest_path(path).exists():
+            # not a spatial output, e.g. the detailed impacts table
+            continue
+        gpkg_path = _with_suffix(output_dir / path.name, ".gpkg")
+        read_spatial_output(path).to_file(gpkg_path, driver="GPKG", engine="pyogrio")
+        exported.append(gpkg_path)
+    return exported
+
+
+def _with_suffix(path: Path, suffix: str) -> Path:
+    """Replace the suffix of a spatial output file, or add it, so names with dots are kept intact."""
+    if path.suffix in (".parquet", ".gpkg", ".json"):
+        path = path.with_suffix("")
+    return path.with_name(path.name + suffix)
+
+
+def _get_manifest_path(path: Path) -> Path:
+    return _with_suffix(path, ".json")
+
+
+@functools.lru_cache(maxsize=32)
+def _read_geometries(path: Path, crs: Optional[object]) -> gpd.GeoSeries:
+    """Read a geometry file of a `GeometryStore`, which never changes once written, so it can be cached."""
+    geometries = gpd.read_parquet(path).sort_values(GEOMETRY_KEY).geometry
+    geometries = geometries.reset_index(drop=True)
+    return geometries if crs is None else geometries.to_crs(crs)
+
+
+@functools.lru_cache(maxsize=32)
+def _read_static_file(path: Path, mtime: float) -> gpd.GeoDataFrame:
+    return gpd.read_file(path, engine="pyogrio")
+
+
+def read_static_geometries(path: os.PathLike) -> gpd.GeoDataFrame:
+    """Read a static geometry file, e.g. aggregation areas or building footprints, once until it is modified.
+
+    Parameters
+    ----------
+    path : os.PathLike
+        Path of the geometry file.
+
+    Returns
+    -------
+    gpd.GeoDataFrame
+        A copy of the cached contents of the file.
+    """
+    path = Path(path).resolve()
+    return _read_static_file(path, path.stat().st_mtime).copy()
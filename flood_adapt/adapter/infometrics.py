@@ -0,0 +1,464 @@
+import re
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+import numpy as np
+import pandas as pd
+from fiat_toolbox.metrics_writer.fiat_write_metrics_file import (
+    MetricsFileWriter,
+    sql_struct,
+)
+
+from flood_adapt.misc.log import FloodAdaptLogging
+
+logger = FloodAdaptLogging.getLogger("Infometrics")
+
+_TOKEN_PATTERN = re.compile(
+    r"\s*(?:"
+    r"(?P<quoted>`[^`]*`|\"[^\"]*\")"
+    r"|(?P<string>'(?:[^']|'')*')"
+    r"|(?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)"
+    r"|(?P<operator><=|>=|<>|!=|==|=|<|>|\(|\)|,|\*|/|\+|-)"
+    r"|(?P<word>[A-Za-z_][A-Za-z0-9_]*)"
+    r")"
+)
+_COMPARISONS: dict[str, Callable[[Any, Any], Any]] = {
+    "=": np.equal,
+    "==": np.equal,
+    "<>": np.not_equal,
+    "!=": np.not_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+}
+_ARITHMETIC: dict[str, Callable[[Any, Any], Any]] = {
+    "*": np.multiply,
+    "/": np.divide,
+    "+": np.add,
+    "-": np.subtract,
+}
+_AGGREGATES = ("COUNT", "SUM", "AVG", "MIN", "MAX")
+
+
+class UnsupportedQueryError(ValueError):
+    """Raised when a metric query uses SQL that the `MetricsEvaluator` cannot compile."""
+
+
+class MetricsEvaluator:
+    """
+    Evaluate the infometrics of an impacts table in a single vectorized pass.
+
+    The metric configuration files (see `metrics_utils.MetricModel`) define every metric as an SQL query with a
+    select expression like ``SUM(`Total Damage`)`` or ``COUNT(*)`` and a filter like
+    ``"`Primary Object Type` IN ('RES') AND `Inundation Depth` > 0"``. Instead of running a separate query for
+    every metric and aggregation level, the filters are compiled once into boolean masks over the table, and all
+    metrics of all aggregation levels are computed with grouped sums of the masked columns.
+    Compiled filters and aggregation groups are shared by all configuration files written with the same evaluator.
+
+    Queries with SQL that cannot be compiled are run with the SQL engine of `MetricsFileWriter`, so the results
+    are the same either way.
+
+    Parameters
+    ----------
+    table : pd.DataFrame
+        The impacts per object, with the FloodAdapt column names.
+    aggregation_label_fmt : str
+        Format of the aggregation label columns, e.g. ``"Aggregation Label: {name}"``.
+    """
+
+    def __init__(self, table: pd.DataFrame, aggregation_label_fmt: str):
+        self.table = table
+        self.aggregation_label_fmt = aggregation_label_fmt
+        self._masks: dict[str, np.ndarray] = {}
+        self._groups: dict[Optional[str], tuple[np.ndarray, np.ndarray]] = {}
+
+    def write_metrics_files(
+        self, config_path: Union[str, Path], metrics_path: Union[str, Path]
+    ) -> dict[str, Path]:
+        """
+        Write the metrics of a configuration file for the whole area and for every aggregation level.
+
+        The files are written like `MetricsFileWriter.parse_metrics_to_file` does, appending to existing files.
+
+        Parameters
+        ----------
+        config_path : Union[str, Path]
+            Path to the metric configuration file.
+        metrics_path : Union[str, Path]
+            Path to the metrics file of the whole area. The metrics per aggregation level are written next to it,
+            with the name of the aggregation level appended to the file name.
+
+        Returns
+        -------
+        dict[str, Path]
+            The paths of the metrics files per aggregation level.
+        """
+        metrics_path = Path(metrics_path)
+        writer = MetricsFileWriter(
+            config_path, aggregation_label_fmt=self.aggregation_label_fmt
+        )
+
+        config = writer._read_metrics_file(include_aggregates=False)
+        MetricsFileWriter._write_metrics_file(
+            self.evaluate(config), config, metrics_path, write_aggregate=None
+        )
+
+        aggregate_config = writer._read_metrics_file(include_aggregates=True)
+        metrics = {
+            aggregate: self.evaluate(queries, aggregate=aggregate)
+            for aggregate, queries in aggregate_config.items()
+        }
+        paths = {}
+        for aggregate in aggregate_config:
+            paths[aggregate] = metrics_path.with_name(
+                f"{metrics_path.stem}_{aggregate}{metrics_path.suffix}"
+            )
+            MetricsFileWriter._write_metrics_file(
+                metrics,
+                aggregate_config,
+                paths[aggregate],
+                write_aggregate=aggregate,
+                aggregations=self.table[
+                    self.aggregation_label_fmt.format(name=aggregate)
+                ].unique(),
+            )
+        return paths
+
+    def evaluate(
+        self, queries: dict[str, sql_struct], aggregate: Optional[str] = None
+    ) -> dict[str, Any]:
+        """
+        Evaluate metric queries for the whole area or per aggregation area.
+
+        Parameters
+        ----------
+        queries : dict[str, sql_struct]
+            The metric queries by name, as read by `MetricsFileWriter`.
+        aggregate : Optional[str], optional
+            The aggregation level to evaluate the metrics for, or None for the whole area. Defaults to None.
+
+        Returns
+        -------
+        dict[str, Any]
+            The value of every metric or, for an aggregation level, a dictionary with the value per aggregation
+            area that contains objects that pass the filter of the metric.
+        """
+        codes, labels = self._get_groups(aggregate)
+        metrics = {}
+        for name, query in queries.items():
+            try:
+                values, counts = self._evaluate_query(query, codes, len(labels))
+            except UnsupportedQueryError as e:
+                logger.debug(f"Evaluating metric '{name}' with SQL: {e}")
+                metrics[name] = MetricsFileWriter._create_single_metric(
+                    self.table, query
+                )[1]
+                continue
+
+            if aggregate is None:
+                metrics[name] = _to_scalar(values[0])
+            else:
+                # like a GROUP BY, only areas with objects that pass the filter get a value
+                metrics[name] = {
+                    label: _to_scalar(value)
+                    for label, value, count in zip(labels, values, counts)
+                    if count > 0
+                }
+        return metrics
+
+    def _get_groups(self, aggregate: Optional[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Get the group of every object and the labels of the groups, a single group for the whole area."""
+        if aggregate not in self._groups:
+            if aggregate is None:
+                groups = (np.zeros(len(self.table), dtype=np.int64), np.array([None]))
+            else:
+                codes, labels = pd.factorize(
+                    self.table[self.aggregation_label_fmt.format(name=aggregate)]
+                )
+                groups = (codes, np.asarray(labels))
+            self._groups[aggregate] = groups
+        return self._groups[aggregate]
+
+    def _evaluate_query(
+        self, query: sql_struct, codes: np.ndarray, n_groups: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Evaluate a query for every group, and count the objects per group that pass the filter."""
+        function, column, operations = _parse_select(query.select)
+        mask = self._get_mask(query.filter) & (codes >= 0)
+
+        counts = np.bincount(codes[mask], minlength=n_groups)
+        if function == "COUNT" and column is None:
+            values = counts.astype(np.int64)
+        else:
+            series = self._get_column(column)
+            if function == "COUNT":
+                values = np.bincount(
+                    codes[mask & series.notna().to_numpy()], minlength=n_groups
+                )
+            else:
+                values = _aggregate(function, codes, n_groups, mask, series)
+
+        for operator, number in operations:
+            values = _ARITHMETIC[operator](values, number)
+        return values, counts
+
+    def _get_mask(self, filter: str) -> np.ndarray:
+        """Get the rows of the table that pass a filter."""
+        if filter not in self._masks:
+            if not filter.strip():
+                self._masks[filter] = np.ones(len(self.table), dtype=bool)
+            else:
+                parser = _FilterParser(filter, self._get_column)
+                self._masks[filter] = parser.parse().to_numpy(
+                    dtype=bool, na_value=False
+                )
+        return self._masks[filter]
+
+    def _get_column(self, name: str) -> pd.Series:
+        if name not in self.table.columns:
+            raise UnsupportedQueryError(f"unknown column '{name}'")
+        return self.table[name]
+
+
+def _aggregate(
+    function: str, codes: np.ndarray, n_groups: int, mask: np.ndarray, series: pd.Series
+) -> np.ndarray:
+    """Aggregate the non-null values of the masked rows per group, NaN for groups without values like SQL."""
+    valid = mask & series.notna().to_numpy()
+    if function in ("MIN", "MAX"):
+        # MIN and MAX keep the type of the column like SQL
+        grouped = pd.Series(series.to_numpy()[valid]).groupby(codes[valid])
+        extremes = grouped.min() if function == "MIN" else grouped.max()
+        values = np.full(n_groups, np.nan, dtype=object)
+        values[extremes.index.to_numpy(dtype=np.int64)] = extremes.to_numpy()
+        return values
+
+    x = series.to_numpy(dtype=float, na_value=np.nan)
+    count = np.bincount(codes[valid], minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values = np.bincount(codes[valid], weights=x[valid], minlength=n_groups)
+        if function == "AVG":
+            values = values / count
+    return np.where(count > 0, values, np.nan)
+
+
+def _to_scalar(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _tokenize(sql: str) -> list[tuple[str, str]]:
+    tokens = []
+    position = 0
+    sql = sql.rstrip()
+    while position < len(sql):
+        match = _TOKEN_PATTERN.match(sql, position)
+        if match is None or match.end() == position:
+            raise UnsupportedQueryError(f"cannot parse '{sql[position:]}'")
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == "quoted":
+            text = text[1:-1]
+        elif kind == "string":
+            text = text[1:-1].replace("''", "'")
+        elif kind == "word":
+            text = text.upper() if text.upper() in _KEYWORDS else text
+        tokens.append((kind, text))
+        position = match.end()
+    return tokens
+
+
+_KEYWORDS = {"AND", "OR", "NOT", "IN", "IS", "NULL", *_AGGREGATES}
+
+
+def _parse_select(select: str) -> tuple[str, Optional[str], list[tuple[str, float]]]:
+    """
+    Parse a select expression of an aggregate with constant arithmetic, like ``SUM(`Total Damage`)*0.001``.
+
+    Returns the aggregate function, the column (None for ``COUNT(*)``) and the arithmetic operations, in the order
+    in which they apply to the aggregate when the operator precedence of SQL is honoured.
+    """
+    tokens = _tokenize(select)
+    if (
+        len(tokens) < 4
+        or tokens[0][1] not in _AGGREGATES
+        or tokens[1][1] != "("
+        or tokens[3][1] != ")"
+    ):
+        raise UnsupportedQueryError(f"unsupported select '{select}'")
+    function = tokens[0][1]
+    kind, column = tokens[2]
+    if column == "*" and kind == "operator":
+        if function != "COUNT":
+            raise UnsupportedQueryError(f"unsupported select '{select}'")
+        column = None
+    elif kind not in ("quoted", "word") or column in _KEYWORDS:
+        raise UnsupportedQueryError(f"unsupported select '{select}'")
+
+    operations: list[tuple[str, float]] = []
+    rest = tokens[4:]
+    while rest:
+        if len(rest) < 2 or rest[0][1] not in _ARITHMETIC or rest[1][0] != "number":
+            raise UnsupportedQueryError(f"unsupported select '{select}'")
+        operator, number = rest[0][1], float(rest[1][1])
+        if operator in ("*", "/") and operations and operations[-1][0] in ("+", "-"):
+            # `*` and `/` bind tighter than `+` and `-`, so they apply to the constant that is added or subtracted
+            if operator == "/" and number == 0:
+                raise UnsupportedQueryError(f"division by zero in '{select}'")
+            previous, constant = operations[-1]
+            operations[-1] = (previous, float(_ARITHMETIC[operator](constant, number)))
+        else:
+            operations.append((operator, number))
+        rest = rest[2:]
+    return function, column, operations
+
+
+class _FilterParser:
+    """
+    Compile an SQL filter into a nullable boolean array with SQL three-valued logic.
+
+    Supported are AND, OR, NOT, parentheses, comparisons of columns and literals, [NOT] IN lists and IS [NOT] NULL.
+    """
+
+    def __init__(self, sql: str, get_column: Callable[[str], pd.Series]):
+        self.sql = sql
+        self.tokens = _tokenize(sql)
+        self.position = 0
+        self.get_column = get_column
+
+    def parse(self) -> pd.arrays.BooleanArray:
+        result = self._or()
+        if self.position != len(self.tokens):
+            raise UnsupportedQueryError(f"unsupported filter '{self.sql}'")
+        return result
+
+    def _peek(self) -> Optional[str]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position][1]
+        return None
+
+    def _next(self) -> tuple[str, str]:
+        if self.position >= len(self.tokens):
+            raise UnsupportedQueryError(f"unexpected end of filter '{self.sql}'")
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def _expect(self, text: str) -> None:
+        if self._next()[1] != text:
+            raise UnsupportedQueryError(f"expected '{text}' in filter '{self.sql}'")
+
+    def _or(self) -> pd.arrays.BooleanArray:
+        result = self._and()
+        while self._peek() == "OR":
+            self._next()
+            result = result | self._and()
+        return result
+
+    def _and(self) -> pd.arrays.BooleanArray:
+        result = self._not()
+        while self._peek() == "AND":
+            self._next()
+            result = result & self._not()
+        return result
+
+    def _not(self) -> pd.arrays.BooleanArray:
+        if self._peek() == "NOT":
+            self._next()
+            return ~self._not()
+        return self._predicate()
+
+    def _predicate(self) -> pd.arrays.BooleanArray:
+        if self._peek() == "(":
+            self._next()
+            result = self._or()
+            self._expect(")")
+            return result
+
+        left = self._operand()
+        token = self._peek()
+        if token in _COMPARISONS:
+            self._next()
+            return _compare(_COMPARISONS[token], left, self._operand())
+        if token == "IS":
+            self._next()
+            negate = self._peek() == "NOT"
+            if negate:
+                self._next()
+            self._expect("NULL")
+            if not isinstance(left, pd.Series):
+                raise UnsupportedQueryError(f"IS NULL without a column in '{self.sql}'")
+            is_null = left.isna().to_numpy()
+            return pd.array(~is_null if negate else is_null, dtype="boolean")
+        negate = token == "NOT"
+        if negate:
+            self._next()
+        if self._peek() == "IN":
+            self._next()
+            result = self._in(left)
+            return ~result if negate else result
+        raise UnsupportedQueryError(f"unsupported filter '{self.sql}'")
+
+    def _in(self, left: Any) -> pd.arrays.BooleanArray:
+        self._expect("(")
+        values = [self._literal()]
+        while self._peek() == ",":
+            self._next()
+            values.append(self._literal())
+        self._expect(")")
+        if any(value is None for value in values):
+            raise UnsupportedQueryError(f"NULL in IN list of filter '{self.sql}'")
+        if not isinstance(left, pd.Series):
+            raise UnsupportedQueryError(f"IN without a column in filter '{self.sql}'")
+        # NULL IN (...) is NULL
+        return pd.arrays.BooleanArray(
+            left.isin(values).to_numpy(), left.isna().to_numpy()
+        )
+
+    def _operand(self) -> Any:
+        kind, text = self.tokens[self.position] if self._peek() else ("", "")
+        if kind == "quoted" or (kind == "word" and text not in _KEYWORDS):
+            self._next()
+            return self.get_column(text)
+        return self._literal()
+
+    def _literal(self) -> Any:
+        kind, text = self._next()
+        sign = 1
+        if kind == "operator" and text in ("-", "+"):
+            sign = -1 if text == "-" else 1
+            kind, text = self._next()
+        if kind == "number":
+            return sign * float(text)
+        if kind == "string" and sign == 1:
+            return text
+        if kind == "word" and text == "NULL":
+            return None
+        raise UnsupportedQueryError(f"unsupported value '{text}' in '{self.sql}'")
+
+
+def _compare(operator: Callable, left: Any, right: Any) -> pd.arrays.BooleanArray:
+    """Compare columns and literals, NULL if either side is NULL."""
+    if not isinstance(left, pd.Series) and not isinstance(right, pd.Series):
+        raise UnsupportedQueryError("comparison without a column")
+    if left is None or right is None:
+        length = len(left if isinstance(left, pd.Series) else right)
+        return pd.array([None] * length, dtype="boolean")
+
+    for side, other in ((left, right), (right, left)):
+        if isinstance(side, pd.Series) and isinstance(other, (float, str)):
+            numeric = pd.api.types.is_numeric_dtype(side)
+            if numeric != isinstance(other, float):
+                raise UnsupportedQueryError(
+                    "comparison of a column with a literal of another type"
+                )
+
+    left_values = left.to_numpy() if isinstance(left, pd.Series) else left
+    right_values = right.to_numpy() if isinstance(right, pd.Series) else right
+    is_null = np.asarray(pd.isna(left_values)) | np.asarray(pd.isna(right_values))
+    with np.errstate(invalid="ignore"):
+        try:
+            result = np.asarray(operator(left_values, right_values), dtype=bool)
+        except TypeError as e:
+            raise UnsupportedQueryError(str(e)) from e
+    return pd.arrays.BooleanArray(result & ~is_null, is_null)
@@ -0,0 +1,265 @@
+import asyncio
+import re
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import Future
+from os import PathLike
+from pathlib import Path
+from typing import Callable, Optional, Sequence, TextIO
+
+from flood_adapt.misc.log import FloodAdaptLogging
+
+logger = FloodAdaptLogging.getLogger("ModelRun")
+
+# SFINCS reports its progress as lines like `  10% complete,       1.2 s remaining ...`
+SFINCS_PROGRESS_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*%\s*complete")
+
+
+class ModelRun:
+    """Handle of a model executable running in a subprocess.
+
+    The output of the executable (stdout and stderr) is streamed line by line to `on_line` while the model runs,
+    instead of being buffered in memory until it finishes. Only the last `tail_size` lines are kept, see `tail`.
+    If a `progress_pattern` is given, the progress percentages reported by the model are parsed from the output
+    and passed to `on_progress`.
+
+    The run can be stopped with `cancel`, or automatically after `timeout` seconds of wall-clock time. A stopped run
+    is finished like a crashed run, with `failure_reason` describing why it stopped.
+
+    The run is executed either in the calling thread with `run`, or in a background thread with `start`. In the
+    latter case, the handle can be waited on from another thread with `result`, or from an asyncio event loop
+    with `wait_async`.
+
+    Parameters
+    ----------
+    args : Sequence[str]
+        Executable and arguments to run.
+    cwd : PathLike
+        Working directory of the executable.
+    on_line : Callable[[str], None]
+        Called with every line of output, without the trailing newline.
+    on_exit : Callable[[ModelRun], bool], optional
+        Called once the executable has exited, to finish the run (e.g. clean up the simulation folder). It is also
+        called if the executable could not be started or its output could not be read, with the exception stored in
+        `error`. Its return value, or any exception it raises, is the result of the run. By default, the run succeeds
+        if the executable exited with return code 0, and the exception in `error` is raised if there is one.
+    progress_pattern : re.Pattern, optional
+        Pattern with one group that captures the progress percentage in a line of output.
+    on_progress : Callable[[float], None], optional
+        Called with the progress percentage (0-100) every time the model reports progress.
+    timeout : float, optional
+        Maximum wall-clock time of the run in seconds, by default no maximum.
+    tail_size : int, optional
+        Number of output lines to keep, by default 50.
+    log_file : PathLike, optional
+        File the output is appended to. It is owned by the run: it is opened when the run starts and closed before
+        `on_exit` is called, so concurrent runs never write to each other's log file.
+    """
+
+    #: Seconds to wait for the executable to exit after it is asked to terminate, before it is killed.
+    TERMINATE_GRACE_PERIOD = 10.0
+
+    def __init__(
+        self,
+        args: Sequence[str],
+        cwd: PathLike,
+        on_line: Callable[[str], None],
+        on_exit: Optional[Callable[["ModelRun"], bool]] = None,
+        progress_pattern: Optional[re.Pattern] = None,
+        on_progress: Optional[Callable[[float], None]] = None,
+        timeout: Optional[float] = None,
+        tail_size: int = 50,
+        log_file: Optional[PathLike] = None,
+    ):
+        self.args = [str(arg) for arg in args]
+        self.cwd = Path(cwd)
+        self.timeout = timeout
+        self.log_file = Path(log_file) if log_file is not None else None
+        self.progress: Optional[float] = None
+        self.returncode: Optional[int] = None
+        self.cancelled = False
+        self.timed_out = False
+        self.error: Optional[BaseException] = None
+
+        self._on_line = on_line
+        self._on_exit = on_exit
+        self._progress_pattern = progress_pattern
+        self._on_progress = on_progress
+        self._tail: deque[str] = deque(maxlen=tail_size)
+        self._log: Optional[TextIO] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._future: Future = Future()
+        self._lock = threading.Lock()
+        self._started = False
+
+    @property
+    def tail(self) -> list[str]:
+        """Return the last lines of output of the model."""
+        return list(self._tail)
+
+    @property
+    def failure_reason(self) -> Optional[str]:
+        """Return why the run failed, or None if it did not (yet) fail."""
+        if self.cancelled:
+            return "the run was cancelled"
+        if self.timed_out:
+            return f"the run did not finish within {self.timeout} seconds"
+        if self.error is not None:
+            return f"the model could not be run: {self.error}"
+        if self.returncode not in (None, 0):
+            return f"the model exited with return code {self.returncode}"
+        return None
+
+    def run(self) -> bool:
+        """Run the model in the calling thread and return the result, see `result`."""
+        self._claim()
+        self._execute()
+        return self.result()
+
+    def start(self) -> "ModelRun":
+        """Start the model in a background thread and return the handle."""
+        self._claim()
+        threading.Thread(
+            target=self._execute, name=f"ModelRun-{self.cwd.name}", daemon=True
+        ).start()
+        return self
+
+    def done(self) -> bool:
+        """Return True if the run has finished."""
+        return self._future.done()
+
+    def result(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the run to finish and return True if it succeeded.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum number of seconds to wait, by default wait until the run finishes.
+            This does not stop the run, see `cancel`.
+
+        Raises
+        ------
+        concurrent.futures.TimeoutError
+            If the run did not finish within `timeout` seconds.
+        Exception
+            Any exception raised while running the model or by `on_exit`.
+        """
+        return self._future.result(timeout=timeout)
+
+    async def wait_async(self) -> bool:
+        """Wait for the run to finish from an asyncio event loop, see `result`."""
+        return await asyncio.wrap_future(self._future)
+
+    def cancel(self) -> None:
+        """Stop the model. Does nothing if the run has already finished."""
+        self._stop(timed_out=False)
+
+    def _claim(self):
+        with self._lock:
+            if self._started:
+                raise RuntimeError("A model run can only be started once.")
+            self._started = True
+
+    def _execute(self):
+        timer = None
+        try:
+            with self._lock:
+                if self.cancelled:
+                    raise RuntimeError("The run was cancelled before it started.")
+                if self.log_file is not None:
+                    self._log = open(self.log_file, "a", encoding="utf-8")
+                self._process = subprocess.Popen(
+                    self.args,
+                    cwd=self.cwd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                    errors="replace",
+                    bufsize=1,
+                )
+            if self.timeout is not None:
+                timer = threading.Timer(
+                    self.timeout, self._stop, kwargs={"timed_out": True}
+                )
+                timer.daemon = True
+                timer.start()
+
+            assert self._process.stdout is not None
+            for line in self._process.stdout:
+                self._handle_line(line.rstrip("\r\n"))
+            self.returncode = self._process.wait()
+        except BaseException as e:
+            # the run is still finished by `on_exit`, e.g. to close its log file
+            self.error = e
+            if self._process is not None and self._process.poll() is None:
+                self._process.kill()
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+        try:
+            if self._on_exit is not None:
+                result = self._on_exit(self)
+            elif self.error is not None:
+                raise self.error
+            else:
+                result = self.failure_reason is None
+        except BaseException as e:
+            if self.error is not None and e is not self.error and e.__cause__ is None:
+                e.__cause__ = self.error
+            self._future.set_exception(e)
+        else:
+            if self.error is not None and not isinstance(self.error, Exception):
+                # e.g. KeyboardInterrupt, which should not be swallowed by `on_exit`
+                self._future.set_exception(self.error)
+            else:
+                self._future.set_result(result)
+
+    def _handle_line(self, line: str):
+        self._tail.append(line)
+        if self._log is not None:
+            self._log.write(f"{line}\n")
+        self._on_line(line)
+
+        if self._progress_pattern is None:
+            return
+        match = self._progress_pattern.search(line)
+        if match is None:
+            return
+        self.progress = float(match.group(1))
+        if self._on_progress is not None:
+            try:
+                self._on_progress(self.progress)
+            except Exception as e:
+                # a failing progress callback should never break the model run
+                logger.warning(f"Progress callback failed: {e}")
+
+    def _stop(self, timed_out: bool):
+        with self._lock:
+            if self.done() or self.returncode is not None:
+                return
+            if timed_out:
+                self.timed_out = True
+            else:
+                self.cancelled = True
+            process = self._process
+
+        if process is None:
+            return
+        logger.info(f"Stopping model run in {self.cwd}: {self.failure_reason}")
+        process.terminate()
+        # kill the model if it ignores the request to terminate, without blocking the caller
+        killer = threading.Timer(
+            self.TERMINATE_GRACE_PERIOD, self._kill_if_running, args=(process,)
+        )
+        killer.daemon = True
+        killer.start()
+
+    @staticmethod
+    def _kill_if_running(process: subprocess.Popen):
+        if process.poll() is None:
+            process.kill()
@@ -2,10 +2,10 @@ import logging
 import math
 import os
 import shutil
-import subprocess
-import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack, nullcontext
 from pathlib import Path
-from typing import Optional, Union
+from typing import Callable, ContextManager, Optional, Union
 
 import geopandas as gpd
 import hydromt_sfincs.utils as utils
@@ -20,19 +20,22 @@ from cht_tide.read_bca import SfincsBoundary
 from cht_tide.tide_predict import predict
 from hydromt_sfincs import SfincsModel as HydromtSfincsModel
 from hydromt_sfincs.quadtree import QuadtreeGrid
-from numpy import matlib
 from shapely.affinity import translate
 
 from flood_adapt.adapter.interface.hazard_adapter import IHazardAdapter
+from flood_adapt.adapter.model_run import SFINCS_PROGRESS_PATTERN, ModelRun
+from flood_adapt.adapter.sfincs_downscaling import IndexDownscaler
+from flood_adapt.adapter.sfincs_results import SfincsResultReader
 from flood_adapt.config.config import Settings
 from flood_adapt.config.site import Site
+from flood_adapt.misc.exceptions import DatabaseError
 from flood_adapt.misc.log import FloodAdaptLogging
 from flood_adapt.misc.path_builder import (
     ObjectDir,
     TopLevelDir,
     db_path,
 )
-from flood_adapt.misc.utils import cd, resolve_filepath
+from flood_adapt.misc.utils import cd, link_or_copy, resolve_filepath
 from flood_adapt.objects.events.event_set import EventSet
 from flood_adapt.objects.events.events import Event, Mode, Template
 from flood_adapt.objects.events.hurricane import TranslationModel
@@ -105,6 +108,9 @@ class SfincsAdapter(IHazardAdapter):
     _site: Site
     _model: HydromtSfincsModel
 
+    # config keys of the static grid files, which are hard-linked instead of copied by `materialize`
+    _STATIC_FILE_KEYS = ["sbgfile", "depfile", "mskfile", "indexfile", "qtrfile"]
+
     ###############
     ### PUBLIC ####
     ###############
@@ -126,6 +132,7 @@ class SfincsAdapter(IHazardAdapter):
             logger=self._setup_sfincs_logger(model_root),
         )
         self._model.read()
+        self._grid_modified = False
 
     def read(self, path: Path):
         """Read the sfincs model from the current model root."""
@@ -150,6 +157,54 @@ class SfincsAdapter(IHazardAdapter):
             self._model.set_root(root=path_out.as_posix(), mode=write_mode)
             self._model.write()
 
+    def materialize(self, path_out: Union[str, os.PathLike]):
+        """Materialize the sfincs model in a directory, without writing the static model files.
+
+        The static grid files (e.g. subgrid tables, depth, mask and index files) are hard-linked into `path_out`,
+        falling back to a copy if the file system does not support hard links. All other files are copied.
+        The model root is set to `path_out`, so that changes to the model can be written there with `write_modified`.
+        """
+        root = self.get_model_root()
+        if not isinstance(path_out, Path):
+            path_out = Path(path_out).resolve()
+
+        static_files = {
+            Path(self._model.get_config(key, abs_path=True)).resolve()
+            for key in self._STATIC_FILE_KEYS
+            if self._model.get_config(key) is not None
+        }
+
+        def _link_static_or_copy(src: str, dst: str):
+            if Path(src).resolve() not in static_files:
+                return shutil.copy2(src, dst)
+            return link_or_copy(src, dst)
+
+        if root != path_out:
+            shutil.copytree(
+                root, path_out, dirs_exist_ok=True, copy_function=_link_static_or_copy
+            )
+        self._model.set_root(root=path_out.as_posix(), mode="w+")
+
+    def write_modified(self):
+        """Write the parts of the sfincs model that can be changed by forcings, measures and projections to the model root.
+
+        The static grid files are only written when the grid was modified (e.g. by green infrastructure).
+        Hard links created by `materialize` are replaced by copies before writing, so the template model is never modified.
+        """
+        with cd(self.get_model_root()):
+            if self._grid_modified:
+                for key in self._STATIC_FILE_KEYS:
+                    if key == "sbgfile" or self._model.get_config(key) is None:
+                        continue
+                    self._break_hard_link(
+                        Path(self._model.get_config(key, abs_path=True))
+                    )
+                self._model.write_grid()
+            self._model.write_geoms()
+            self._model.write_forcing()
+            # config last; might be updated when writing the grid or forcing
+            self._model.write_config()
+
     def close_files(self):
         """Close all open files and clean up file handles."""
         for _logger in [logger, self.sfincs_logger]:
@@ -170,10 +225,18 @@ class SfincsAdapter(IHazardAdapter):
         """Check if the model has been run."""
         return self.run_completed(scenario)
 
-    def execute(self, path: Path, strict: bool = True) -> bool:
+    def execute(
+        self,
+        path: Path,
+        strict: bool = True,
+        timeout: Optional[float] = None,
+        on_progress: Optional[Callable[[float], None]] = None,
+    ) -> bool:
         """
         Run the sfincs executable in the specified path.
 
+        The output of SFINCS is streamed to `sfincs_model.log` in the simulation folder while it runs.
+
         Parameters
         ----------
         path : str
@@ -183,6 +246,11 @@ class SfincsAdapter(IHazardAdapter):
             True: raise an error if the model fails to run.
             False: log a warning.
             Default is True.
+        timeout : float, optional
+            Maximum wall-clock time of the simulation in seconds, after which it is stopped and considered failed.
+            Default is None, which means no maximum.
+        on_progress : Callable[[float], None], optional
+            Called with the progress percentage (0-100) every time SFINCS reports progress.
 
         Returns
         -------
@@ -190,42 +258,81 @@ class SfincsAdapter(IHazardAdapter):
             True if the model ran successfully, False otherwise.
 
         """
+        return self._create_model_run(path, strict, timeout, on_progress).run()
+
+    def start_execution(
+        self,
+        path: Path,
+        strict: bool = True,
+        timeout: Optional[float] = None,
+        on_progress: Optional[Callable[[float], None]] = None,
+    ) -> ModelRun:
+        """
+        Start the sfincs executable in the specified path in a background thread.
+
+        See `execute` for the parameters. The returned handle can be used to follow the progress, cancel the
+        simulation and wait for it, from a thread (`ModelRun.result`) or an asyncio event loop (`ModelRun.wait_async`).
+        The result of the handle is the return value of `execute`.
+
+        Returns
+        -------
+        ModelRun
+            Handle of the running simulation.
+
+        """
+        return self._create_model_run(path, strict, timeout, on_progress).start()
+
+    def _create_model_run(
+        self,
+        path: Path,
+        strict: bool,
+        timeout: Optional[float],
+        on_progress: Optional[Callable[[float], None]],
+    ) -> ModelRun:
         sfincs_bin = Settings().sfincs_bin_path
         if not sfincs_bin or not sfincs_bin.exists():
             raise FileNotFoundError(
                 f"SFINCS binary not found at {sfincs_bin}. Please check your settings."
             )
+        path = Path(path)
+
+        # Pass the working directory to the subprocess instead of changing the cwd of the
+        # whole process, so multiple simulations can be executed from different threads.
+        # The output is written to the log file of the simulation folder by the run itself, instead of the global
+        # `SfincsModel` logger, which is reset whenever another SfincsAdapter is created.
+        logger.info(f"Running SFINCS in {path}")
+        return ModelRun(
+            args=[sfincs_bin.as_posix()],
+            cwd=path,
+            on_line=logger.debug,
+            log_file=path / "sfincs_model.log",
+            on_exit=lambda run: self._finish_execution(path, run, strict),
+            progress_pattern=SFINCS_PROGRESS_PATTERN,
+            on_progress=on_progress,
+            timeout=timeout,
+        )
 
-        with cd(path):
-            logger.info(f"Running SFINCS in {path}")
-            process = subprocess.run(
-                sfincs_bin.as_posix(),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            self.sfincs_logger.info(process.stdout)
-            logger.debug(process.stdout)
-
+    def _finish_execution(self, path: Path, run: ModelRun, strict: bool) -> bool:
         self._cleanup_simulation_folder(path)
 
-        if process.returncode != 0:
-            if Settings().delete_crashed_runs:
-                # Remove all files in the simulation folder except for the log files
-                for subdir, dirs, files in os.walk(path, topdown=False):
-                    for file in files:
-                        if not file.endswith(".log"):
-                            os.remove(os.path.join(subdir, file))
+        if run.failure_reason is None:
+            return True
 
-                    if not os.listdir(subdir):
-                        shutil.rmtree(subdir, ignore_errors=True)
+        if Settings().delete_crashed_runs:
+            # Remove all files in the simulation folder except for the log files
+            for subdir, dirs, files in os.walk(path, topdown=False):
+                for file in files:
+                    if not file.endswith(".log"):
+                        os.remove(os.path.join(subdir, file))
 
-            if strict:
-                raise RuntimeError(f"SFINCS model failed to run in {path}.")
-            else:
-                logger.error(f"SFINCS model failed to run in {path}.")
+                if not os.listdir(subdir):
+                    shutil.rmtree(subdir, ignore_errors=True)
 
-        return process.returncode == 0
+        message = f"SFINCS model failed to run in {path}: {run.failure_reason}."
+        if strict:
+            raise RuntimeError(message)
+        logger.error(message)
+        return False
 
     def run(self, scenario: Scenario):
         """Run the whole workflow (Preprocess, process and postprocess) for a given scenario."""
@@ -263,9 +370,9 @@ class SfincsAdapter(IHazardAdapter):
             logger.info(
                 f"Preprocessing Scenario `{model._scenario.name}`: {is_risk}Event `{model._event.name}`, Strategy `{model._strategy.name}`, Projection `{model._projection.name}`"
             )
-            # Write template model to output path and set it as the model root so focings can write to it
+            # Materialize template model in the output path and set it as the model root so forcings can write to it
             model.set_timing(model._event.time)
-            model.write(sim_path)
+            model.materialize(sim_path)
 
             # Event
             for forcing in model._event.get_forcings():
@@ -288,7 +395,7 @@ class SfincsAdapter(IHazardAdapter):
             model.add_obs_points()
 
             # Save any changes made to disk as well
-            model.write(path_out=sim_path)
+            model.write_modified()
 
     def process(self, scenario: Scenario, event: Event):
         if event.mode != Mode.single_event:
@@ -303,14 +410,15 @@ class SfincsAdapter(IHazardAdapter):
             raise ValueError(f"Unsupported event mode: {event.mode}.")
 
         logger.info(f"Postprocessing SFINCS for Scenario `{scenario.name}`")
-        if not self.sfincs_completed(
-            self._get_simulation_path(scenario, sub_event=event)
-        ):
+        sim_path = self._get_simulation_path(scenario, sub_event=event)
+        if not self.sfincs_completed(sim_path):
             raise RuntimeError("SFINCS was not run successfully!")
 
-        self.write_floodmap_geotiff(scenario)
-        self.plot_wl_obs(scenario)
-        self.write_water_level_map(scenario)
+        # open the results once and share them between all postprocessing steps
+        with SfincsResultReader(sim_path) as results:
+            self.write_floodmap_geotiff(scenario, sim_path=sim_path, results=results)
+            self.plot_wl_obs(scenario, results=results)
+            self.write_water_level_map(scenario, sim_path=sim_path, results=results)
 
     def set_timing(self, time: TimeFrame):
         """Set model reference times."""
@@ -393,9 +501,8 @@ class SfincsAdapter(IHazardAdapter):
 
     def get_bedlevel(self):
         """Get bed level from model."""
-        self._model.read_results()
-        zb = self._model.results["zb"]
-        return zb
+        with SfincsResultReader(self.get_model_root()) as results:
+            return results.get_zb()
 
     def get_model_boundary(self) -> gpd.GeoDataFrame:
         """Get bounding box from model."""
@@ -529,7 +636,10 @@ class SfincsAdapter(IHazardAdapter):
         return all(output.exists() for output in to_check)
 
     def write_floodmap_geotiff(
-        self, scenario: Scenario, sim_path: Optional[Path] = None
+        self,
+        scenario: Scenario,
+        sim_path: Optional[Path] = None,
+        results: Optional[SfincsResultReader] = None,
     ):
         """
         Read simulation results from SFINCS and saves a geotiff with the maximum water levels.
@@ -542,51 +652,38 @@ class SfincsAdapter(IHazardAdapter):
             Scenario for which to create the floodmap.
         sim_path : Path, optional
             Path to the simulation folder, by default None.
+        results : SfincsResultReader, optional
+            Reader of the simulation results, by default None. If None, the results are read from `sim_path`.
         """
         logger.info("Writing flood maps to geotiff")
         results_path = self._get_result_path(scenario)
         sim_path = sim_path or self._get_simulation_path(scenario)
-        demfile = self.database.static_path / "dem" / self.settings.dem.filename
-
-        with SfincsAdapter(model_root=sim_path) as model:
-            zsmax = model._get_zsmax()
-
-            dem = model._model.data_catalog.get_rasterdataset(demfile)
 
-            # convert dem from dem units to floodmap units
-            dem_conversion = us.UnitfulLength(
-                value=1.0, units=self.settings.dem.units
-            ).convert(self.settings.config.floodmap_units)
-
-            floodmap_fn = results_path / f"FloodMap_{scenario.name}.tif"
-
-            # convert zsmax from meters to floodmap units
-            floodmap_conversion = us.UnitfulLength(
-                value=1.0, units=us.UnitTypesLength.meters
-            ).convert(self.settings.config.floodmap_units)
-
-            utils.downscale_floodmap(
-                zsmax=floodmap_conversion * zsmax,
-                dep=dem_conversion * dem,
-                hmin=0.01,
-                floodmap_fn=floodmap_fn.as_posix(),
+        with self._open_results(sim_path, results) as results:
+            self._write_floodmap_geotiffs(
+                zsmax_maps=[results.get_zsmax().load()],
+                floodmap_fns=[results_path / f"FloodMap_{scenario.name}.tif"],
             )
 
     def write_water_level_map(
-        self, scenario: Scenario, sim_path: Optional[Path] = None
+        self,
+        scenario: Scenario,
+        sim_path: Optional[Path] = None,
+        results: Optional[SfincsResultReader] = None,
     ):
         """Read simulation results from SFINCS and saves a netcdf with the maximum water levels."""
         logger.info("Writing water level map to netcdf")
         results_path = self._get_result_path(scenario)
         sim_path = sim_path or self._get_simulation_path(scenario)
 
-        with SfincsAdapter(model_root=sim_path) as model:
-            zsmax = model._get_zsmax()
+        with self._open_results(sim_path, results) as results:
+            zsmax = results.get_zsmax().load()
             zsmax.to_netcdf(results_path / "max_water_level_map.nc")
 
     def plot_wl_obs(
         self,
         scenario: Scenario,
+        results: Optional[SfincsResultReader] = None,
     ):
         """Plot water levels at SFINCS observation points as html.
 
@@ -599,9 +696,9 @@ class SfincsAdapter(IHazardAdapter):
         logger.info("Plotting water levels at observation points")
         sim_path = self._get_simulation_path(scenario)
 
-        # read SFINCS model
-        with SfincsAdapter(model_root=sim_path) as model:
-            df, gdf = model._get_zs_points()
+        # read SFINCS results
+        with self._open_results(sim_path, results) as results:
+            df, gdf = self._get_zs_points(results)
 
         gui_units = us.UnitTypesLength(
             self.database.site.gui.units.default_length_units
@@ -717,7 +814,7 @@ class SfincsAdapter(IHazardAdapter):
         return wl_df
 
     ## RISK EVENTS ##
-    def calculate_rp_floodmaps(self, scenario: Scenario):
+    def calculate_rp_floodmaps(self, scenario: Scenario, tile_size: int = 1_000_000):
         """Calculate flood risk maps from a set of (currently) SFINCS water level outputs using linear interpolation.
 
         It would be nice to make it more widely applicable and move the loading of the SFINCS results to self.postprocess_sfincs().
@@ -725,7 +822,15 @@ class SfincsAdapter(IHazardAdapter):
         generates return period water level maps in netcdf format to be used by FIAT
         generates return period water depth maps in geotiff format as product for users
 
-        TODO: make this robust and more efficient for bigger datasets.
+        The water levels of the sub-events are opened lazily and read in tiles of grid rows,
+        so the peak memory depends on `tile_size` and not on the number of events.
+
+        Parameters
+        ----------
+        scenario : Scenario
+            The risk scenario to calculate the flood maps for.
+        tile_size : int, optional
+            The (approximate) number of grid cells that are read from all events at once, by default 1_000_000.
         """
         event: EventSet = self.database.events.get(scenario.event, load_all=True)
         if not isinstance(event, EventSet):
@@ -752,62 +857,104 @@ class SfincsAdapter(IHazardAdapter):
                     frequencies[ii] = frequencies[ii] * (1 + storminess_increase)
 
         with SfincsAdapter(model_root=sim_paths[0]) as dummymodel:
-            # read mask and bed level
+            # read mask
             mask = dummymodel.get_mask()
-            zb = dummymodel.get_bedlevel()
-
-        zs_maps = []
-        for simulation_path in sim_paths:
-            # read zsmax data from overland sfincs model
-            with SfincsAdapter(model_root=simulation_path) as sim:
-                zsmax = sim._get_zsmax().load()
-                zs_maps.append(zsmax)
-
-        # Create RP flood maps
-        logger.info("Calculating flood risk maps, this may take some time")
-        rp_flood_maps = self.calc_rp_maps(
-            floodmaps=zs_maps,
-            frequencies=frequencies,
-            zb=zb,
-            mask=mask,
-            return_periods=floodmap_rp,
-        )
 
+        with ExitStack() as stack:
+            results = [
+                stack.enter_context(SfincsResultReader(simulation_path))
+                for simulation_path in sim_paths
+            ]
+            zb = results[0].get_zb()
+
+            # open zsmax data from overland sfincs model lazily, every tile is read and reduced over time on its own
+            zs_maps = [result.get_zsmax_intervals() for result in results]
+            crs = zs_maps[0].raster.crs
+
+            # Create RP flood maps
+            logger.info("Calculating flood risk maps, this may take some time")
+            rp_flood_maps = self._calc_rp_maps_tiled(
+                floodmaps=zs_maps,
+                frequencies=frequencies,
+                zb=zb,
+                mask=mask,
+                return_periods=floodmap_rp,
+                tile_size=tile_size,
+                reduce_dim="timemax",
+            )
+
+        zsmax_maps = []
+        floodmap_fns = []
         for ii, rp in enumerate(floodmap_rp):
             zs_rp_single = rp_flood_maps[ii]
-            zs_rp_single = zs_rp_single.rio.write_crs(
-                zsmax.raster.crs
-            )  # , inplace=True)
+            zs_rp_single = zs_rp_single.rio.write_crs(crs)
             zs_rp_single = zs_rp_single.to_dataset(name="risk_map").transpose()
             fn_rp = result_path / f"RP_{rp:04d}_maps.nc"
             zs_rp_single.to_netcdf(fn_rp)
 
-            # write geotiff
-            # dem file for high resolution flood depth map
-            demfile = self.database.static_path / "dem" / self.settings.dem.filename
-
-            # writing the geotiff to the scenario results folder
-            with SfincsAdapter(model_root=sim_paths[0]) as dummymodel:
-                dem = dummymodel._model.data_catalog.get_rasterdataset(demfile)
-                zsmax = zs_rp_single.to_array().squeeze().transpose()
-                floodmap_fn = fn_rp.with_suffix(".tif")
-
-                # convert dem from dem units to floodmap units
-                dem_conversion = us.UnitfulLength(
-                    value=1.0, units=self.settings.dem.units
-                ).convert(self.settings.config.floodmap_units)
-
-                # convert zsmax from meters to floodmap units
-                floodmap_conversion = us.UnitfulLength(
-                    value=1.0, units=us.UnitTypesLength.meters
-                ).convert(self.settings.config.floodmap_units)
-
-                utils.downscale_floodmap(
-                    zsmax=floodmap_conversion * zsmax,
-                    dep=dem_conversion * dem,
-                    hmin=0.01,
-                    floodmap_fn=floodmap_fn.as_posix(),
-                )
+            zsmax_maps.append(zs_rp_single.to_array().squeeze().transpose())
+            floodmap_fns.append(fn_rp.with_suffix(".tif"))
+
+        # writing the geotiffs to the scenario results folder
+        logger.info("Writing flood risk maps to geotiff")
+        self._write_floodmap_geotiffs(zsmax_maps=zsmax_maps, floodmap_fns=floodmap_fns)
+
+    def _write_floodmap_geotiffs(
+        self, zsmax_maps: list[xr.DataArray], floodmap_fns: list[Path]
+    ):
+        """Downscale maximum water levels (in meters) to flood depth geotiffs on the high resolution DEM.
+
+        The flood depths are written in the units defined in the sfincs config settings.
+        If the index geotiff of the database exists or can be generated, all maps are downscaled in a single pass over
+        the DEM and index. Otherwise, the DEM is read once and each map is downscaled by reprojecting the water levels
+        to the DEM.
+
+        Parameters
+        ----------
+        zsmax_maps : list[xr.DataArray]
+            Maximum water levels in meters on the SFINCS grid.
+        floodmap_fns : list[Path]
+            Output paths of the flood depth geotiffs, one for every water level map.
+        """
+        demfile = self.database.static_path / "dem" / self.settings.dem.filename
+        try:
+            index_path = Path(self.database.get_index_path())
+        except DatabaseError as e:
+            logger.warning(
+                f"Index geotiff is not available, downscaling flood maps without it: {e}"
+            )
+            index_path = None
+
+        # convert dem from dem units to floodmap units
+        dem_conversion = us.UnitfulLength(
+            value=1.0, units=self.settings.dem.units
+        ).convert(self.settings.config.floodmap_units)
+
+        # convert zsmax from meters to floodmap units
+        floodmap_conversion = us.UnitfulLength(
+            value=1.0, units=us.UnitTypesLength.meters
+        ).convert(self.settings.config.floodmap_units)
+        zsmax_maps = [floodmap_conversion * zsmax for zsmax in zsmax_maps]
+
+        if index_path is not None:
+            IndexDownscaler(
+                dem_path=demfile,
+                index_path=index_path,
+                dem_conversion=dem_conversion,
+            ).write_floodmaps(
+                zsmax_maps=zsmax_maps, floodmap_fns=floodmap_fns, hmin=0.01
+            )
+            return
+
+        dem = self._model.data_catalog.get_rasterdataset(demfile)
+        dem = (dem_conversion * dem).load()
+        for zsmax, floodmap_fn in zip(zsmax_maps, floodmap_fns):
+            utils.downscale_floodmap(
+                zsmax=zsmax,
+                dep=dem,
+                hmin=0.01,
+                floodmap_fn=floodmap_fn.as_posix(),
+            )
 
     ######################################
     ### PRIVATE - use at your own risk ###
@@ -837,19 +984,45 @@ class SfincsAdapter(IHazardAdapter):
         """Run the whole workflow for a risk scenario.
 
         This means preprocessing and running the SFINCS model for each event in the event set, and then postprocessing the results.
+
+        Sub-events are preprocessed one after the other, while the SFINCS simulations are executed concurrently,
+        each in its own simulation folder, using at most `Settings().sfincs_max_workers` workers.
+        All simulations are awaited before an error is raised for the sub-events that failed,
+        so the results of the successful sub-events are kept.
         """
         event_set: EventSet = self.database.events.get(scenario.event, load_all=True)
         total = len(event_set._events)
+        max_workers = min(Settings().sfincs_max_workers, total)
 
-        for i, sub_event in enumerate(event_set._events):
-            sim_path = self._get_simulation_path(scenario, sub_event=sub_event)
+        failed = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for i, sub_event in enumerate(event_set._events):
+                sim_path = self._get_simulation_path(scenario, sub_event=sub_event)
 
-            # Preprocess
-            self.preprocess(scenario, event=sub_event)
-            logger.info(
-                f"Running SFINCS for Eventset Scenario `{scenario.name}`, Event `{sub_event.name}` ({i + 1}/{total})"
+                # Preprocess
+                self.preprocess(scenario, event=sub_event)
+                logger.info(
+                    f"Running SFINCS for Eventset Scenario `{scenario.name}`, Event `{sub_event.name}` ({i + 1}/{total})"
+                )
+                future = executor.submit(self.execute, sim_path, strict=False)
+                futures[future] = sub_event.name
+
+            for future in as_completed(futures):
+                try:
+                    success = future.result()
+                except Exception as e:
+                    logger.error(
+                        f"SFINCS model for Event `{futures[future]}` failed to run: {e}"
+                    )
+                    success = False
+                if not success:
+                    failed.append(futures[future])
+
+        if failed:
+            raise RuntimeError(
+                f"SFINCS model failed to run for {len(failed)}/{total} events of Eventset Scenario `{scenario.name}`: {', '.join(sorted(failed))}."
             )
-            self.execute(sim_path)
 
         # Postprocess
         self.calculate_rp_floodmaps(scenario)
@@ -912,12 +1085,9 @@ class SfincsAdapter(IHazardAdapter):
                 value=1.0, units=self.units.default_velocity_units
             ).convert(us.UnitTypesVelocity.mps)
 
-            tmp_path = Path(tempfile.gettempdir()) / "wind.csv"
-            df.to_csv(tmp_path)
-
-            # HydroMT function: set wind forcing from timeseries
+            # HydroMT function: set wind forcing from timeseries, passed in memory
             self._model.setup_wind_forcing(
-                timeseries=tmp_path, magnitude=None, direction=None
+                timeseries=df, magnitude=None, direction=None
             )
         elif isinstance(wind, WindMeteo):
             ds = MeteoHandler(
@@ -948,12 +1118,9 @@ class SfincsAdapter(IHazardAdapter):
             ).convert(us.UnitTypesVelocity.mps)
             df *= conversion
 
-            tmp_path = Path(tempfile.gettempdir()) / "wind.csv"
-            df.to_csv(tmp_path)
-
-            # HydroMT function: set wind forcing from timeseries
+            # HydroMT function: set wind forcing from timeseries, passed in memory
             self._model.setup_wind_forcing(
-                timeseries=tmp_path,
+                timeseries=df,
                 magnitude=None,
                 direction=None,
             )
@@ -984,10 +1151,8 @@ class SfincsAdapter(IHazardAdapter):
             )
             df *= conversion
 
-            tmp_path = Path(tempfile.gettempdir()) / "precip.csv"
-            df.to_csv(tmp_path)
-
-            self._model.setup_precip_forcing(timeseries=tmp_path)
+            # HydroMT function: set precipitation forcing from timeseries, passed in memory
+            self._model.setup_precip_forcing(timeseries=df)
         elif isinstance(rainfall, RainfallSynthetic):
             df = rainfall.to_dataframe(time_frame=time_frame)
 
@@ -1001,10 +1166,8 @@ class SfincsAdapter(IHazardAdapter):
                 ).convert(us.UnitTypesIntensity.mm_hr)
 
             df *= conversion
-            tmp_path = Path(tempfile.gettempdir()) / "precip.csv"
-            df.to_csv(tmp_path)
-
-            self._model.setup_precip_forcing(timeseries=tmp_path)
+            # HydroMT function: set precipitation forcing from timeseries, passed in memory
+            self._model.setup_precip_forcing(timeseries=df)
         elif isinstance(rainfall, RainfallMeteo):
             ds = MeteoHandler(
                 dir=self.database.static_path / "meteo",
@@ -1267,6 +1430,7 @@ class SfincsAdapter(IHazardAdapter):
             volume=green_infrastructure.volume.convert(us.UnitTypesVolume.m3),
             merge=True,
         )
+        self._grid_modified = True
 
     def _add_measure_pump(self, pump: Pump):
         """Add pump to sfincs model.
@@ -1537,21 +1701,38 @@ class SfincsAdapter(IHazardAdapter):
         """Return the path to the event input directory."""
         return self.database.events.input_path / event.name
 
+    @staticmethod
+    def _break_hard_link(path: Path):
+        """Replace a hard-linked file by a copy, so it can be written without modifying the linked file."""
+        if not path.exists() or path.stat().st_nlink < 2:
+            return
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        shutil.copy2(path, tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _open_results(
+        sim_path: Path, results: Optional[SfincsResultReader] = None
+    ) -> ContextManager[SfincsResultReader]:
+        """Return a context with the results reader, which is only closed on exit if it is opened here."""
+        if results is not None:
+            return nullcontext(results)
+        return SfincsResultReader(sim_path)
+
     def _get_zsmax(self):
         """Read zsmax file and return absolute maximum water level over entire simulation."""
-        self._model.read_results()
-        zsmax = self._model.results["zsmax"].max(dim="timemax")
-        zsmax.attrs["units"] = "m"
-        return zsmax
+        with SfincsResultReader(self.get_model_root()) as results:
+            return results.get_zsmax().load()
 
-    def _get_zs_points(self):
+    def _get_zs_points(self, results: Optional[SfincsResultReader] = None):
         """Read water level (zs) timeseries at observation points.
 
         Names are allocated from the site.toml.
         See also add_obs_points() above.
         """
-        self._model.read_results()
-        da = self._model.results["point_zs"]
+        with self._open_results(self.get_model_root(), results) as results:
+            da = results.get_point_zs()
+            crs = results.crs
         df = pd.DataFrame(index=pd.DatetimeIndex(da.time), data=da.to_numpy())
 
         names = []
@@ -1567,7 +1748,7 @@ class SfincsAdapter(IHazardAdapter):
         gdf = gpd.GeoDataFrame(
             pt_df,
             geometry=gpd.points_from_xy(da.point_x.values, da.point_y.values),
-            crs=self._model.crs,
+            crs=crs,
         )
         return df, gdf
 
@@ -1815,6 +1996,7 @@ class SfincsAdapter(IHazardAdapter):
         zb: xr.DataArray,
         mask: xr.DataArray,
         return_periods: list[float],
+        chunk_size: int = 100_000,
     ) -> list[xr.DataArray]:
         """
         Calculate return period (RP) flood maps from a set of flood simulation results.
@@ -1829,6 +2011,7 @@ class SfincsAdapter(IHazardAdapter):
             zb (np.ndarray): Array of bed elevations for each grid cell.
             mask (xr.DataArray): Mask indicating valid (1) and invalid (0) grid cells.
             return_periods (list[float]): List of return periods (in years) for which to generate hazard maps.
+            chunk_size (int): Number of grid cells that are interpolated at once, bounds the memory used by the interpolation.
 
         Returns
         -------
@@ -1875,10 +2058,222 @@ class SfincsAdapter(IHazardAdapter):
 
         # 1a: make a table of all water levels and associated frequencies
         zs = xr.concat(floodmaps, pd.Index(frequencies, name="frequency"))
+        h = SfincsAdapter._calc_rp_block(
+            zs=zs.to_numpy(),
+            zb=zb.to_numpy(),
+            mask=mask.to_numpy(),
+            frequencies=frequencies,
+            return_periods=return_periods,
+            chunk_size=chunk_size,
+        )
+
+        rp_maps = []
+        for ii, rp in enumerate(return_periods):
+            da = xr.DataArray(
+                data=h[ii, :], coords={"z": zs["z"]}, attrs={"units": "meters"}
+            )
+            if stacking:
+                # Ensure unstacking creates (y, x) dimensions in the correct order
+                da = da.unstack()
+                # Reorder dimensions if needed
+                if set(da.dims) == {"y", "x"} and da.dims != ("y", "x"):
+                    da = da.transpose("y", "x")
+            # #create single nc
+            rp_maps.append(da)
+
+        return rp_maps
+
+    @staticmethod
+    def _calc_rp_maps_tiled(
+        floodmaps: list[xr.DataArray],
+        frequencies: list[float],
+        zb: xr.DataArray,
+        mask: xr.DataArray,
+        return_periods: list[float],
+        tile_size: int = 1_000_000,
+        reduce_dim: Optional[str] = None,
+    ) -> list[xr.DataArray]:
+        """Calculate return period (RP) flood maps like `calc_rp_maps`, reading the floodmaps in tiles along their first spatial dimension.
+
+        The floodmaps can be lazy arrays. Only one tile of all floodmaps is loaded at a time,
+        while the resulting maps are assembled in memory, so the peak memory does not grow with the number of floodmaps.
+        A tile is selected before `reduce_dim` is reduced, so for lazily indexed (not dask-backed) arrays only the
+        tile is read from file.
+
+        Parameters
+        ----------
+        floodmaps : list[xr.DataArray]
+            List of (lazy) water level maps, one for each simulation.
+        frequencies : list[float]
+            List of frequencies corresponding to each floodmap.
+        zb : xr.DataArray
+            Bed elevations with the same shape as the floodmaps.
+        mask : xr.DataArray
+            Mask indicating valid (1) and invalid (0) grid cells with the same shape as the floodmaps.
+        return_periods : list[float]
+            List of return periods (in years) for which to generate hazard maps.
+        tile_size : int, optional
+            The (approximate) number of grid cells per tile, by default 1_000_000.
+        reduce_dim : str, optional
+            Dimension of the floodmaps that is reduced with its maximum after a tile is read, e.g. ``timemax`` of the
+            SFINCS map files. By default, the floodmaps have the same dimensions as `zb`.
+
+        Returns
+        -------
+        list[xr.DataArray]
+            List of xarray DataArrays, each representing the hazard map for a given return period.
+        """
+        first = floodmaps[0]
+        for i, floodmap in enumerate(floodmaps):
+            if floodmap.shape != first.shape or floodmap.dims != first.dims:
+                raise ValueError(
+                    f"Floodmap at index {i} does not match the shape or dimensions of the first floodmap. "
+                    f"Expected shape {first.shape} and dims {first.dims}, got shape {floodmap.shape} and dims {floodmap.dims}."
+                )
+        template = (
+            first if reduce_dim is None else first.isel({reduce_dim: 0}, drop=True)
+        )
+        if zb.shape != template.shape or mask.shape != template.shape:
+            raise ValueError(
+                f"Floodmaps, bed elevation array (zb), and mask must all have the same shape. "
+                f"Floodmap shape: {template.shape}, zb shape: {zb.shape}, mask shape: {mask.shape}."
+            )
+
+        zb_values = zb.to_numpy()
+        mask_values = mask.to_numpy()
+
+        # Tile along the first dimension, so every tile is a contiguous block of rows
+        tile_dim = template.dims[0]
+        row_size = max(template.size // max(template.sizes[tile_dim], 1), 1)
+        rows_per_tile = max(tile_size // row_size, 1)
+
+        h = np.empty((len(return_periods), *template.shape), dtype=zb_values.dtype)
+        for start in range(0, template.sizes[tile_dim], rows_per_tile):
+            rows = slice(start, start + rows_per_tile)
+            zs_tiles = [floodmap.isel({tile_dim: rows}) for floodmap in floodmaps]
+            if reduce_dim is not None:
+                zs_tiles = [zs.max(dim=reduce_dim) for zs in zs_tiles]
+            zs_tile = np.stack(
+                [zs.transpose(*template.dims).to_numpy().reshape(-1) for zs in zs_tiles]
+            )
+            h_tile = SfincsAdapter._calc_rp_block(
+                zs=zs_tile,
+                zb=zb_values[rows].reshape(-1),
+                mask=mask_values[rows].reshape(-1),
+                frequencies=frequencies,
+                return_periods=return_periods,
+            )
+            h[:, rows] = h_tile.reshape(h[:, rows].shape)
+
+        coords = {
+            dim: template.coords[dim].variable
+            for dim in template.dims
+            if dim in template.coords
+        }
+        rp_maps = []
+        for ii in range(len(return_periods)):
+            da = xr.DataArray(
+                data=h[ii],
+                dims=template.dims,
+                coords=coords,
+                attrs={"units": "meters"},
+            )
+            # Ensure the same (y, x) dimension order as calc_rp_maps
+            if set(da.dims) == {"y", "x"} and da.dims != ("y", "x"):
+                da = da.transpose("y", "x")
+            rp_maps.append(da)
+
+        return rp_maps
+
+    @staticmethod
+    def _calc_rp_block(
+        zs: np.ndarray,
+        zb: np.ndarray,
+        mask: np.ndarray,
+        frequencies: list[float],
+        return_periods: list[float],
+        chunk_size: int = 100_000,
+    ) -> np.ndarray:
+        """Calculate the return period water levels for a block of grid cells, including the handling of masked and dry cells.
+
+        Parameters
+        ----------
+        zs : np.ndarray
+            Water levels of shape (n_events, n_cells). NaN where a cell did not get wet in an event.
+        zb : np.ndarray
+            Bed levels of shape (n_cells,).
+        mask : np.ndarray
+            Mask of shape (n_cells,) indicating valid (1) and invalid (0) grid cells.
+        frequencies : list[float]
+            Frequencies of occurrence of each event.
+        return_periods : list[float]
+            Return periods (in years) to calculate the water levels for.
+        chunk_size : int, optional
+            Number of grid cells that are interpolated at once, by default 100_000.
+
+        Returns
+        -------
+        np.ndarray
+            Water levels of shape (n_return_periods, n_cells), NaN for dry cells.
+        """
         # Get the indices of columns with all NaN values
         nan_cells = np.where(np.all(np.isnan(zs), axis=0))[0]
+
+        valid_cells = np.where(mask == 1)[
+            0
+        ]  # only interpolate cells where model is not masked
+        h = np.tile(
+            zb, (len(return_periods), 1)
+        )  # if not flooded (i.e. not in valid_cells) revert to bed_level, read from SFINCS results so it is the minimum bed level in a grid cell
+
+        # Process the valid cells in chunks to bound the memory of the intermediate tables
+        for start in range(0, len(valid_cells), chunk_size):
+            cells = valid_cells[start : start + chunk_size]
+            h[:, cells] = SfincsAdapter._calc_rp_levels(
+                zs=zs[:, cells],
+                zb=zb[cells],
+                frequencies=frequencies,
+                return_periods=return_periods,
+            )
+
+        # Re-fill locations that had nan water level for all simulations with nans
+        h[:, nan_cells] = np.full(h[:, nan_cells].shape, np.nan)
+
+        # If a cell has the same water-level as the bed elevation it should be dry (turn to nan)
+        diff = h - np.tile(zb, (h.shape[0], 1))
+        dry = (
+            diff < 10e-10
+        )  # here we use a small number instead of zero for rounding errors
+        h[dry] = np.nan
+        return h
+
+    @staticmethod
+    def _calc_rp_levels(
+        zs: np.ndarray,
+        zb: np.ndarray,
+        frequencies: list[float],
+        return_periods: list[float],
+    ) -> np.ndarray:
+        """Calculate the water levels of the given return periods for a block of grid cells.
+
+        Parameters
+        ----------
+        zs : np.ndarray
+            Water levels of shape (n_events, n_cells). NaN where a cell did not get wet in an event.
+        zb : np.ndarray
+            Bed levels of shape (n_cells,).
+        frequencies : list[float]
+            Frequencies of occurrence of each event.
+        return_periods : list[float]
+            Return periods (in years) to calculate the water levels for.
+
+        Returns
+        -------
+        np.ndarray
+            Water levels of shape (n_return_periods, n_cells).
+        """
         # fill nan values with minimum bed levels in each grid cell, np.interp cannot ignore nan values
-        zs = xr.where(np.isnan(zs), np.tile(zb, (zs.shape[0], 1)), zs)
+        zs = np.where(np.isnan(zs), zb, zs)
         # Get table of frequencies
         freq = np.tile(frequencies, (zs.shape[1], 1)).transpose()
 
@@ -1886,7 +2281,7 @@ class SfincsAdapter(IHazardAdapter):
         # (i.e. each h-value should be linked to the same p-values as in step 1a)
         sort_index = zs.argsort(axis=0)
         sorted_prob = np.flipud(np.take_along_axis(freq, sort_index, axis=0))
-        sorted_zs = np.flipud(np.take_along_axis(zs.values, sort_index, axis=0))
+        sorted_zs = np.flipud(np.take_along_axis(zs, sort_index, axis=0))
 
         # 1c: Compute exceedance probabilities of water depths
         # Method: accumulate probabilities from top to bottom
@@ -1902,49 +2297,63 @@ class SfincsAdapter(IHazardAdapter):
         # h(T) = interp1 (log(T*), h*, log(T))
         # in which t* and h* are the values from the table and T is the return period (T) of interest
         # The resulting T-year water depths for all grids combined form the T-year hazard map
-        rp_da = xr.DataArray(rp_zs, dims=zs.dims)
-
-        # no_data_value = -999  # in SFINCS
-        # sorted_zs = xr.where(sorted_zs == no_data_value, np.nan, sorted_zs)
-
-        valid_cells = np.where(mask == 1)[
-            0
-        ]  # only loop over cells where model is not masked
-        h = matlib.repmat(
-            np.copy(zb), len(return_periods), 1
-        )  # if not flooded (i.e. not in valid_cells) revert to bed_level, read from SFINCS results so it is the minimum bed level in a grid cell
-
-        for jj in valid_cells:  # looping over all non-masked cells.
-            # linear interpolation for all return periods to evaluate
-            h[:, jj] = np.interp(
-                np.log10(return_periods),
-                np.log10(rp_da[::-1, jj]),
-                sorted_zs[::-1, jj],
-                left=0,
-            )
+        return SfincsAdapter._interp_columns(
+            x=np.log10(return_periods),
+            xp=np.log10(rp_zs[::-1]),
+            fp=sorted_zs[::-1],
+            left=0,
+        )
 
-        # Re-fill locations that had nan water level for all simulations with nans
-        h[:, nan_cells] = np.full(h[:, nan_cells].shape, np.nan)
+    @staticmethod
+    def _interp_columns(
+        x: np.ndarray, xp: np.ndarray, fp: np.ndarray, left: float
+    ) -> np.ndarray:
+        """Evaluate `np.interp(x, xp[:, j], fp[:, j], left=left)` for all columns j at once.
 
-        # If a cell has the same water-level as the bed elevation it should be dry (turn to nan)
-        diff = h - np.tile(zb, (h.shape[0], 1))
-        dry = (
-            diff < 10e-10
-        )  # here we use a small number instead of zero for rounding errors
-        h[dry] = np.nan
+        The arithmetic follows the implementation of `np.interp`, so the results are identical to interpolating column by column.
 
-        rp_maps = []
-        for ii, rp in enumerate(return_periods):
-            da = xr.DataArray(
-                data=h[ii, :], coords={"z": zs["z"]}, attrs={"units": "meters"}
-            )
-            if stacking:
-                # Ensure unstacking creates (y, x) dimensions in the correct order
-                da = da.unstack()
-                # Reorder dimensions if needed
-                if set(da.dims) == {"y", "x"} and da.dims != ("y", "x"):
-                    da = da.transpose("y", "x")
-            # #create single nc
-            rp_maps.append(da)
+        Parameters
+        ----------
+        x : np.ndarray
+            Coordinates to evaluate, shape (n_x,).
+        xp : np.ndarray
+            Increasing data point coordinates per column, shape (n_points, n_columns).
+        fp : np.ndarray
+            Data point values per column, shape (n_points, n_columns).
+        left : float
+            Value to return for `x < xp[0]`.
 
-        return rp_maps
+        Returns
+        -------
+        np.ndarray
+            Interpolated values, shape (n_x, n_columns).
+        """
+        x = np.asarray(x, dtype=np.float64)[:, None]
+        xp = np.asarray(xp, dtype=np.float64)
+        fp = np.asarray(fp, dtype=np.float64)
+        n_points = xp.shape[0]
+
+        # Index of the last data point that is smaller than or equal to x
+        j = (xp[None, :, :] <= x[:, :, None]).sum(axis=1) - 1
+        j_lo = np.clip(j, 0, max(n_points - 2, 0))
+        j_hi = np.minimum(j_lo + 1, n_points - 1)
+        j_eq = np.clip(j, 0, n_points - 1)
+
+        xp_lo = np.take_along_axis(xp, j_lo, axis=0)
+        xp_hi = np.take_along_axis(xp, j_hi, axis=0)
+        fp_lo = np.take_along_axis(fp, j_lo, axis=0)
+        fp_hi = np.take_along_axis(fp, j_hi, axis=0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = (fp_hi - fp_lo) / (xp_hi - xp_lo)
+            result = slope * (x - xp_lo) + fp_lo
+            # If we get nan in one direction, try the other
+            result_hi = slope * (x - xp_hi) + fp_hi
+        result_hi = np.where(np.isnan(result_hi) & (fp_lo == fp_hi), fp_lo, result_hi)
+        result = np.where(np.isnan(result), result_hi, result)
+
+        # Exact matches and the last data point avoid non-finite interpolation
+        fp_eq = np.take_along_axis(fp, j_eq, axis=0)
+        exact = (np.take_along_axis(xp, j_eq, axis=0) == x) | (j == n_points - 1)
+        result = np.where(exact, fp_eq, result)
+        return np.where(j < 0, left, result)
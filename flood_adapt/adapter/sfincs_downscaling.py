@@ -0,0 +1,167 @@
+from pathlib import Path
+from typing import Iterator, Union
+
+import numpy as np
+import rasterio
+import xarray as xr
+from hydromt_sfincs.utils import build_overviews
+from rasterio.windows import Window
+
+from flood_adapt.misc.log import FloodAdaptLogging
+
+logger = FloodAdaptLogging.getLogger("SfincsDownscaling")
+
+
+class IndexDownscaler:
+    """Downscale SFINCS water levels to flood depth maps on the high-resolution DEM using the index GeoTIFF.
+
+    The index GeoTIFF (``static/dem/index.tif``) maps every DEM pixel to the SFINCS grid cell it lies in.
+    Downscaling therefore does not need any reprojection: the flood depth of a pixel is the water level of its
+    cell minus the DEM elevation, ``zs[index] - dem``.
+
+    The DEM and index are read block by block, so the memory use is bounded by the block size and not by the
+    size of the DEM. All flood maps passed to `write_floodmaps` are written in the same pass over the DEM and
+    index, so each block is read from disk only once, no matter how many flood maps are written.
+
+    Parameters
+    ----------
+    dem_path : Union[str, Path]
+        Path to the high-resolution DEM GeoTIFF.
+    index_path : Union[str, Path]
+        Path to the index GeoTIFF, created for the same DEM by `hydromt_sfincs.workflows.downscaling.make_index_cog`.
+    dem_conversion : float, optional
+        Factor to convert the DEM elevations to the units of the water levels, by default 1.0.
+    block_size : int, optional
+        Height and width (in pixels) of the blocks that are processed at once, by default 2048.
+    """
+
+    def __init__(
+        self,
+        dem_path: Union[str, Path],
+        index_path: Union[str, Path],
+        dem_conversion: float = 1.0,
+        block_size: int = 2048,
+    ):
+        self.dem_path = Path(dem_path)
+        self.index_path = Path(index_path)
+        self.dem_conversion = dem_conversion
+        self.block_size = block_size
+
+        with (
+            rasterio.open(self.dem_path) as dem,
+            rasterio.open(self.index_path) as index,
+        ):
+            if dem.shape != index.shape:
+                raise ValueError(
+                    f"Index GeoTIFF shape {index.shape} does not match DEM shape {dem.shape}. "
+                    f"Regenerate the index GeoTIFF at {self.index_path.as_posix()}."
+                )
+            self.shape = dem.shape
+            self.profile = {
+                "driver": "GTiff",
+                "width": dem.width,
+                "height": dem.height,
+                "count": 1,
+                "dtype": np.float32,
+                "crs": dem.crs,
+                "transform": dem.transform,
+                "tiled": True,
+                "blockxsize": 256,
+                "blockysize": 256,
+                "compress": "deflate",
+                "predictor": 2,
+                "profile": "COG",
+                "nodata": np.nan,
+                "BIGTIFF": "YES",
+            }
+
+    def write_floodmaps(
+        self,
+        zsmax_maps: list[xr.DataArray],
+        floodmap_fns: list[Path],
+        hmin: float = 0.01,
+    ) -> None:
+        """Write a flood depth GeoTIFF for every water level map, in a single pass over the DEM and index.
+
+        Parameters
+        ----------
+        zsmax_maps : list[xr.DataArray]
+            Maximum water levels on the SFINCS grid, with dimensions (y, x).
+        floodmap_fns : list[Path]
+            Output paths of the flood depth GeoTIFFs, one for every water level map.
+        hmin : float, optional
+            Minimum water depth to be considered as flooded, by default 0.01.
+        """
+        if len(zsmax_maps) != len(floodmap_fns):
+            raise ValueError(
+                f"Number of water level maps ({len(zsmax_maps)}) does not match the number of output files ({len(floodmap_fns)})."
+            )
+
+        # the index numbers the cells in Fortran order, see `Database.get_max_water_level`
+        zs_cells = [
+            np.asarray(zsmax.to_numpy(), dtype=np.float32).flatten("F")
+            for zsmax in zsmax_maps
+        ]
+
+        logger.info(
+            f"Downscaling {len(zs_cells)} flood map(s) using the index GeoTIFF {self.index_path.as_posix()}"
+        )
+        with (
+            rasterio.open(self.dem_path) as dem,
+            rasterio.open(self.index_path) as index,
+        ):
+            outputs = [rasterio.open(fn, "w", **self.profile) for fn in floodmap_fns]
+            try:
+                for window in self._windows():
+                    cells, elevation = self._read_block(dem, index, window)
+                    for zs, output in zip(zs_cells, outputs):
+                        output.write(
+                            self._flood_depth(zs, cells, elevation, hmin),
+                            window=window,
+                            indexes=1,
+                        )
+            finally:
+                for output in outputs:
+                    output.close()
+
+        for fn in floodmap_fns:
+            build_overviews(fn=str(fn), resample_method="nearest")
+
+    def _windows(self) -> Iterator[Window]:
+        n_rows, n_cols = self.shape
+        for row in range(0, n_rows, self.block_size):
+            for col in range(0, n_cols, self.block_size):
+                yield Window(
+                    col,
+                    row,
+                    min(self.block_size, n_cols - col),
+                    min(self.block_size, n_rows - row),
+                )
+
+    def _read_block(
+        self,
+        dem: rasterio.DatasetReader,
+        index: rasterio.DatasetReader,
+        window: Window,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Read a block of the index and DEM, with nodata pixels set to -1 and NaN respectively."""
+        elevation = dem.read(1, window=window).astype(np.float32)
+        if dem.nodata is not None and not np.isnan(dem.nodata):
+            elevation[elevation == dem.nodata] = np.nan
+        elevation *= self.dem_conversion
+
+        cells = index.read(1, window=window).astype(np.int64)
+        if index.nodata is not None:
+            cells[cells == int(index.nodata)] = -1
+        return cells, elevation
+
+    @staticmethod
+    def _flood_depth(
+        zs: np.ndarray, cells: np.ndarray, elevation: np.ndarray, hmin: float
+    ) -> np.ndarray:
+        """Gather the water level of each pixel from its cell and subtract the elevation."""
+        h = np.full(cells.shape, np.nan, dtype=np.float32)
+        valid = cells >= 0
+        h[valid] = zs[cells[valid]] - elevation[valid]
+        h[~(h > hmin)] = np.nan
+        return h
@@ -1,3 +1,6 @@
+import hashlib
+import json
+import os
 import shutil
 from pathlib import Path
 
@@ -6,6 +9,7 @@ import pandas as pd
 from flood_adapt.adapter.interface.offshore import IOffshoreSfincsHandler
 from flood_adapt.adapter.sfincs_adapter import SfincsAdapter
 from flood_adapt.misc.database_user import DatabaseUser
+from flood_adapt.misc.fingerprint import directory_fingerprint
 from flood_adapt.misc.log import FloodAdaptLogging
 from flood_adapt.misc.path_builder import (
     ObjectDir,
@@ -15,6 +19,8 @@ from flood_adapt.misc.path_builder import (
 from flood_adapt.objects.events.event_set import EventSet
 from flood_adapt.objects.events.events import Event, Mode
 from flood_adapt.objects.events.historical import HistoricalEvent
+from flood_adapt.objects.events.hurricane import HurricaneEvent
+from flood_adapt.objects.forcing import unit_system as us
 from flood_adapt.objects.forcing.forcing import (
     ForcingSource,
     IWind,
@@ -46,23 +52,76 @@ class OffshoreSfincsHandler(IOffshoreSfincsHandler, DatabaseUser):
         Note that the returned water levels are relative to the reference datum of the offshore model.
         To convert to a different datum, add the offshore reference datum height and subtract the desired reference datum height.
 
+        The offshore model only depends on the offshore template model, the event and the sea level rise, so its
+        results are cached per event with `get_cache_key` as key. Scenarios that only differ in their projection
+        (except sea level rise) or strategy reuse the cached water levels instead of running the offshore model again.
+        The cached water levels of an event are removed when the event is deleted.
+
         Returns
         -------
         pd.DataFrame
             A DataFrame with the water levels for each boundary condition point. Relative to the reference datum of the offshore model.
-
         """
         path = self._get_simulation_path()
         if not self.requires_offshore_run(self.event):
             raise ValueError("Offshore model is not required for this event")
 
+        cache_path = self._get_cache_path()
+        if cache_path.exists():
+            logger.info(
+                f"Reusing the offshore water levels of an identical offshore run for `{self.scenario.name}`"
+            )
+            return self._read_cached_waterlevels(cache_path)
+
         self.run_offshore()
 
         with SfincsAdapter(model_root=path) as offshore_model:
             waterlevels = offshore_model.get_wl_df_from_offshore_his_results()
 
+        self._write_cached_waterlevels(waterlevels, cache_path)
         return waterlevels
 
+    def get_cache_key(self) -> str:
+        """Get the key of the offshore results in the offshore cache.
+
+        The key is a hash of all inputs of the offshore model: the offshore model configuration, the contents of the
+        files of the offshore template model (grid, bathymetry, `sfincs.inp`, boundary points), the time frame and
+        forcings (including the contents of forcing files) of the event, the hurricane translation and the sea level
+        rise of the projection.
+
+        Returns
+        -------
+        str
+            SHA-256 hex digest of the offshore model inputs.
+        """
+        projection = self.database.projections.get(self.scenario.projection)
+        offshore_model = self.database.site.sfincs.config.offshore_model
+        components = {
+            "offshore_model": (
+                offshore_model.model_dump(mode="json") if offshore_model else None
+            ),
+            "template": directory_fingerprint(self.template_path),
+            "time": self.event.time.model_dump(mode="json"),
+            "forcings": sorted(
+                (
+                    forcing.type.value,
+                    forcing.source.value,
+                    forcing.content_fingerprint(),
+                )
+                for forcing in self.event.get_forcings()
+            ),
+            "hurricane_translation": (
+                self.event.hurricane_translation.model_dump(mode="json")
+                if isinstance(self.event, HurricaneEvent)
+                else None
+            ),
+            "sea_level_rise": projection.physical_projection.sea_level_rise.convert(
+                us.UnitTypesLength.meters
+            ),
+        }
+        payload = json.dumps(components, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
     @staticmethod
     def requires_offshore_run(event: Event) -> bool:
         return any(
@@ -163,6 +222,31 @@ class OffshoreSfincsHandler(IOffshoreSfincsHandler, DatabaseUser):
                     f"Failed to run offshore model for {self.scenario.name}"
                 ) from e
 
+    def _get_cache_path(self) -> Path:
+        # cached per (main) event, so the water levels can be removed when the event is deleted
+        return (
+            self.database.output_path
+            / "offshore"
+            / self.scenario.event
+            / f"{self.get_cache_key()}.csv"
+        )
+
+    @staticmethod
+    def _read_cached_waterlevels(cache_path: Path) -> pd.DataFrame:
+        waterlevels = pd.read_csv(cache_path, index_col=0, parse_dates=True)
+        # boundary points are numbered from 1, like in `get_wl_df_from_offshore_his_results`
+        waterlevels.columns = waterlevels.columns.astype(int)
+        waterlevels.index.name = None
+        return waterlevels
+
+    @staticmethod
+    def _write_cached_waterlevels(waterlevels: pd.DataFrame, cache_path: Path):
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first, so an interrupted write never leaves an incomplete cache entry
+        tmp_path = cache_path.with_name(f"{cache_path.name}.tmp")
+        waterlevels.to_csv(tmp_path)
+        os.replace(tmp_path, cache_path)
+
     def _get_simulation_path(self) -> Path:
         main_event = self.database.events.get(self.scenario.event)
         if main_event.mode == Mode.risk:
@@ -0,0 +1,155 @@
+from pathlib import Path
+from typing import Optional
+
+import xarray as xr
+from hydromt_sfincs import SfincsModel as HydromtSfincsModel
+from hydromt_sfincs.regulargrid import RegularGrid
+from hydromt_sfincs.sfincs_input import SfincsInput
+from pyproj import CRS
+
+from flood_adapt.misc.log import FloodAdaptLogging
+
+logger = FloodAdaptLogging.getLogger("SfincsResults")
+
+
+class SfincsResultReader:
+    """Lazily read selected variables from the output files of a SFINCS simulation.
+
+    Unlike `hydromt_sfincs.SfincsModel.read_results`, which parses all variables of ``sfincs_map.nc`` and
+    ``sfincs_his.nc`` and requires the full model to be read, this reader only parses the model configuration
+    (``sfincs.inp``) to get the grid. The output files are opened on first access and kept open until `close` is
+    called, and only the requested variables are decoded. Results are cached, so sharing one reader between all
+    postprocessing steps of a simulation reads every variable once.
+
+    Parameters
+    ----------
+    sim_path : Path
+        Path to the simulation folder.
+    chunksize : int, optional
+        Chunk size along the time dimensions, by default 100.
+    """
+
+    MAP_FILE = "sfincs_map.nc"
+    HIS_FILE = "sfincs_his.nc"
+
+    def __init__(self, sim_path: Path, chunksize: int = 100):
+        self.sim_path = Path(sim_path)
+        self.chunksize = chunksize
+
+        inp = SfincsInput()
+        inp.read(inp_fn=(self.sim_path / "sfincs.inp").as_posix())
+        self._config = inp.to_dict()
+
+        self._datasets: dict[str, xr.Dataset] = {}
+        self._cache: dict[str, xr.DataArray] = {}
+        self._reggrid: Optional[RegularGrid] = None
+        self._quadtree_results: Optional[dict] = None
+        if self._config.get("qtrfile") is None:
+            self._reggrid = RegularGrid(
+                x0=self._config.get("x0"),
+                y0=self._config.get("y0"),
+                dx=self._config.get("dx"),
+                dy=self._config.get("dy"),
+                nmax=self._config.get("nmax"),
+                mmax=self._config.get("mmax"),
+                rotation=self._config.get("rotation", 0),
+                epsg=self._config.get("epsg"),
+            )
+
+    @property
+    def crs(self) -> CRS:
+        """Return the coordinate reference system of the model."""
+        return CRS.from_epsg(self._config.get("epsg"))
+
+    def get_zsmax(self) -> xr.DataArray:
+        """Return the absolute maximum water level over the entire simulation.
+
+        The water levels are read lazily, call `load` on the result to read them into memory.
+        """
+        if "zsmax" not in self._cache:
+            zsmax = self._get_map_variable("zsmax").max(dim="timemax")
+            zsmax.attrs["units"] = "m"
+            self._cache["zsmax"] = zsmax
+        return self._cache["zsmax"]
+
+    def get_zsmax_intervals(self) -> xr.DataArray:
+        """Return the maximum water levels of every output interval (``timemax``), without reducing them.
+
+        The map file is opened without dask, so selecting a block of the grid (e.g. with `isel`) before reducing the
+        intervals with ``max(dim="timemax")`` only reads that block from the file.
+        """
+        zsmax = self._get_map_variable("zsmax", chunked=False)
+        zsmax.attrs["units"] = "m"
+        return zsmax
+
+    def get_zb(self) -> xr.DataArray:
+        """Return the bed level of the simulation."""
+        if "zb" not in self._cache:
+            self._cache["zb"] = self._get_map_variable("zb").load()
+        return self._cache["zb"]
+
+    def get_point_zs(self) -> xr.DataArray:
+        """Return the water level timeseries at the observation points."""
+        if "point_zs" not in self._cache:
+            ds_his = self._open(self.HIS_FILE)
+            coords = [
+                var
+                for var in ds_his.data_vars
+                if var.split("_")[-1] in ["id", "name", "x", "y"]
+            ]
+            self._cache["point_zs"] = ds_his.set_coords(coords)["point_zs"].load()
+        return self._cache["point_zs"]
+
+    def close(self):
+        """Close the output files."""
+        for ds in self._datasets.values():
+            ds.close()
+        self._datasets.clear()
+        self._cache.clear()
+
+    def __enter__(self) -> "SfincsResultReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.close()
+        return False
+
+    def _open(self, filename: str, chunked: bool = True) -> xr.Dataset:
+        key = filename if chunked else f"{filename}:unchunked"
+        if key not in self._datasets:
+            path = self.sim_path / filename
+            if not path.exists():
+                raise FileNotFoundError(f"SFINCS output file not found: {path}")
+            if chunked:
+                ds = xr.open_dataset(path, chunks={"time": self.chunksize})
+            else:
+                # without dask and caching, every selection is only read from the file when it is loaded
+                ds = xr.open_dataset(path, chunks=None, cache=False)
+            self._datasets[key] = ds
+        return self._datasets[key]
+
+    def _get_map_variable(self, name: str, chunked: bool = True) -> xr.DataArray:
+        """Return a variable of the map file on the model grid, in the same format as `SfincsModel.read_results`."""
+        if self._reggrid is None:
+            return self._read_quadtree_results()[name]
+
+        da = self._open(self.MAP_FILE, chunked=chunked)[name]
+        da = da.drop_vars([coord for coord in da.coords if coord not in da.dims])
+        da = da.rename(
+            {old: new for old, new in {"n": "y", "m": "x"}.items() if old in da.dims}
+        )
+        da = da.transpose(..., "y", "x").assign_coords(self._reggrid.coordinates)
+        da.raster.set_crs(self._reggrid.crs)
+        return da
+
+    def _read_quadtree_results(self) -> dict:
+        # the quadtree map file is read by hydromt-sfincs, which needs the full model
+        if self._quadtree_results is None:
+            logger.debug(
+                f"Reading quadtree results of {self.sim_path} with hydromt-sfincs"
+            )
+            model = HydromtSfincsModel(root=self.sim_path.as_posix(), mode="r")
+            model.read_config()
+            model.read_results(chunksize=self.chunksize)
+            self._quadtree_results = dict(model.results)
+        return self._quadtree_results
@@ -60,6 +60,10 @@ class Settings(BaseSettings):
         The path to the FIAT binary. Alias: `FIAT_BIN_PATH` (environment variable).
     fiat_version : str, default is '0.2.1'
         The expected version of the FIAT binary. Alias: `FIAT_VERSION` (environment variable).
+    sfincs_max_workers : int, default is 1
+        The maximum number of SFINCS simulations of a risk scenario that are executed concurrently. Alias: `SFINCS_MAX_WORKERS` (environment variable).
+    fast_database_open : bool, default is False
+        Whether to clean up the scenario output in the background and generate a missing index GeoTIFF on first use when opening a database. Alias: `FAST_DATABASE_OPEN` (environment variable).
 
     Properties
     ----------
@@ -133,6 +137,21 @@ class Settings(BaseSettings):
         "If the version of the binary does not match this version, an error is raised.",
         exclude=True,
     )
+    sfincs_max_workers: int = Field(
+        default=1,
+        ge=1,
+        alias="SFINCS_MAX_WORKERS",  # environment variable: SFINCS_MAX_WORKERS
+        description="The maximum number of SFINCS simulations of a risk scenario that are executed concurrently. "
+        "Each sub-event is run in its own simulation folder, so this is usually limited by the number of available cores.",
+        exclude=True,
+    )
+    fast_database_open: bool = Field(
+        default=False,
+        alias="FAST_DATABASE_OPEN",  # environment variable: FAST_DATABASE_OPEN
+        description="Whether to open a database without waiting for the cleanup of the scenario output and the generation of a missing index GeoTIFF. "
+        "The cleanup runs in a background thread and the index GeoTIFF is generated when it is first requested.",
+        exclude=True,
+    )
 
     _binaries_validated: ClassVar[bool] = False
 
@@ -346,10 +365,10 @@ class Settings(BaseSettings):
         with open(toml_path, "wb") as f:
             tomli_w.dump(data, f)
 
-    def _export_env_var(self, key: str, value: str | Path | bool | None) -> None:
+    def _export_env_var(self, key: str, value: str | Path | bool | int | None) -> None:
         if isinstance(value, Path):
             environ[key] = value.as_posix()
-        elif isinstance(value, (str, bool)):
+        elif isinstance(value, (str, bool, int)):
             environ[key] = str(value)
         elif value is None:
             environ.pop(key, None)
@@ -41,6 +41,13 @@ class FiatConfigModel(BaseModel):
     save_simulation : Optional[bool], default=False
         Whether to keep or delete the simulation files after the simulation is finished and all output files are created.
         If True, the simulation files are kept. If False, the simulation files are deleted.
+    delta_runs : Optional[bool], default=False
+        Whether to reuse the impacts of an earlier scenario with the same hazard, socioeconomic projection, impact
+        model template and site configuration. If True, only the objects affected by the impact measures of either
+        scenario are run, and the impacts of the other objects are copied from the earlier scenario.
+    in_process_damages : Optional[bool], default=False
+        Whether to calculate the damages in FloodAdapt itself with the vectorized damage engine instead of running
+        the Delft-FIAT executable, for fast screening runs. See `DamageEngineAdapter` for the differences with Delft-FIAT.
     svi : Optional[SVIModel], default=None
         The social vulnerability index model.
     infographics : Optional[bool], default=False
@@ -59,6 +66,8 @@ class FiatConfigModel(BaseModel):
     roads_file_name: Optional[str] = None
     new_development_file_name: Optional[str] = "new_development_area.gpkg"
     save_simulation: Optional[bool] = False
+    delta_runs: Optional[bool] = False
+    in_process_damages: Optional[bool] = False
     svi: Optional[SVIModel] = None
     infographics: Optional[bool] = False
     no_footprints: Optional[NoFootprintsModel] = NoFootprintsModel()
@@ -1,6 +1,8 @@
 import gc
 import os
 import shutil
+import threading
+import time
 from pathlib import Path
 from typing import Any, Literal, Optional, Union
 
@@ -10,8 +12,14 @@ import pandas as pd
 import xarray as xr
 from geopandas import GeoDataFrame
 
-from flood_adapt.adapter.fiat_adapter import FiatAdapter
-from flood_adapt.adapter.sfincs_adapter import SfincsAdapter
+from flood_adapt.adapter.fiat_adapter import read_impact_record
+from flood_adapt.adapter.hazard_sampling import HazardSampleCache
+from flood_adapt.adapter.impact_geometries import (
+    GeometryStore,
+    export_spatial_outputs,
+    read_spatial_output,
+)
+from flood_adapt.config.config import Settings
 from flood_adapt.config.hazard import SlrScenariosModel
 from flood_adapt.config.impacts import FloodmapType
 from flood_adapt.config.site import Site
@@ -22,6 +30,7 @@ from flood_adapt.dbs_classes.dbs_projection import DbsProjection
 from flood_adapt.dbs_classes.dbs_scenario import DbsScenario
 from flood_adapt.dbs_classes.dbs_static import DbsStatic
 from flood_adapt.dbs_classes.dbs_strategy import DbsStrategy
+from flood_adapt.dbs_classes.hazard_store import HazardStore
 from flood_adapt.dbs_classes.interface.database import IDatabase
 from flood_adapt.misc.exceptions import ConfigError, DatabaseError
 from flood_adapt.misc.log import FloodAdaptLogging
@@ -50,6 +59,9 @@ class Database(IDatabase):
     input_path: Path
     static_path: Path
     output_path: Path
+    hazard_store: HazardStore
+    hazard_samples: HazardSampleCache
+    geometries: GeometryStore
 
     _site: Site
 
@@ -62,6 +74,9 @@ class Database(IDatabase):
 
     _static: DbsStatic
 
+    _cleanup_thread: Optional[threading.Thread] = None
+    _index_lock = threading.Lock()
+
     def __new__(cls, *args, **kwargs):
         if not cls._instance:  # Singleton pattern
             cls._instance = super(Database, cls).__new__(cls)
@@ -100,6 +115,8 @@ class Database(IDatabase):
             return  # Skip re-initialization
 
         # If the database is not initialized, or a new path or name is provided, (re-)initialize
+        # The cleanup of the previous database should not continue with the paths of the new one
+        self.wait_for_cleanup()
         re_option = "re-" if self._init_done else ""
         logger.info(
             f"{re_option}initializing database to {database_name} at {database_path}".capitalize()
@@ -112,17 +129,39 @@ class Database(IDatabase):
         self.input_path = self.base_path / "input"
         self.static_path = self.base_path / "static"
         self.output_path = self.base_path / "output"
+        self.hazard_store = HazardStore(self.output_path / "hazards")
+        self.hazard_samples = HazardSampleCache(self.output_path / "hazard_samples")
+        self.geometries = GeometryStore(self.static_path / "geometries")
+        fast_open = Settings().fast_database_open
+        timings = {}
 
+        start = time.perf_counter()
         self.read_site()
+        timings["read site"] = time.perf_counter() - start
 
         self._init_done = True
 
         # Ensure the index GeoTIFF exists for the new GUI while keeping legacy tiles
         # available for older GUIs that still read them.
-        self._migrate_deprecated_tiles()
+        # When opening fast, it is generated when it is first requested in `get_index_path`.
+        if not fast_open:
+            start = time.perf_counter()
+            self._migrate_deprecated_tiles()
+            timings["index migration"] = time.perf_counter() - start
 
         # Delete any unfinished/crashed scenario output after initialization
-        self.cleanup()
+        if fast_open:
+            self._start_cleanup()
+        else:
+            start = time.perf_counter()
+            self.cleanup()
+            timings["cleanup"] = time.perf_counter() - start
+
+        logger.info(
+            f"Opened database in {sum(timings.values()):.2f} s ("
+            + ", ".join(f"{phase}: {t:.2f} s" for phase, t in timings.items())
+            + ")"
+        )
 
     def read_site(self, site_name: str = "site"):
         self._site = Site.load_file(self.static_path / "config" / f"{site_name}.toml")
@@ -144,6 +183,7 @@ class Database(IDatabase):
 
     def shutdown(self):
         """Explicitly shut down the singleton and clear all references."""
+        self.wait_for_cleanup()
         self._instance = None
         self._init_done = False
 
@@ -204,14 +244,20 @@ class Database(IDatabase):
         Returns
         -------
         dict[str, Any]
-            Includes 'name', 'path', 'last_modification_date' and "finished" info
+            Includes 'name', 'path', 'last_modification_date' and 'impact_engine' info. The impact engine is None
+            for outputs that were produced before it was recorded.
         """
+        self.wait_for_cleanup()
         all_scenarios = pd.DataFrame(self._scenarios.summarize_objects())
         if len(all_scenarios) > 0:
             df = all_scenarios[all_scenarios["finished"]]
         else:
             df = all_scenarios
         finished = df.drop(columns="finished").reset_index(drop=True)
+        finished["impact_engine"] = [
+            read_impact_record(self.get_impacts_path(name)).get("impact_engine")
+            for name in finished.get("name", [])
+        ]
         return finished.to_dict()
 
     def get_floodmap(self, scenario_name: str) -> FloodMap:
@@ -299,6 +345,8 @@ class Database(IDatabase):
             path to index GeoTIFF
         """
         index_path = self.static_path / "dem" / "index.tif"
+        if not index_path.exists():
+            self._migrate_deprecated_tiles()
         return index_path.as_posix()
 
     def _migrate_deprecated_tiles(self) -> None:
@@ -308,7 +356,8 @@ class Database(IDatabase):
         under ``static/dem/tiles``. The current GUI (Guitares image overlays via
         cht_tiling) reads single GeoTIFFs: the subgrid DEM
         (``{self.site.sfincs.dem.filename}``) and an index raster (``index.tif``).
-        This runs once when a database is opened and generates ``index.tif`` from the
+        This runs once when a database is opened, or when the index is first requested if
+        ``Settings().fast_database_open`` is set, and generates ``index.tif`` from the
         overland SFINCS model if it is missing, while leaving any legacy tiles in
         place so older GUIs can still open the database.
 
@@ -319,7 +368,9 @@ class Database(IDatabase):
         index_path = dem_dir / "index.tif"
 
         # 1. Ensure the index GeoTIFF exists.
-        if not index_path.exists():
+        with self._index_lock:
+            if index_path.exists():
+                return
             logger.warning(
                 f"Index GeoTIFF not found at {index_path.as_posix()}. This database "
                 "predates the single-GeoTIFF DEM format used by the GUI. Generating it "
@@ -470,10 +521,8 @@ class Database(IDatabase):
             impacts at footprint level
         """
         out_path = self.scenarios.output_path.joinpath(scenario_name, "Impacts")
-        footprints = out_path / f"Impacts_building_footprints_{scenario_name}.gpkg"
-        gdf = gpd.read_file(footprints, engine="pyogrio")
-        gdf = gdf.to_crs(4326)
-        return gdf
+        footprints = out_path / f"Impacts_building_footprints_{scenario_name}"
+        return read_spatial_output(footprints, crs=4326)
 
     def get_roads(self, scenario_name: str) -> GeoDataFrame:
         """Return a geodataframe of the impacts at roads.
@@ -489,10 +538,30 @@ class Database(IDatabase):
             Impacts at roads
         """
         out_path = self.scenarios.output_path.joinpath(scenario_name, "Impacts")
-        roads = out_path / f"Impacts_roads_{scenario_name}.gpkg"
-        gdf = gpd.read_file(roads, engine="pyogrio")
-        gdf = gdf.to_crs(4326)
-        return gdf
+        roads = out_path / f"Impacts_roads_{scenario_name}"
+        return read_spatial_output(roads, crs=4326)
+
+    def export_spatial_impacts(
+        self, scenario_name: str, output_dir: Optional[Path] = None
+    ) -> list[Path]:
+        """Export the spatial impacts of a scenario as self-contained GeoPackages.
+
+        The spatial impacts in the output folder only hold attributes and refer to the geometries shared by all
+        scenarios, so they cannot be opened or copied on their own, see `GeometryStore`.
+
+        Parameters
+        ----------
+        scenario_name : str
+            name of the scenario
+        output_dir : Path, optional
+            folder to write the GeoPackages to, by default the Impacts folder of the scenario
+
+        Returns
+        -------
+        list[Path]
+            paths of the exported GeoPackages
+        """
+        return export_spatial_outputs(self.get_impacts_path(scenario_name), output_dir)
 
     def get_aggregation(self, scenario_name: str) -> dict[str, gpd.GeoDataFrame]:
         """Return a dictionary with the aggregated impacts as geodataframes.
@@ -509,10 +578,13 @@ class Database(IDatabase):
         """
         out_path = self.scenarios.output_path.joinpath(scenario_name, "Impacts")
         gdfs = {}
-        for aggr_area in out_path.glob(f"Impacts_aggregated_{scenario_name}_*.gpkg"):
-            label = aggr_area.stem.split(f"{scenario_name}_")[-1]
-            gdfs[label] = gpd.read_file(aggr_area, engine="pyogrio")
-            gdfs[label] = gdfs[label].to_crs(4326)
+        # Scenarios run with an earlier version have GeoPackages instead of attribute tables
+        for suffix in [".gpkg", ".parquet"]:
+            for aggr_area in out_path.glob(
+                f"Impacts_aggregated_{scenario_name}_*{suffix}"
+            ):
+                label = aggr_area.stem.split(f"{scenario_name}_")[-1]
+                gdfs[label] = read_spatial_output(aggr_area, crs=4326)
         return gdfs
 
     def get_aggregation_benefits(
@@ -579,47 +651,67 @@ class Database(IDatabase):
     def has_run_hazard(self, scenario_name: str) -> None:
         """Check if there is already a simulation that has the exact same hazard component.
 
-        If yes that is copied to avoid running the hazard model twice.
+        If yes, the stored hazard results are linked into the scenario output to avoid running the hazard model twice.
+        Results are looked up by the hazard key of the scenario in the hazard store, see `DbsScenario.hazard_key`.
 
         Parameters
         ----------
         scenario_name : str
             name of the scenario to check if needs to be rerun for hazard
         """
+        self.wait_for_cleanup()
+        if not self.hazard_store.path.is_dir():
+            self._fill_hazard_store()
+
         scenario = self.scenarios.get(scenario_name)
+        key = self.scenarios.hazard_key(scenario)
+        flooding_path = self.scenarios.output_path.joinpath(scenario.name, "Flooding")
 
-        # Dont do anything if the hazard model has already been run in itself
+        # Dont do anything if the hazard model has already been run in itself, other than making it reusable
         if ScenarioRunner(self, scenario=scenario).hazard_run_check():
+            self.hazard_store.add(key, flooding_path, owner=scenario.name)
             return
 
-        scenarios = [
-            self.scenarios.get(scn)
-            for scn in self.scenarios.summarize_objects()["name"]
-        ]
-        scns_simulated = [
-            sim
-            for sim in scenarios
-            if self.scenarios.output_path.joinpath(sim.name, "Flooding").is_dir()
-        ]
+        if self.hazard_store.contains(key):
+            self.hazard_store.link(key, flooding_path, owner=scenario.name)
+            logger.info(
+                f"Hazard simulation is reused from the hazard store (key `{key}`)"
+            )
 
-        for scn in scns_simulated:
-            if self.scenarios.equal_hazard_components(scn, scenario):
-                existing = self.scenarios.output_path.joinpath(scn.name, "Flooding")
-                path_new = self.scenarios.output_path.joinpath(
-                    scenario.name, "Flooding"
-                )
+    def store_hazard(self, scenario_name: str) -> None:
+        """Add the hazard results of a scenario to the hazard store, so other scenarios with the same hazard components can reuse them.
 
-                if ScenarioRunner(self, scenario=scn).hazard_run_check():
-                    # only copy results if the hazard model has actually finished and skip simulation folders
-                    shutil.copytree(
-                        existing,
-                        path_new,
-                        dirs_exist_ok=True,
-                        ignore=shutil.ignore_patterns("simulations"),
-                    )
-                    logger.info(
-                        f"Hazard simulation is used from the '{scn.name}' scenario"
-                    )
+        Nothing is done if the hazard model of the scenario has not finished.
+
+        Parameters
+        ----------
+        scenario_name : str
+            name of the scenario of which the hazard results are stored
+        """
+        scenario = self.scenarios.get(scenario_name)
+        if not ScenarioRunner(self, scenario=scenario).hazard_run_check():
+            return
+        self.hazard_store.add(
+            self.scenarios.hazard_key(scenario),
+            self.scenarios.output_path.joinpath(scenario.name, "Flooding"),
+            owner=scenario.name,
+        )
+
+    def _fill_hazard_store(self) -> None:
+        """Add the finished hazard results of all scenarios to the hazard store.
+
+        Runs once, when the hazard store does not exist yet, to make the results of scenarios that were run before the store existed available.
+        """
+        self.hazard_store.path.mkdir(parents=True, exist_ok=True)
+        for scn in self.scenarios.summarize_objects()["name"]:
+            if not self.scenarios.output_path.joinpath(scn, "Flooding").is_dir():
+                continue
+            try:
+                self.store_hazard(scn)
+            except Exception as e:
+                logger.warning(
+                    f"Could not add the hazard results of scenario `{scn}` to the hazard store: {e}"
+                )
 
     def cleanup(self) -> None:
         """
@@ -629,89 +721,118 @@ class Database(IDatabase):
             - is corrupted due to unfinished runs
             - does not have a corresponding input
 
+        The stored hazard results, hazard samples and impact geometries of scenarios and the offshore water levels of
+        events that no longer exist are evicted as well.
+        The simulation folders of finished scenarios are removed depending on `save_simulation`.
+        A scenario of which the output cannot be cleaned up is logged and skipped, so the other scenarios are still cleaned up.
         """
         if not self.scenarios.output_path.is_dir():
             return
 
-        input_scenarios = [
-            (self.scenarios.input_path / dir).resolve()
-            for dir in os.listdir(self.scenarios.input_path)
-        ]
-        output_scenarios = [
-            (self.scenarios.output_path / dir).resolve()
-            for dir in os.listdir(self.scenarios.output_path)
-        ]
+        input_scenarios = set(os.listdir(self.scenarios.input_path))
+        for _dir in sorted(self.scenarios.output_path.iterdir()):
+            try:
+                # Delete if: input was deleted or corrupted output due to unfinished run
+                if _dir.name not in input_scenarios or not finished_file_exists(_dir):
+                    logger.info(
+                        f"Cleaning up corrupted outputs of scenario: {_dir.name}."
+                    )
+                    shutil.rmtree(_dir, ignore_errors=True)
+                # If the scenario is finished, delete the simulation folders depending on `save_simulation`
+                else:
+                    self._delete_simulations(_dir.name)
+            except Exception as e:
+                logger.warning(
+                    f"Could not clean up the output of scenario `{_dir.name}`: {e}"
+                )
 
-        # Init model instances outside the loop
-        overland = self.static.get_overland_sfincs_model()
-        fiat = self.static.get_fiat_model()
-        if self.site.sfincs.config.offshore_model is not None:
-            offshore = self.static.get_offshore_sfincs_model()
-        else:
-            offshore = None
-
-        for _dir in output_scenarios:
-            # Delete if: input was deleted or corrupted output due to unfinished run
-            if _dir.name not in [
-                path.name for path in input_scenarios
-            ] or not finished_file_exists(_dir):
-                logger.info(f"Cleaning up corrupted outputs of scenario: {_dir.name}.")
-                shutil.rmtree(_dir, ignore_errors=True)
-            # If the scenario is finished, delete the simulation folders depending on `save_simulation`
-            elif finished_file_exists(_dir):
-                self._delete_simulations(_dir.name, overland, fiat, offshore)
-
-    def _delete_simulations(
-        self,
-        scenario_name: str,
-        overland: SfincsAdapter,
-        fiat: FiatAdapter,
-        offshore: Optional[SfincsAdapter],
-    ) -> None:
+        # Evict the hazard samples of scenarios that no longer exist
+        self.hazard_store.prune(input_scenarios)
+        self.hazard_samples.prune(input_scenarios)
+        self.geometries.prune(input_scenarios)
+        self._prune_offshore_cache()
+
+    def _prune_offshore_cache(self) -> None:
+        """Remove the cached offshore water levels of events that no longer exist, see `DbsEvent.delete`."""
+        offshore_path = self.output_path / "offshore"
+        if not offshore_path.is_dir():
+            return
+
+        input_events = set(os.listdir(self.events.input_path))
+        for path in offshore_path.iterdir():
+            # Files directly in the cache folder were cached before the water levels were stored per event
+            if path.is_dir() and path.name in input_events:
+                continue
+            logger.info(f"Removing cached offshore water levels: {path.name}.")
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+
+    def wait_for_cleanup(self) -> None:
+        """Wait until the cleanup of the scenario output that was started in the background is done.
+
+        The cleanup runs in the background when the database is opened with `Settings().fast_database_open`.
+        """
+        thread = self._cleanup_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _start_cleanup(self) -> None:
+        """Start the cleanup of the scenario output in a background thread."""
+
+        def _cleanup():
+            start = time.perf_counter()
+            try:
+                self.cleanup()
+            except Exception as e:
+                logger.warning(f"Could not clean up the scenario output: {e}")
+                return
+            logger.info(
+                f"Cleaned up the scenario output in {time.perf_counter() - start:.2f} s"
+            )
+
+        self._cleanup_thread = threading.Thread(
+            target=_cleanup, name="FloodAdaptCleanup", daemon=True
+        )
+        self._cleanup_thread.start()
+
+    def _delete_simulations(self, scenario_name: str) -> None:
         """Delete all simulation folders for a given scenario.
 
+        The folders are found from the scenario output only, so no model adapters are created and no scenario or
+        event has to be read. SFINCS simulations are stored in `Flooding/simulations/<model>`, or in
+        `Flooding/simulations/<sub_event>/<model>` for risk scenarios, and the Delft-FIAT simulation in `Impacts/fiat_model`.
+
         Parameters
         ----------
         scenario_name : str
             Name of the scenario to delete simulations for.
         """
-        scn = self.scenarios.get(scenario_name)
-        event = self.events.get(scn.event, load_all=True)
-        sub_events = event._events if event.mode == Mode.risk else None
-
-        if not self.site.sfincs.config.save_simulation:
-            # Delete SFINCS overland
-            if sub_events:
-                for sub_event in sub_events:
-                    overland._delete_simulation_folder(scn, sub_event=sub_event)
-            else:
-                overland._delete_simulation_folder(scn)
-
-            # Delete SFINCS offshore
-            if self.site.sfincs.config.offshore_model and offshore is not None:
-                if sub_events:
-                    for sub_event in sub_events:
-                        sim_path = offshore._get_simulation_path_offshore(
-                            scn, sub_event=sub_event
-                        )
-                        if sim_path.exists():
-                            shutil.rmtree(sim_path, ignore_errors=True)
-                            logger.info(f"Deleted simulation folder: {sim_path}")
-                        if sim_path.parent.exists() and not any(
-                            sim_path.parent.iterdir()
-                        ):
-                            # Remove the parent directory `simulations` if it is empty
-                            shutil.rmtree(sim_path.parent, ignore_errors=True)
-                else:
-                    sim_path = offshore._get_simulation_path_offshore(scn)
-                    if sim_path.exists():
+        scenario_output = self.scenarios.output_path / scenario_name
+
+        simulations_path = scenario_output / "Flooding" / "simulations"
+        if not self.site.sfincs.config.save_simulation and simulations_path.is_dir():
+            model_names = [self.site.sfincs.config.overland_model.name]
+            if self.site.sfincs.config.offshore_model is not None:
+                model_names.append(self.site.sfincs.config.offshore_model.name)
+
+            for model_name in model_names:
+                # Single event and risk (one folder per sub-event) simulations
+                for sim_path in [
+                    simulations_path / model_name,
+                    *simulations_path.glob(f"*/{model_name}"),
+                ]:
+                    if sim_path.is_dir():
                         shutil.rmtree(sim_path, ignore_errors=True)
                         logger.info(f"Deleted simulation folder: {sim_path}")
 
-                    if sim_path.parent.exists() and not any(sim_path.parent.iterdir()):
-                        # Remove the parent directory `simulations` if it is empty
-                        shutil.rmtree(sim_path.parent, ignore_errors=True)
+            # Remove the sub-event folders and the `simulations` folder if they are empty
+            for path in [*simulations_path.iterdir(), simulations_path]:
+                if path.is_dir() and not any(path.iterdir()):
+                    shutil.rmtree(path, ignore_errors=True)
 
-        if not self.site.fiat.config.save_simulation:
-            # Delete FIAT
-            fiat._delete_simulation_folder(scn)
+        fiat_path = scenario_output / "Impacts" / "fiat_model"
+        if not self.site.fiat.config.save_simulation and fiat_path.is_dir():
+            shutil.rmtree(fiat_path, ignore_errors=True)
+            logger.info(f"Deleted Delft-FIAT simulation folder: {fiat_path}")
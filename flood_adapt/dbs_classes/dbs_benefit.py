@@ -8,6 +8,15 @@ class DbsBenefit(DbsTemplate[Benefit]):
     dir_name = "benefits"
     _object_class = Benefit
     _higher_lvl_object = ""
+    _indexed_fields = (
+        "name",
+        "description",
+        "event_set",
+        "projection",
+        "current_situation",
+        "strategy",
+        "baseline_strategy",
+    )
 
     def save(self, object_model: Benefit, overwrite: bool = False):
         """Save a benefit object in the database.
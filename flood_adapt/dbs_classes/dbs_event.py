@@ -1,3 +1,4 @@
+import shutil
 from pathlib import Path
 
 from flood_adapt.dbs_classes.dbs_template import DbsTemplate
@@ -33,8 +34,25 @@ class DbsEvent(DbsTemplate[Event]):
         if not Path(event_path).is_file():
             raise DoesNotExistError(name, self.display_name)
 
-        # Load event
-        return EventFactory.load_file(event_path, load_all=load_all)
+        # Load event, with all sub events of an event set also depending on their toml files
+        return self._get_cached(
+            name,
+            event_path,
+            lambda path: EventFactory.load_file(path, load_all=load_all),
+            key=(load_all,),
+            dependencies=sorted(event_path.parent.glob("*/*.toml")) if load_all else (),
+        )
+
+    def delete(self, name: str, toml_only: bool = False):
+        """Delete an already existing event from the database.
+
+        The offshore water levels that were cached for the event are removed as well.
+        See `DbsTemplate.delete` for the parameters and errors.
+        """
+        super().delete(name, toml_only=toml_only)
+        shutil.rmtree(
+            self._database.output_path / "offshore" / name, ignore_errors=True
+        )
 
     def check_higher_level_usage(self, name: str) -> list[str]:
         """Check if an event is used in a scenario.
@@ -49,14 +67,4 @@ class DbsEvent(DbsTemplate[Event]):
         list[str]
             list of scenarios that use the event
         """
-        # Get all the scenarios
-        scenarios = [
-            self._database.scenarios.get(scn)
-            for scn in self._database.scenarios.summarize_objects()["name"]
-        ]
-
-        # Check if event is used in a scenario
-        used_in_scenario = [
-            scenario.name for scenario in scenarios if name == scenario.event
-        ]
-        return used_in_scenario
+        return self._database.scenarios.get_dependents("event").get(name, [])
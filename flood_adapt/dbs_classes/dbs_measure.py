@@ -1,5 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 import geopandas as gpd
 
@@ -37,7 +38,7 @@ class DbsMeasure(DbsTemplate[Measure]):
             raise DoesNotExistError(name, self.display_name)
 
         # Load and return the object
-        return MeasureFactory.get_measure_object(full_path)
+        return self._get_cached(name, full_path, MeasureFactory.get_measure_object)
 
     def summarize_objects(self) -> dict[str, list[Any]]:
         """Return a dictionary with info on the measures that currently exist in the database.
@@ -48,42 +49,45 @@ class DbsMeasure(DbsTemplate[Measure]):
             Includes 'name', 'description', 'path' and 'last_modification_date' and 'geometry' info
         """
         measures = self._get_object_summary()
-        objects = [self.get(name) for name in measures["name"]]
-
-        geometries = []
-        for obj in objects:
-            # If polygon is used read the polygon file
-            if hasattr(obj, "polygon_file") and obj.polygon_file:
-                src_path = resolve_filepath(
-                    object_dir=self.dir_name,
-                    obj_name=obj.name,
-                    path=obj.polygon_file,
-                )
-                geometries.append(gpd.read_file(src_path))
-            # If aggregation area is used read the polygon from the aggregation area name
-            elif hasattr(obj, "aggregation_area_name") and obj.aggregation_area_name:
-                if (
-                    obj.aggregation_area_type
-                    not in self._database.static.get_aggregation_areas()
-                ):
-                    raise DatabaseError(
-                        f"Aggregation area type {obj.aggregation_area_type} for measure {obj.name} does not exist."
-                    )
-                gdf = self._database.static.get_aggregation_areas()[
-                    obj.aggregation_area_type
-                ]
-                if obj.aggregation_area_name not in gdf["name"].to_numpy():
-                    raise DatabaseError(
-                        f"Aggregation area name {obj.aggregation_area_name} for measure {obj.name} does not exist."
-                    )
-                geometries.append(gdf.loc[gdf["name"] == obj.aggregation_area_name, :])
-            # Else assign a None value
-            else:
-                geometries.append(None)
+        objects = self.get_many(measures["name"])
+
+        # the polygon files are read concurrently as well
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            geometries = list(executor.map(self._get_geometry, objects))
 
         measures["geometry"] = geometries
         return measures
 
+    def _get_geometry(self, obj: Measure) -> Optional[gpd.GeoDataFrame]:
+        """Return the geometry of a measure, from its polygon file or aggregation area, or None if it has neither."""
+        # If polygon is used read the polygon file
+        if hasattr(obj, "polygon_file") and obj.polygon_file:
+            src_path = resolve_filepath(
+                object_dir=self.dir_name,
+                obj_name=obj.name,
+                path=obj.polygon_file,
+            )
+            return gpd.read_file(src_path)
+        # If aggregation area is used read the polygon from the aggregation area name
+        elif hasattr(obj, "aggregation_area_name") and obj.aggregation_area_name:
+            if (
+                obj.aggregation_area_type
+                not in self._database.static.get_aggregation_areas()
+            ):
+                raise DatabaseError(
+                    f"Aggregation area type {obj.aggregation_area_type} for measure {obj.name} does not exist."
+                )
+            gdf = self._database.static.get_aggregation_areas()[
+                obj.aggregation_area_type
+            ]
+            if obj.aggregation_area_name not in gdf["name"].to_numpy():
+                raise DatabaseError(
+                    f"Aggregation area name {obj.aggregation_area_name} for measure {obj.name} does not exist."
+                )
+            return gdf.loc[gdf["name"] == obj.aggregation_area_name, :]
+        # Else there is no geometry
+        return None
+
     def check_higher_level_usage(self, name: str) -> list[str]:
         """Check if a measure is used in a strategy.
 
@@ -97,17 +101,4 @@ class DbsMeasure(DbsTemplate[Measure]):
         list[str]
             list of strategies that use the measure
         """
-        # Get all the strategies
-        strategies = [
-            self._database.strategies.get(strategy)
-            for strategy in self._database.strategies.summarize_objects()["name"]
-        ]
-
-        # Check if measure is used in a strategy
-        used_in_strategy = [
-            strategy.name
-            for strategy in strategies
-            for measure in strategy.measures
-            if name == measure
-        ]
-        return used_in_strategy
+        return self._database.strategies.get_dependents("measures").get(name, [])
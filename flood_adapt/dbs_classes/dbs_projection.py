@@ -21,15 +21,4 @@ class DbsProjection(DbsTemplate[Projection]):
         list[str]
             list of scenarios that use the projection
         """
-        # Get all the scenarios
-        scenarios = [
-            self._database.scenarios.get(scn)
-            for scn in self._database.scenarios.summarize_objects()["name"]
-        ]
-
-        # Check if projection is used in a scenario
-        used_in_scenario = [
-            scenario.name for scenario in scenarios if name == scenario.projection
-        ]
-
-        return used_in_scenario
+        return self._database.scenarios.get_dependents("projection").get(name, [])
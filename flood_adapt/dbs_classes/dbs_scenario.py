@@ -1,10 +1,17 @@
+import hashlib
+import json
 from typing import Any
 
+from flood_adapt.adapter.sfincs_offshore import OffshoreSfincsHandler
 from flood_adapt.dbs_classes.dbs_template import DbsTemplate
-from flood_adapt.misc.utils import finished_file_exists
-from flood_adapt.objects.events.events import Mode
+from flood_adapt.misc.fingerprint import directory_fingerprint, file_fingerprint
+from flood_adapt.misc.path_builder import ObjectDir
+from flood_adapt.misc.utils import finished_file_exists, resolve_filepath
+from flood_adapt.objects.events.event_set import EventSet
+from flood_adapt.objects.events.events import Event
+from flood_adapt.objects.measures.measures import Measure
+from flood_adapt.objects.projections.projections import Projection
 from flood_adapt.objects.scenarios.scenarios import Scenario
-from flood_adapt.workflows.benefit_runner import BenefitRunner
 
 
 class DbsScenario(DbsTemplate[Scenario]):
@@ -12,6 +19,30 @@ class DbsScenario(DbsTemplate[Scenario]):
     display_name = "Scenario"
     _object_class = Scenario
     _higher_lvl_object = "Benefit"
+    _indexed_fields = ("name", "description", "projection", "event", "strategy")
+
+    def save(self, object_model: Scenario, overwrite: bool = False):
+        """Save a scenario in the database.
+
+        Waits for the cleanup of the scenario output that runs in the background, so it cannot remove the output of
+        the saved scenario. See `DbsTemplate.save` for the parameters and errors.
+        """
+        self._database.wait_for_cleanup()
+        super().save(object_model, overwrite=overwrite)
+
+    def delete(self, name: str, toml_only: bool = False):
+        """Delete an already existing scenario as well as its outputs from the database.
+
+        Waits for the cleanup of the scenario output that runs in the background before removing the output.
+        The stored hazard results of the scenario, its sampled hazard values and the geometries of its spatial impacts
+        are evicted if no other scenario uses them.
+        See `DbsTemplate.delete` for the parameters and errors.
+        """
+        self._database.wait_for_cleanup()
+        super().delete(name, toml_only=toml_only)
+        self._database.hazard_store.release(name)
+        self._database.hazard_samples.release(name)
+        self._database.geometries.release(name)
 
     def summarize_objects(self) -> dict[str, list[Any]]:
         """Return a dictionary with info on the events that currently exist in the database.
@@ -21,17 +52,10 @@ class DbsScenario(DbsTemplate[Scenario]):
         dict[str, Any]
             Includes 'name', 'description', 'path' and 'last_modification_date' info
         """
-        scenarios = super().summarize_objects()
-        scenarios["Projection"] = [
-            self._read_variable_in_toml("projection", path)
-            for path in scenarios["path"]
-        ]
-        scenarios["Event"] = [
-            self._read_variable_in_toml("event", path) for path in scenarios["path"]
-        ]
-        scenarios["Strategy"] = [
-            self._read_variable_in_toml("strategy", path) for path in scenarios["path"]
-        ]
+        scenarios = self._get_object_summary()
+        scenarios["Projection"] = scenarios.pop("projection")
+        scenarios["Event"] = scenarios.pop("event")
+        scenarios["Strategy"] = scenarios.pop("strategy")
         scenarios["finished"] = [self.has_run_check(scn) for scn in scenarios["name"]]
 
         return scenarios
@@ -49,63 +73,170 @@ class DbsScenario(DbsTemplate[Scenario]):
             list[str]
                 list of benefits that use the scenario
         """
-        benefits = [
-            self._database.benefits.get(benefit)
-            for benefit in self._database.benefits.summarize_objects()["name"]
-        ]
+        # A benefit uses the first scenario with the event, projection and strategy of each of its scenarios,
+        # like BenefitRunner.check_scenarios. All fields are read from the object index.
+        scenarios = self._get_object_summary()
+        scenario_names = {}
+        for scenario in zip(
+            scenarios["event"],
+            scenarios["projection"],
+            scenarios["strategy"],
+            scenarios["name"],
+        ):
+            scenario_names.setdefault(scenario[:3], scenario[3])
+
+        benefits = self._database.benefits._get_object_summary()
         used_in_benefit = []
-        for benefit in benefits:
-            runner = BenefitRunner(database=self._database, benefit=benefit)
-            scenarios = runner.scenarios["scenario created"].to_list()
-            for scenario in scenarios:
-                if name == scenario:
-                    used_in_benefit.append(benefit.name)
+        for i, benefit in enumerate(benefits["name"]):
+            projections = [
+                (benefits["current_situation"][i] or {}).get("projection"),
+                benefits["projection"][i],
+            ]
+            strategies = [benefits["baseline_strategy"][i], benefits["strategy"][i]]
+            scenarios = [
+                scenario_names.get((benefits["event_set"][i], projection, strategy))
+                for projection in projections
+                for strategy in strategies
+            ]
+            used_in_benefit.extend([benefit] * scenarios.count(name))
 
         return used_in_benefit
 
-    def equal_hazard_components(self, left: Scenario, right: Scenario) -> bool:
-        """Check if two scenarios have the same hazard components.
+    def hazard_key(self, scenario: Scenario) -> str:
+        """Return a key that identifies the hazard components of a scenario.
+
+        The key is a hash of the event data (including the contents of forcing files), the physical projection, the
+        hazard measures (including the contents of their polygon files), the contents of the overland SFINCS template
+        model and of the site configuration files. For events that need an offshore run, the contents of the offshore
+        SFINCS template model are part of the key as well. Names and descriptions are not part of the key, so
+        scenarios with equal hazard components have the same key and can share hazard results.
 
         Parameters
         ----------
-        left : Scenario
-            first scenario to be compared
-        right : Scenario
-            second scenario to be compared
+        scenario : Scenario
+            scenario to compute the hazard key for
 
         Returns
         -------
-            bool
-                True if the scenarios have the same hazard components, False otherwise
+            str
+                SHA-256 hex digest of the hazard components
         """
-        event_left = self._database.events.get(left.event)
-        event_right = self._database.events.get(right.event)
-
-        if event_left.mode == event_right.mode == Mode.single_event:
-            # Deep-compare events including forcing data contents
-            equal_events = event_left.data_equivalent(event_right)
-        elif event_left.mode == event_right.mode == Mode.risk:
-            # Check only event set
-            equal_events = event_left == event_right
-        else:
-            # Only same mode events can be compared, if modes differ, they are not equal
-            equal_events = False
+        event = self._database.events.get(scenario.event, load_all=True)
+        projection = self._database.projections.get(scenario.projection)
+        strategy = self._database.strategies.get(
+            scenario.strategy
+        ).get_hazard_strategy()
 
-        left_projection = self._database.projections.get(left.projection)
-        right_projection = self._database.projections.get(right.projection)
-        equal_projection = (
-            left_projection.physical_projection == right_projection.physical_projection
-        )
+        components = {
+            "event": self._event_fingerprint(event),
+            "physical_projection": projection.physical_projection.model_dump(
+                mode="json", exclude_none=True
+            ),
+            "hazard_measures": sorted(
+                self._measure_fingerprint(measure)
+                for measure in strategy.get_measures()
+            ),
+            "hazard_template": directory_fingerprint(
+                self._database.static_path
+                / "templates"
+                / self._database.site.sfincs.config.overland_model.name
+            ),
+            "site": directory_fingerprint(self._database.static_path / "config"),
+        }
+        offshore_model = self._database.site.sfincs.config.offshore_model
+        sub_events = event._events if isinstance(event, EventSet) else [event]
+        if offshore_model is not None and any(
+            OffshoreSfincsHandler.requires_offshore_run(sub_event)
+            for sub_event in sub_events
+        ):
+            components["offshore_template"] = directory_fingerprint(
+                self._database.static_path / "templates" / offshore_model.name
+            )
+        payload = json.dumps(components, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def impact_key(self, scenario: Scenario) -> str:
+        """Return a key that identifies the components of the impacts of a scenario, except its impact measures.
+
+        The key is a hash of the hazard key, the socioeconomic projection (including the contents of its files), the
+        contents of the impact model template and of the site configuration files. Scenarios with the same key only differ in
+        their impact measures, so the impacts of the objects that are not affected by the measures are the same.
 
-        left_strategy = self._database.strategies.get(
-            left.strategy
-        ).get_hazard_strategy()
-        right_strategy = self._database.strategies.get(
-            right.strategy
-        ).get_hazard_strategy()
-        equal_strategy = left_strategy == right_strategy
+        Parameters
+        ----------
+        scenario : Scenario
+            scenario to compute the impact key for
 
-        return equal_events and equal_projection and equal_strategy
+        Returns
+        -------
+            str
+                SHA-256 hex digest of the impact components
+        """
+        projection = self._database.projections.get(scenario.projection)
+        components = {
+            "hazard": self.hazard_key(scenario),
+            "socio_economic_change": self._socio_economic_fingerprint(projection),
+            "impact_template": directory_fingerprint(
+                self._database.static_path / "templates" / "fiat"
+            ),
+            "site": directory_fingerprint(self._database.static_path / "config"),
+        }
+        payload = json.dumps(components, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _socio_economic_fingerprint(self, projection: Projection) -> dict[str, Any]:
+        socio_economic_change = projection.socio_economic_change
+        fingerprint = socio_economic_change.model_dump(mode="json", exclude_none=True)
+        if socio_economic_change.new_development_shapefile:
+            shapefile = resolve_filepath(
+                ObjectDir.projection,
+                projection.name,
+                socio_economic_change.new_development_shapefile,
+            )
+            fingerprint["new_development_shapefile"] = file_fingerprint(shapefile)
+            # the elevation of new developments is derived from the DEM
+            fingerprint["dem"] = file_fingerprint(
+                self._database.static_path
+                / "dem"
+                / self._database.site.sfincs.dem.filename
+            )
+        return fingerprint
+
+    @staticmethod
+    def _event_fingerprint(event: Event | EventSet) -> dict[str, Any]:
+        fingerprint = event.model_dump(
+            mode="json", exclude={"name", "description", "forcings"}, exclude_none=True
+        )
+        if isinstance(event, EventSet):
+            fingerprint["sub_events"] = [
+                {
+                    "frequency": sub_event.frequency,
+                    "event": DbsScenario._event_fingerprint(sub_event_obj),
+                }
+                for sub_event, sub_event_obj in zip(event.sub_events, event._events)
+            ]
+        else:
+            fingerprint["forcings"] = sorted(
+                (
+                    forcing.type.value,
+                    forcing.source.value,
+                    forcing.content_fingerprint(),
+                )
+                for forcing in event.get_forcings()
+            )
+        return fingerprint
+
+    @staticmethod
+    def _measure_fingerprint(measure: Measure) -> str:
+        fingerprint = measure.model_dump(
+            mode="json", exclude={"name", "description"}, exclude_none=True
+        )
+        if measure.polygon_file:
+            polygon_file = resolve_filepath(
+                ObjectDir.measure, measure.name, measure.polygon_file
+            )
+            fingerprint["polygon_file"] = file_fingerprint(polygon_file)
+        return json.dumps(fingerprint, sort_keys=True, default=str)
 
     def has_run_check(self, name: str) -> bool:
         """Check if the scenario has been run.
@@ -5,6 +5,7 @@ import geopandas as gpd
 import pandas as pd
 from cht_cyclones.cyclone_track_database import CycloneTrackDatabase
 
+from flood_adapt.adapter.damage_engine import DamageEngineAdapter
 from flood_adapt.adapter.fiat_adapter import FiatAdapter
 from flood_adapt.adapter.interface.hazard_adapter import IHazardAdapter
 from flood_adapt.adapter.interface.impact_adapter import IImpactAdapter
@@ -245,6 +246,8 @@ class DbsStatic(IDbsStatic):
         list[ImpactAdapter]
             List of impact models
         """
+        if self._database.site.fiat.config.in_process_damages:
+            return [self.get_damage_engine_model()]
         return [self.get_fiat_model()]
 
     def get_overland_sfincs_model(self) -> SfincsAdapter:
@@ -284,6 +287,18 @@ class DbsStatic(IDbsStatic):
         ) as fm:
             return fm
 
+    def get_damage_engine_model(self) -> DamageEngineAdapter:
+        """Get the FIAT model with the in-process damage engine."""
+        if self._database.site.fiat is None:
+            raise ConfigError("No FIAT model defined in the site configuration.")
+        template_path = self._database.static_path / "templates" / "fiat"
+        with DamageEngineAdapter(
+            model_root=template_path,
+            config=self._database.site.fiat.config,
+            config_base_path=self._database.static_path,
+        ) as fm:
+            return fm
+
     @cache_method_wrapper
     def get_cyclone_track_database(self) -> CycloneTrackDatabase:
         if self._database.site.sfincs.cyclone_track_database is None:
@@ -11,6 +11,7 @@ class DbsStrategy(DbsTemplate[Strategy]):
     display_name = "Strategy"
     _object_class = Strategy
     _higher_lvl_object = "Scenario"
+    _indexed_fields = ("name", "description", "measures")
 
     def get(self, name: str) -> Strategy:
         strategy = super().get(name)
@@ -62,6 +63,8 @@ class DbsStrategy(DbsTemplate[Strategy]):
         object_model.save(
             self.input_path / object_model.name / f"{object_model.name}.toml",
         )
+        self._update_index(object_model.name)
+        self._invalidate_cache(object_model.name)
 
     def _check_overlapping_measures(self, measures: list[str]):
         """Validate if the combination of impact measures can happen, since impact measures cannot affect the same properties.
@@ -117,13 +120,4 @@ class DbsStrategy(DbsTemplate[Strategy]):
         list[str]
             list of scenarios that use the strategy
         """
-        scenarios = [
-            self._database.scenarios.get(scn)
-            for scn in self._database.scenarios.summarize_objects()["name"]
-        ]
-
-        used_in_scenario = [
-            scenario.name for scenario in scenarios if name == scenario.strategy
-        ]
-
-        return used_in_scenario
+        return self._database.scenarios.get_dependents("strategy").get(name, [])
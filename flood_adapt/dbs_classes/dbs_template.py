@@ -1,13 +1,16 @@
 import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Optional, TypeVar
+from typing import Any, Callable, Iterable, Optional, TypeVar
 
-import tomli
 import tomli_w
 
 from flood_adapt.dbs_classes.interface.database import IDatabase
 from flood_adapt.dbs_classes.interface.element import AbstractDatabaseElement
+from flood_adapt.dbs_classes.object_index import ObjectIndex
 from flood_adapt.misc.exceptions import (
     AlreadyExistsError,
     DatabaseError,
@@ -25,6 +28,12 @@ class DbsTemplate(AbstractDatabaseElement[T_OBJECTMODEL]):
     dir_name: str
     _object_class: type[T_OBJECTMODEL]
     _higher_lvl_object: str
+    # fields of the toml files that are kept in the object index, for listing the objects without parsing them
+    _indexed_fields: tuple[str, ...] = ("name", "description")
+    # maximum number of loaded objects that are kept in memory
+    _cache_size: int = 128
+    # maximum number of threads that load objects in `get_many`
+    _max_workers: int = 8
 
     def __init__(
         self, database: IDatabase, standard_objects: Optional[list[str]] = None
@@ -34,6 +43,9 @@ class DbsTemplate(AbstractDatabaseElement[T_OBJECTMODEL]):
         self.input_path = database.input_path / self.dir_name
         self.output_path = database.output_path / self.dir_name
         self.standard_objects = standard_objects
+        self._object_index = ObjectIndex(database.base_path / "object_index.sqlite")
+        self._cache: OrderedDict[tuple, tuple[tuple, T_OBJECTMODEL]] = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def get(self, name: str) -> T_OBJECTMODEL:
         """Return an object of the type of the database with the given name.
@@ -61,7 +73,50 @@ class DbsTemplate(AbstractDatabaseElement[T_OBJECTMODEL]):
             raise DoesNotExistError(name, self.display_name)
 
         # Load and return the object
-        return self._object_class.load_file(full_path)
+        return self._get_cached(name, full_path, self._object_class.load_file)
+
+    def get_many(self, names: Iterable[str], **kwargs) -> list[T_OBJECTMODEL]:
+        """Return the objects with the given names, loaded concurrently.
+
+        Parameters
+        ----------
+        names : Iterable[str]
+            names of the objects to be returned
+        **kwargs
+            keyword arguments passed to `get` for every object
+
+        Returns
+        -------
+        list[Object]
+            the objects, in the same order as `names`
+
+        Raises
+        ------
+        DoesNotExistError
+            Raise error if any of the objects does not exist.
+        """
+        names = list(names)
+        if len(names) <= 1:
+            return [self.get(name, **kwargs) for name in names]
+        with ThreadPoolExecutor(
+            max_workers=min(self._max_workers, len(names))
+        ) as executor:
+            return list(executor.map(lambda name: self.get(name, **kwargs), names))
+
+    def get_all(self, **kwargs) -> list[T_OBJECTMODEL]:
+        """Return all objects that currently exist in the database, loaded concurrently.
+
+        Parameters
+        ----------
+        **kwargs
+            keyword arguments passed to `get` for every object
+
+        Returns
+        -------
+        list[Object]
+            the objects, in the same order as the names in `summarize_objects`
+        """
+        return self.get_many(self._get_object_summary()["name"], **kwargs)
 
     def summarize_objects(self) -> dict[str, list[Any]]:
         """Return a dictionary with info on the objects that currently exist in the database.
@@ -72,7 +127,12 @@ class DbsTemplate(AbstractDatabaseElement[T_OBJECTMODEL]):
             A dictionary that contains the keys: `name`, `description`, `path`  and `last_modification_date`.
             Each key has a list of the corresponding values, where the index of the values corresponds to the same object.
         """
-        return self._get_object_summary()
+        summary = self._get_object_summary()
+        # the other indexed fields are only used internally, e.g. by `get_dependents`
+        return {
+            key: summary[key]
+            for key in ("name", "description", "path", "last_modification_date")
+        }
 
     def copy(self, old_name: str, new_name: str, new_description: str):
         """Copy (duplicate) an existing object, and give it a new name.
@@ -110,6 +170,8 @@ class DbsTemplate(AbstractDatabaseElement[T_OBJECTMODEL]):
         toml_path.parent.mkdir(parents=True)
         with open(toml_path, "wb") as f:
             tomli_w.dump(copy_object.model_dump(exclude_none=True), f)
+        self._update_index(new_name)
+        self._invalidate_cache(new_name)
 
         # Then copy all the accompanied files
         src = self.input_path / old_name
@@ -162,6 +224,8 @@ class DbsTemplate(AbstractDatabaseElement[T_OBJECTMODEL]):
         object_model.save(
             self.input_path / object_model.name / f"{object_model.name}.toml",
         )
+        self._update_index(object_model.name)
+        self._invalidate_cache(object_model.name)
 
     def delete(self, name: str, toml_only: bool = False):
         """Delete an already existing object as well as its outputs from the database.
@@ -202,6 +266,8 @@ class DbsTemplate(AbstractDatabaseElement[T_OBJECTMODEL]):
 
         # Once all checks are passed, delete the object
         toml_path.unlink(missing_ok=True)
+        self._object_index.remove(self.dir_name, name)
+        self._invalidate_cache(name)
 
         # Delete the entire folder
         if not list(toml_path.parent.iterdir()):
@@ -221,6 +287,35 @@ class DbsTemplate(AbstractDatabaseElement[T_OBJECTMODEL]):
                     f"Failed to delete output of `{name}` due to: {e}"
                 ) from e
 
+    def get_dependents(self, field: str) -> dict[str, list[str]]:
+        """Get the objects of this type that refer to other objects with a field, per referred object.
+
+        This is the reverse of the references in the toml files, e.g. the scenarios that use every event. It is built
+        from the object index, so only the toml files that changed since they were indexed are parsed.
+
+        Parameters
+        ----------
+        field : str
+            name of the field with the name, or a list of names, of the referred objects. Must be in `_indexed_fields`.
+
+        Returns
+        -------
+        dict[str, list[str]]
+            the names of the objects of this type that refer to every referred object
+        """
+        if field not in self._indexed_fields:
+            raise ValueError(
+                f"Field '{field}' of {self.display_name} objects is not indexed."
+            )
+        summary = self._get_object_summary()
+        dependents: dict[str, list[str]] = {}
+        for name, references in zip(summary["name"], summary[field]):
+            if isinstance(references, str):
+                references = [references] if references else []
+            for reference in references:
+                dependents.setdefault(reference, []).append(name)
+        return dependents
+
     def _check_standard_objects(self, name: str) -> bool:
         """Check if an object is a standard object.
 
@@ -258,43 +353,93 @@ class DbsTemplate(AbstractDatabaseElement[T_OBJECTMODEL]):
     def _get_object_summary(self) -> dict[str, list[Any]]:
         """Get a dictionary with all the toml paths and last modification dates that exist in the database of the given object_type.
 
+        The names, descriptions and other `_indexed_fields` are read from the object index, which only parses the
+        toml files that changed since they were indexed.
+
         Returns
         -------
         dict[str, Any]
-            A dictionary that contains the keys: `name`, `description`, `path`  and `last_modification_date`.
-            Each key has a list of the corresponding values, where the index of the values corresponds to the same object.
+            A dictionary that contains the keys: `name`, `description`, `path`  and `last_modification_date`, and
+            the other `_indexed_fields`. Each key has a list of the corresponding values, where the index of the
+            values corresponds to the same object.
         """
-        # If the toml doesnt exist, we might be in the middle of saving a new object or could be a broken object.
-        # In any case, we should not list it in the database
-        directories = [
-            dir
-            for dir in self.input_path.iterdir()
-            if (dir / f"{dir.name}.toml").is_file()
-        ]
-        paths = [Path(dir / f"{dir.name}.toml") for dir in directories]
-
-        names = [self._read_variable_in_toml("name", path) for path in paths]
-        descriptions = [
-            self._read_variable_in_toml("description", path) for path in paths
-        ]
-
-        last_modification_date = [
-            datetime.fromtimestamp(file.stat().st_mtime) for file in paths
-        ]
+        summaries = self._object_index.get_summaries(
+            self.dir_name, self.input_path, list(self._indexed_fields)
+        )
 
         objects = {
-            "name": names,
-            "description": descriptions,
-            "path": paths,
-            "last_modification_date": last_modification_date,
+            "name": [fields["name"] for _, _, fields in summaries],
+            "description": [fields["description"] for _, _, fields in summaries],
+            "path": [path for path, _, _ in summaries],
+            "last_modification_date": [
+                datetime.fromtimestamp(mtime_ns / 1e9) for _, mtime_ns, _ in summaries
+            ],
         }
+        for field in self._indexed_fields:
+            if field not in objects:
+                objects[field] = [fields[field] for _, _, fields in summaries]
         return objects
 
-    @staticmethod
-    def _read_variable_in_toml(variable_name: str, toml_path: Path) -> str:
-        with open(toml_path, "rb") as f:
-            data = tomli.load(f)
-        return data.get(variable_name, "")
+    def _update_index(self, name: str) -> None:
+        """Update the object index after the toml file of an object is written."""
+        self._object_index.update(
+            self.dir_name,
+            self.input_path / name / f"{name}.toml",
+            list(self._indexed_fields),
+        )
+
+    def _get_cached(
+        self,
+        name: str,
+        toml_path: Path,
+        load: Callable[[Path], T_OBJECTMODEL],
+        key: tuple = (),
+        dependencies: Iterable[Path] = (),
+    ) -> T_OBJECTMODEL:
+        """Load an object, or return a copy of it from the cache if its files did not change since it was loaded.
+
+        Parameters
+        ----------
+        name : str
+            name of the object
+        toml_path : Path
+            path of the toml file of the object
+        load : Callable[[Path], Object]
+            function that loads the object from the toml file
+        key : tuple, optional
+            extra values that identify the loaded object, e.g. loading options
+        dependencies : Iterable[Path], optional
+            other files that are read when loading the object, a change in any of them also reloads it
+
+        Returns
+        -------
+        Object
+            a copy of the loaded object, so changing it does not change the cached object
+        """
+        signature = tuple(
+            (path.stat().st_mtime_ns, path.stat().st_size)
+            for path in [Path(toml_path), *dependencies]
+        )
+        cache_key = (name, *key)
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None and cached[0] == signature:
+                self._cache.move_to_end(cache_key)
+                return cached[1].model_copy(deep=True)
+
+        object_model = load(toml_path)
+        with self._cache_lock:
+            self._cache[cache_key] = (signature, object_model)
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return object_model.model_copy(deep=True)
+
+    def _invalidate_cache(self, name: str) -> None:
+        """Remove all loaded versions of an object from the cache."""
+        with self._cache_lock:
+            for cache_key in [key for key in self._cache if key[0] == name]:
+                del self._cache[cache_key]
 
     def _validate_to_save(self, object_model: T_OBJECTMODEL, overwrite: bool) -> None:
         """Validate if the object can be saved.
@@ -0,0 +1,138 @@
+import shutil
+from pathlib import Path
+from typing import Iterable, Optional
+
+from flood_adapt.misc.log import FloodAdaptLogging
+from flood_adapt.misc.references import ReferenceCounter
+from flood_adapt.misc.utils import (
+    finished_file_exists,
+    link_or_copy,
+    write_finished_file,
+)
+
+logger = FloodAdaptLogging.getLogger("HazardStore")
+
+# simulation folders are not needed to reuse the hazard results, the finished file marks complete keys
+_IGNORE = shutil.ignore_patterns("simulations", "finished.txt")
+
+
+class HazardStore:
+    """Content-addressed store of hazard results.
+
+    Hazard results are stored once per hazard key (see `DbsScenario.hazard_key`), so scenarios with the same
+    hazard components share them. The results are exposed to the ``Flooding`` folder of a scenario with hard links,
+    falling back to copies if the file system does not support hard links. Since the files are shared, they
+    should never be modified in place.
+
+    Every scenario references the key of its hazard results. Stored results that no scenario references anymore
+    are evicted when a scenario is released or references another key, or when the store is pruned, see
+    `ReferenceCounter`.
+
+    Parameters
+    ----------
+    path : Path
+        Root directory of the store.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._references = ReferenceCounter(
+            self.path / "references", self._evict_unreferenced
+        )
+
+    def get_path(self, key: str) -> Path:
+        """Return the directory with the hazard results of a key."""
+        return self.path / key
+
+    def contains(self, key: str) -> bool:
+        """Check if complete hazard results are stored for a key."""
+        return finished_file_exists(self.get_path(key))
+
+    def add(self, key: str, flooding_path: Path, owner: Optional[str] = None) -> None:
+        """Add the hazard results in the ``Flooding`` folder of a scenario to the store.
+
+        Nothing is added if results are already stored for the key.
+
+        Parameters
+        ----------
+        key : str
+            Hazard key of the scenario.
+        flooding_path : Path
+            Path to the ``Flooding`` folder of the scenario, with finished hazard results.
+        owner : str, optional
+            Name of the scenario, which then references the key. By default, the results are not referenced and
+            removed by the next `prune`.
+        """
+        if owner is not None:
+            self._references.set_reference(owner, key)
+        if self.contains(key):
+            return
+        key_path = self.get_path(key)
+        shutil.copytree(
+            flooding_path,
+            key_path,
+            dirs_exist_ok=True,
+            ignore=_IGNORE,
+            copy_function=link_or_copy,
+        )
+        # only mark as complete after all files are linked, so a crash leaves no partial results behind
+        write_finished_file(key_path)
+        logger.debug(f"Added hazard results of {flooding_path} to the store as {key}")
+
+    def link(self, key: str, flooding_path: Path, owner: Optional[str] = None) -> None:
+        """Expose the stored hazard results of a key in the ``Flooding`` folder of a scenario.
+
+        Parameters
+        ----------
+        key : str
+            Hazard key of the scenario.
+        flooding_path : Path
+            Path to the ``Flooding`` folder of the scenario.
+        owner : str, optional
+            Name of the scenario, which then references the key.
+        """
+        if not self.contains(key):
+            raise ValueError(f"No hazard results stored for key {key}.")
+        if owner is not None:
+            self._references.set_reference(owner, key)
+        shutil.copytree(
+            self.get_path(key),
+            flooding_path,
+            dirs_exist_ok=True,
+            ignore=_IGNORE,
+            copy_function=link_or_copy,
+        )
+
+    def release(self, owner: str) -> None:
+        """Remove the reference of a scenario, e.g. after it is deleted, and evict the results nobody references.
+
+        Parameters
+        ----------
+        owner : str
+            Name of the scenario.
+        """
+        self._references.release(owner)
+
+    def prune(self, owners: Iterable[str]) -> None:
+        """Remove the references of all scenarios except `owners` and evict the results nobody references.
+
+        Parameters
+        ----------
+        owners : Iterable[str]
+            Names of the scenarios that still exist.
+        """
+        self._references.prune(owners)
+
+    def _evict_unreferenced(self, referenced: set[str]) -> None:
+        if not self.path.is_dir():
+            return
+        for path in self.path.iterdir():
+            if (
+                path == self._references.references_dir
+                or not path.is_dir()
+                or path.name in referenced
+            ):
+                continue
+            # the files are hard links, so the results of the scenarios that linked them are kept
+            logger.debug(f"Evicting unused hazard results {path.name}")
+            shutil.rmtree(path, ignore_errors=True)
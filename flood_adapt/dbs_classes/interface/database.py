@@ -106,6 +106,14 @@ class IDatabase(ABC):
     def has_run_hazard(self, scenario_name: str) -> None:
         pass
 
+    @abstractmethod
+    def store_hazard(self, scenario_name: str) -> None:
+        pass
+
     @abstractmethod
     def cleanup(self) -> None:
         pass
+
+    @abstractmethod
+    def wait_for_cleanup(self) -> None:
+        pass
@@ -0,0 +1,183 @@
+import json
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+
+import tomli
+
+from flood_adapt.misc.log import FloodAdaptLogging
+
+logger = FloodAdaptLogging.getLogger("ObjectIndex")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    object_type TEXT NOT NULL,
+    dir_name TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    fields TEXT NOT NULL,
+    PRIMARY KEY (object_type, dir_name)
+)
+"""
+
+
+class ObjectIndex:
+    """Persistent index of the metadata of the objects in a database, e.g. their name and description.
+
+    Listing the objects of a type would otherwise parse the toml file of every object. The index stores the
+    requested fields of every toml file in a SQLite database, together with the modification time and size of the
+    file. When listing the objects, only the toml files that were added or changed since they were indexed are
+    parsed, so files edited outside of FloodAdapt are picked up as well.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the SQLite database file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def get_summaries(
+        self, object_type: str, input_path: Path, fields: list[str]
+    ) -> list[tuple[Path, int, dict[str, Any]]]:
+        """Get the fields of all objects of a type, updating the index where needed.
+
+        Parameters
+        ----------
+        object_type : str
+            The type of the objects, e.g. 'scenarios'.
+        input_path : Path
+            The directory with a folder per object, with a toml file with the same name as the folder.
+        fields : list[str]
+            The fields of the toml files to get, missing fields are an empty string.
+
+        Returns
+        -------
+        list[tuple[Path, int, dict[str, Any]]]
+            The path of the toml file, its modification time in ns and the fields of every object.
+        """
+        # If the toml doesnt exist, we might be in the middle of saving a new object or could be a broken object.
+        # In any case, we should not list it in the database
+        files = {}
+        with os.scandir(input_path) as entries:
+            for entry in entries:
+                path = Path(entry.path) / f"{entry.name}.toml"
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files[entry.name] = (path, stat.st_mtime_ns, stat.st_size)
+
+        try:
+            with closing(self._connect()) as connection, connection:
+                indexed = {
+                    dir_name: (mtime_ns, size, json.loads(indexed_fields))
+                    for dir_name, mtime_ns, size, indexed_fields in connection.execute(
+                        "SELECT dir_name, mtime_ns, size, fields FROM objects WHERE object_type = ?",
+                        (object_type,),
+                    )
+                }
+                summaries, changed = self._merge(files, indexed, fields)
+                connection.executemany(
+                    "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (object_type, dir_name, mtime_ns, size, json.dumps(values))
+                        for dir_name, (mtime_ns, size, values) in changed.items()
+                    ],
+                )
+                connection.executemany(
+                    "DELETE FROM objects WHERE object_type = ? AND dir_name = ?",
+                    [(object_type, name) for name in indexed.keys() - files.keys()],
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not use the object index at {self.path}: {e}")
+            summaries, _ = self._merge(files, {}, fields)
+        return summaries
+
+    def update(self, object_type: str, toml_path: Path, fields: list[str]) -> None:
+        """Update the index of a single object, e.g. after it is saved.
+
+        Parameters
+        ----------
+        object_type : str
+            The type of the object, e.g. 'scenarios'.
+        toml_path : Path
+            The path of the toml file of the object.
+        fields : list[str]
+            The fields of the toml file to index.
+        """
+        toml_path = Path(toml_path)
+        stat = toml_path.stat()
+        values = _read_fields(toml_path, fields)
+        self._execute(
+            "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?)",
+            (
+                object_type,
+                toml_path.parent.name,
+                stat.st_mtime_ns,
+                stat.st_size,
+                json.dumps(values),
+            ),
+        )
+
+    def remove(self, object_type: str, name: str) -> None:
+        """Remove an object from the index, e.g. after it is deleted.
+
+        Parameters
+        ----------
+        object_type : str
+            The type of the object, e.g. 'scenarios'.
+        name : str
+            The name of the object.
+        """
+        self._execute(
+            "DELETE FROM objects WHERE object_type = ? AND dir_name = ?",
+            (object_type, name),
+        )
+
+    @staticmethod
+    def _merge(
+        files: dict[str, tuple[Path, int, int]],
+        indexed: dict[str, tuple[int, int, dict[str, Any]]],
+        fields: list[str],
+    ) -> tuple[list[tuple[Path, int, dict[str, Any]]], dict[str, tuple]]:
+        """Combine the toml files with the index, parsing the files that are not indexed or changed."""
+        summaries = []
+        changed = {}
+        for dir_name, (path, mtime_ns, size) in files.items():
+            values = None
+            if dir_name in indexed:
+                indexed_mtime_ns, indexed_size, values = indexed[dir_name]
+                if (
+                    indexed_mtime_ns != mtime_ns
+                    or indexed_size != size
+                    or not set(fields).issubset(values)
+                ):
+                    values = None
+            if values is None:
+                values = _read_fields(path, fields)
+                changed[dir_name] = (mtime_ns, size, values)
+            summaries.append((path, mtime_ns, values))
+        return summaries, changed
+
+    def _execute(self, sql: str, parameters: tuple) -> None:
+        try:
+            with closing(self._connect()) as connection, connection:
+                connection.execute(sql, parameters)
+        except sqlite3.Error as e:
+            # listing the objects validates the index, so a failed update is only slower
+            logger.warning(f"Could not update the object index at {self.path}: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute(_SCHEMA)
+        return connection
+
+
+def _read_fields(toml_path: Path, fields: list[str]) -> dict[str, Any]:
+    with open(toml_path, "rb") as f:
+        data = tomli.load(f)
+    return {field: data.get(field, "") for field in fields}
@@ -730,7 +730,8 @@ class FloodAdapt:
         -------
         scenarios : dict[str, Any]
             A dictionary containing all scenarios.
-            Includes keys: 'name', 'description', 'path', 'last_modification_date', 'objects'
+            Includes keys: 'name', 'description', 'path', 'last_modification_date', 'objects' and 'impact_engine',
+            the engine that calculated the impacts, e.g. 'Delft-FIAT' or 'Damage engine (screening)'.
             Each value is a list of the corresponding attribute for each output.
         """
         return self.database.get_outputs()
@@ -857,6 +858,29 @@ class FloodAdapt:
         """
         return self.database.get_roads(name)
 
+    def export_spatial_impacts(
+        self, name: str, output_dir: Optional[Path] = None
+    ) -> list[Path]:
+        """
+        Export the spatial impacts of a scenario as self-contained GeoPackages, e.g. to use them in a GIS.
+
+        The building footprint, aggregated and road impacts in the output folder of a scenario are stored as
+        attribute tables that refer to geometries shared by all scenarios, so they cannot be opened on their own.
+
+        Parameters
+        ----------
+        name : str
+            The name of the scenario.
+        output_dir : Optional[Path]
+            The folder to write the GeoPackages to. Defaults to the Impacts folder of the scenario.
+
+        Returns
+        -------
+        paths : list[Path]
+            The paths of the exported GeoPackages.
+        """
+        return self.database.export_spatial_impacts(name, output_dir)
+
     def get_obs_point_timeseries(self, name: str) -> Optional[gpd.GeoDataFrame]:
         """Return the HTML strings of the water level timeseries for the given scenario.
 
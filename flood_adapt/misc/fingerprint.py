@@ -0,0 +1,31 @@
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+
+
+def file_fingerprint(path: Path | str | os.PathLike) -> str:
+    """Return the SHA-256 hex digest of the contents of a file, hashing it only once while it does not change."""
+    stat = Path(path).stat()
+    return _file_sha256(str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns)
+
+
+@lru_cache(maxsize=1024)
+def _file_sha256(path: str, size: int, mtime_ns: int) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def directory_fingerprint(path: Path | str | os.PathLike) -> dict[str, str]:
+    """Return the content hash of every file in a directory, by path relative to the directory."""
+    path = Path(path)
+    if not path.is_dir():
+        return {}
+    return {
+        file.relative_to(path).as_posix(): file_fingerprint(file)
+        for file in sorted(path.rglob("*"))
+        if file.is_file()
+    }
@@ -0,0 +1,95 @@
+import shutil
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+
+class ReferenceCounter:
+    """Keep track of the entries of a store that are referenced by scenarios, and evict the entries nobody uses.
+
+    Every owner (a scenario) references the key of a store entry with a small text file, so the references survive
+    restarts of FloodAdapt. An owner references a single key (``references/<owner>.txt``), or one key per name
+    (``references/<owner>/<name>.txt``), e.g. one per output of the scenario. Whenever a reference is removed or
+    points to another key, `evict` is called with the keys that are still referenced, and should remove all other
+    entries from the store.
+
+    Parameters
+    ----------
+    references_dir : Path
+        Directory to store the references in.
+    evict : Callable[[set[str]], None]
+        Function that removes all entries from the store whose key is not in the given set.
+    """
+
+    def __init__(self, references_dir: Path, evict: Callable[[set[str]], None]):
+        self.references_dir = Path(references_dir)
+        self._evict = evict
+
+    def set_reference(self, owner: str, key: str, name: Optional[str] = None) -> None:
+        """Let an owner reference a key, evicting the entry it referenced before if nobody else does.
+
+        Parameters
+        ----------
+        owner : str
+            Name of the scenario.
+        key : str
+            Key of the store entry.
+        name : str, optional
+            Name of the reference, for owners that reference one key per name. By default, the owner references a
+            single key.
+        """
+        path = self._get_path(owner, name)
+        previous = path.read_text().strip() if path.exists() else None
+        if previous == key:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(key)
+        if previous is not None:
+            self.evict_unreferenced()
+
+    def release(self, owner: str) -> None:
+        """Remove all references of an owner, e.g. after it is deleted, and evict the entries nobody references.
+
+        Parameters
+        ----------
+        owner : str
+            Name of the scenario.
+        """
+        self._get_path(owner).unlink(missing_ok=True)
+        shutil.rmtree(self.references_dir / owner, ignore_errors=True)
+        self.evict_unreferenced()
+
+    def prune(self, owners: Iterable[str]) -> None:
+        """Remove the references of all owners except `owners` and evict the entries nobody references.
+
+        Parameters
+        ----------
+        owners : Iterable[str]
+            Names of the scenarios that still exist.
+        """
+        owners = set(owners)
+        if self.references_dir.is_dir():
+            for path in self.references_dir.iterdir():
+                if path.is_dir() and path.name not in owners:
+                    shutil.rmtree(path, ignore_errors=True)
+                elif path.suffix == ".txt" and path.stem not in owners:
+                    path.unlink(missing_ok=True)
+        self.evict_unreferenced()
+
+    def referenced(self) -> set[str]:
+        """Return the keys that are referenced by any owner."""
+        if not self.references_dir.is_dir():
+            return set()
+        return {
+            path.read_text().strip()
+            for pattern in ("*.txt", "*/*.txt")
+            for path in self.references_dir.glob(pattern)
+        }
+
+    def evict_unreferenced(self) -> None:
+        """Evict the entries of the store that no owner references."""
+        self._evict(self.referenced())
+
+    def _get_path(self, owner: str, name: Optional[str] = None) -> Path:
+        if name is None:
+            return self.references_dir / f"{owner}.txt"
+        return self.references_dir / owner / f"{name}.txt"
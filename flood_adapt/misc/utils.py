@@ -180,6 +180,44 @@ def copy_file_to_output_dir(file_path: Path, output_dir: Path) -> Path:
     return output_dir / file_path.name
 
 
+_warned_copy_fallback = False
+
+
+def link_or_copy(
+    src: Path | str | os.PathLike, dst: Path | str | os.PathLike
+) -> Path | str | os.PathLike:
+    """Hard-link a file, falling back to a copy if the file system does not support hard links.
+
+    An existing file at `dst` is replaced. Can be used as `copy_function` in `shutil.copytree`.
+    A warning is logged the first time the copy fallback is used, since copies use more disk space than links.
+
+    Parameters
+    ----------
+    src : Path | str | os.PathLike
+        Path to the file to be linked.
+    dst : Path | str | os.PathLike
+        Path of the link to be created.
+
+    Returns
+    -------
+    Path | str | os.PathLike
+        Path of the created link or copy.
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError as e:
+        global _warned_copy_fallback
+        if not _warned_copy_fallback:
+            _warned_copy_fallback = True
+            logger.warning(
+                f"Could not create a hard link to {src} ({e}), files are copied instead, which uses more disk space."
+            )
+        shutil.copy2(src, dst)
+    return dst
+
+
 def validate_file_extension(allowed_extensions: list[str]):
     """Validate the extension of the given path has one of the given suffixes.
 
@@ -79,6 +79,9 @@ class ScenarioRunner:
         for model in self.hazard_models:
             model.run(self._scenario)
 
+        # make the hazard results available to other scenarios with the same hazard components
+        self._database.store_hazard(self._scenario.name)
+
     def hazard_run_check(self) -> bool:
         """Check if the impact has been run.
 
@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fiat_toolbox import get_fiat_columns
+
+from flood_adapt.adapter.damage_engine import (
+    DamageEngineAdapter,
+    calculate_damages,
+    risk_coefficients,
+)
+from tests.conftest import IS_WINDOWS
+
+_FIAT_COLUMNS = get_fiat_columns(fiat_version="0.2.1")
+DEPTHS = np.array([0.0, 1.0, 2.0])
+FUNCTIONS = {"res": np.array([0.0, 0.5, 1.0]), "com": np.array([0.1, 0.1, 0.2])}
+
+
+@pytest.fixture()
+def exposure_db() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            _FIAT_COLUMNS.object_id: [1, 2, 3, 4],
+            _FIAT_COLUMNS.ground_floor_height: [0.0, 0.5, 1.0, 0.0],
+            _FIAT_COLUMNS.ground_elevation: [1.0, 1.0, 2.0, np.nan],
+            _FIAT_COLUMNS.damage_function.format(name="structure"): [
+                "res",
+                "res",
+                "com",
+                "res",
+            ],
+            _FIAT_COLUMNS.max_potential_damage.format(name="structure"): [
+                100.0,
+                100.0,
+                100.0,
+                100.0,
+            ],
+            _FIAT_COLUMNS.damage_function.format(name="content"): [
+                "com",
+                np.nan,
+                "com",
+                "com",
+            ],
+            _FIAT_COLUMNS.max_potential_damage.format(name="content"): [
+                10.0,
+                10.0,
+                10.0,
+                10.0,
+            ],
+        }
+    )
+
+
+def test_calculate_damages_water_depth(exposure_db: pd.DataFrame):
+    # Act
+    impacts = calculate_damages(
+        exposure_db,
+        hazard=np.array([1.0, 2.0, np.nan, 5.0]),
+        vulnerability_depths=DEPTHS,
+        vulnerability_functions=FUNCTIONS,
+        columns=_FIAT_COLUMNS,
+    )
+
+    # Assert
+    np.testing.assert_allclose(
+        impacts[_FIAT_COLUMNS.inundation_depth], [1.0, 1.5, np.nan, 5.0]
+    )
+    np.testing.assert_allclose(
+        impacts[_FIAT_COLUMNS.damage.format(name="structure")],
+        [50.0, 75.0, np.nan, 100.0],
+    )
+    np.testing.assert_allclose(
+        impacts[_FIAT_COLUMNS.damage.format(name="content")],
+        [1.0, np.nan, np.nan, 2.0],
+    )
+    np.testing.assert_allclose(
+        impacts[_FIAT_COLUMNS.total_damage], [51.0, 75.0, 0.0, 102.0]
+    )
+    assert impacts[_FIAT_COLUMNS.object_id].tolist() == [1, 2, 3, 4]
+
+
+def test_calculate_damages_water_level(exposure_db: pd.DataFrame):
+    # Act
+    impacts = calculate_damages(
+        exposure_db,
+        hazard=np.array([1.00005, 2.5, 3.0, 0.5]),
+        vulnerability_depths=DEPTHS,
+        vulnerability_functions=FUNCTIONS,
+        columns=_FIAT_COLUMNS,
+        elevation_reference="datum",
+    )
+
+    # Assert
+    # the first object is dry, the fourth has no ground elevation so it is taken as 0
+    np.testing.assert_allclose(
+        impacts[_FIAT_COLUMNS.inundation_depth], [np.nan, 1.0, 0.0, 0.5]
+    )
+    np.testing.assert_allclose(
+        impacts[_FIAT_COLUMNS.total_damage], [0.0, 50.0, 11.0, 26.0]
+    )
+
+
+def test_calculate_damages_unknown_function(exposure_db: pd.DataFrame):
+    with pytest.raises(ValueError, match="'com'"):
+        calculate_damages(
+            exposure_db,
+            hazard=np.ones(4),
+            vulnerability_depths=DEPTHS,
+            vulnerability_functions={"res": FUNCTIONS["res"]},
+            columns=_FIAT_COLUMNS,
+        )
+
+
+def test_calculate_damages_risk(exposure_db: pd.DataFrame):
+    # Arrange
+    return_periods = [100, 10]
+    hazard = np.array([[2.0, 1.0], [2.0, 2.0], [np.nan, np.nan], [3.0, 1.0]])
+
+    # Act
+    impacts = calculate_damages(
+        exposure_db,
+        hazard=hazard,
+        vulnerability_depths=DEPTHS,
+        vulnerability_functions=FUNCTIONS,
+        columns=_FIAT_COLUMNS,
+        return_periods=return_periods,
+    )
+
+    # Assert
+    totals = impacts[
+        [_FIAT_COLUMNS.total_damage_rp.format(years=rp) for rp in return_periods]
+    ].to_numpy()
+    np.testing.assert_allclose(totals[0], [102.0, 51.0])
+    np.testing.assert_allclose(
+        impacts[_FIAT_COLUMNS.risk_ead], totals @ risk_coefficients(return_periods)
+    )
+    assert _FIAT_COLUMNS.total_damage not in impacts.columns
+
+
+def test_risk_coefficients():
+    # a single return period
+    np.testing.assert_allclose(risk_coefficients([50]), [0.02])
+
+    # a constant damage is expected once every smallest return period
+    coefficients = risk_coefficients([100, 2, 10, 1000])
+    assert coefficients.sum() == pytest.approx(0.5)
+    np.testing.assert_allclose(
+        risk_coefficients([2, 10, 100, 1000]), coefficients[[1, 2, 0, 3]]
+    )
+
+
+@pytest.mark.skipif(
+    not IS_WINDOWS,
+    reason="Only run on windows where we have a working fiat binary",
+)
+def test_damage_engine_matches_fiat(test_fa_class):
+    # Arrange
+    scenario_name = "current_extreme12ft_no_measures"
+    test_fa_class.run_scenario(scenario_name)
+    database = test_fa_class.database
+    scenario = database.scenarios.get(scenario_name)
+    fiat_impacts = database.static.get_fiat_model().read_detailed_impacts(scenario_name)
+
+    # Act
+    with DamageEngineAdapter(
+        model_root=database.static_path / "templates" / "fiat",
+        config=database.site.fiat.config,
+        config_base_path=database.static_path,
+    ) as engine:
+        engine.preprocess(scenario)
+        engine_impacts = engine.calculate_impacts(scenario)
+
+    # Assert
+    object_id = "Object ID"
+    fiat_impacts = fiat_impacts.set_index(object_id)
+    engine_impacts = engine_impacts.set_index(_FIAT_COLUMNS.object_id).loc[
+        fiat_impacts.index
+    ]
+    np.testing.assert_allclose(
+        engine_impacts[_FIAT_COLUMNS.total_damage].fillna(0).to_numpy(),
+        fiat_impacts["Total Damage"].fillna(0).to_numpy(),
+        rtol=1e-3,
+        atol=1e-2,
+    )
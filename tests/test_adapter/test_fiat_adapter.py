@@ -1,13 +1,29 @@
+import json
+from unittest import mock
+
 import pandas as pd
 import pytest
 from fiat_toolbox import get_fiat_columns
 from pandas.testing import assert_frame_equal
 
+from flood_adapt.adapter.damage_engine import DamageEngineAdapter
+from flood_adapt.adapter.fiat_adapter import FiatAdapter, read_impact_record
 from flood_adapt.dbs_classes.interface.database import IDatabase
 from flood_adapt.misc.path_builder import (
     TopLevelDir,
     db_path,
 )
+from flood_adapt.objects.forcing import unit_system as us
+from flood_adapt.objects.measures.measures import (
+    Buyout,
+    MeasureType,
+    SelectionType,
+)
+from flood_adapt.objects.projections.projections import (
+    PhysicalProjection,
+    Projection,
+    SocioEconomicChange,
+)
 from flood_adapt.workflows.scenario_runner import Scenario, ScenarioRunner
 from tests.conftest import IS_WINDOWS
 
@@ -244,3 +260,277 @@ class TestFiatAdapter:
         test_db, scenario_name, test_scenario = run_scenario_return_periods
 
         # TODO asserts
+
+
+def test_get_output_dtypes(tmp_path):
+    # Arrange
+    adapter = FiatAdapter(model_root=tmp_path)
+    columns = [
+        _FIAT_COLUMNS.object_id,
+        _FIAT_COLUMNS.primary_object_type,
+        _FIAT_COLUMNS.aggregation_label.format(name="census"),
+        _FIAT_COLUMNS.damage_function.format(name="structure"),
+        _FIAT_COLUMNS.max_potential_damage.format(name="structure"),
+        _FIAT_COLUMNS.damage_rp.format(name="structure", years=100),
+        _FIAT_COLUMNS.total_damage,
+        "unknown column",
+    ]
+
+    # Act
+    dtypes = adapter._get_output_dtypes(columns)
+
+    # Assert
+    assert dtypes == {
+        _FIAT_COLUMNS.primary_object_type: "str",
+        _FIAT_COLUMNS.aggregation_label.format(name="census"): "str",
+        _FIAT_COLUMNS.damage_function.format(name="structure"): "str",
+        _FIAT_COLUMNS.max_potential_damage.format(name="structure"): "float64",
+        _FIAT_COLUMNS.damage_rp.format(name="structure", years=100): "float64",
+        _FIAT_COLUMNS.total_damage: "float64",
+    }
+
+
+def test_buyout_of_new_development(tmp_path):
+    # Arrange
+    structure = _FIAT_COLUMNS.max_potential_damage.format(name="structure")
+    adapter = object.__new__(FiatAdapter)
+    adapter._exposure_modifier = None
+    adapter.fiat_columns = _FIAT_COLUMNS
+    adapter.config = mock.Mock(non_building_names=["road"])
+    adapter._model = mock.Mock()
+    adapter.model.exposure.exposure_db = pd.DataFrame(
+        {
+            _FIAT_COLUMNS.object_id: [1, 2, 3],
+            _FIAT_COLUMNS.primary_object_type: ["RES", "RES", "road"],
+            structure: [100.0, 200.0, 300.0],
+        }
+    )
+    # the buyout area covers an existing and a new development object
+    adapter.model.exposure.get_object_ids.side_effect = lambda *args, **kwargs: (
+        [1, 2] if args == ("all",) else [2, 4]
+    )
+    adapter._database_instance = mock.Mock(static_path=tmp_path)
+    adapter._database_instance.site.sfincs.dem.filename = "dem.tif"
+    adapter._database_instance.projections.get.return_value = Projection(
+        name="new_development",
+        physical_projection=PhysicalProjection(),
+        socio_economic_change=SocioEconomicChange(
+            economic_growth=50,
+            population_growth_new=10,
+            new_development_shapefile=str(tmp_path / "new_development.geojson"),
+            new_development_elevation=us.UnitfulLengthRefValue(
+                value=1,
+                units=us.UnitTypesLength.feet,
+                type=us.VerticalReference.datum,
+            ),
+        ),
+    )
+    adapter._database_instance.strategies.get.return_value.get_impact_measures.return_value = [
+        Buyout(
+            name="buyout",
+            type=MeasureType.buyout_properties,
+            selection_type=SelectionType.all,
+            property_type="RES",
+        )
+    ]
+
+    def add_new_development(**kwargs):
+        # pending changes are applied before the new objects are added, see `apply_population_growth_new`
+        adapter._exposure_modifier.apply(adapter.model.exposure.exposure_db)
+        new_object = pd.DataFrame(
+            {
+                _FIAT_COLUMNS.object_id: [4],
+                _FIAT_COLUMNS.primary_object_type: ["RES"],
+                structure: [400.0],
+            }
+        )
+        adapter.model.exposure.exposure_db = pd.concat(
+            [adapter.model.exposure.exposure_db, new_object], ignore_index=True
+        )
+
+    scenario = Scenario(
+        name="scn", event="event", projection="new_development", strategy="buyout"
+    )
+
+    # Act
+    with mock.patch.object(
+        adapter, "apply_population_growth_new", side_effect=add_new_development
+    ):
+        adapter.add_projection_and_measures(scenario)
+
+    # Assert
+    assert adapter.model.exposure.exposure_db[structure].tolist() == [
+        150.0,
+        0.0,
+        300.0,
+        0.0,
+    ]
+
+
+class TestEnsureCorrectHashSpacingInCsv:
+    def test_comment_lines_are_normalized(self, tmp_path):
+        # Arrange
+        csv_path = tmp_path / "exposure" / "exposure.csv"
+        csv_path.parent.mkdir()
+        csv_path.write_bytes(b"#comment\n##  other comment\r\nobject_id,value\n1,2\n")
+
+        # Act
+        FiatAdapter._ensure_correct_hash_spacing_in_csv(tmp_path)
+        FiatAdapter._ensure_correct_hash_spacing_in_csv(tmp_path)
+
+        # Assert
+        assert (
+            csv_path.read_bytes()
+            == b"# comment\n# other comment\r\nobject_id,value\n1,2\n"
+        )
+
+    def test_files_without_changes_are_not_rewritten(self, tmp_path):
+        # Arrange
+        csv_path = tmp_path / "vulnerability.csv"
+        csv_path.write_text("# comment\nwd,res\n0,0\n")
+        mtime = csv_path.stat().st_mtime_ns
+
+        # Act
+        FiatAdapter._ensure_correct_hash_spacing_in_csv(tmp_path)
+
+        # Assert
+        assert csv_path.stat().st_mtime_ns == mtime
+
+
+class TestDeltaRun:
+    def test_merge_delta_impacts_keeps_baseline_order(self):
+        # Arrange
+        baseline = pd.DataFrame(
+            {"Object ID": [3, 1, 2, 4], "Total Damage": [30.0, 10.0, 20.0, 40.0]}
+        )
+        delta = pd.DataFrame({"Total Damage": [0.0, 5.0], "Object ID": [4, 1]})
+
+        # Act
+        merged = FiatAdapter._merge_delta_impacts(baseline, delta, "Object ID")
+
+        # Assert
+        expected = pd.DataFrame(
+            {"Object ID": [3, 1, 2, 4], "Total Damage": [30.0, 5.0, 20.0, 0.0]}
+        )
+        assert_frame_equal(merged, expected)
+
+    def test_select_exposure_is_restored(self, tmp_path):
+        # Arrange
+        adapter = FiatAdapter(model_root=tmp_path)
+        id_col = _FIAT_COLUMNS.object_id
+        exposure_db = pd.DataFrame({id_col: [1, 2, 3, 4, 5]})
+        buildings = pd.DataFrame({id_col: [1, 2, 3]})
+        roads = pd.DataFrame({id_col: [4, 5]})
+        adapter._model = mock.Mock()
+        adapter._model.exposure.exposure_db = exposure_db
+        adapter._model.exposure.exposure_geoms = [buildings, roads]
+
+        # Act
+        with adapter._select_exposure([2, 3]):
+            selected_db = adapter.model.exposure.exposure_db
+            selected_geoms = adapter.model.exposure.exposure_geoms
+
+        # Assert
+        assert selected_db[id_col].tolist() == [2, 3, 4]
+        assert [gdf[id_col].tolist() for gdf in selected_geoms] == [[2, 3], [4]]
+        assert adapter.model.exposure.exposure_db is exposure_db
+        assert adapter.model.exposure.exposure_geoms == [buildings, roads]
+
+    @pytest.fixture()
+    def delta_adapter(self, tmp_path):
+        adapter = FiatAdapter(model_root=tmp_path)
+        adapter.config = mock.Mock(delta_runs=True, roads_file_name=None)
+        database = mock.Mock()
+        database.get_impacts_path.side_effect = lambda scenario_name: (
+            tmp_path / scenario_name / "Impacts"
+        )
+        database.scenarios.impact_key.return_value = "impact_key"
+        database.scenarios.summarize_objects.return_value = {
+            "name": ["scn_1", "scn_2", "scn_3"]
+        }
+        database.scenarios.get_many.side_effect = lambda names: [
+            Scenario(name=name, event="event", projection="current", strategy=name)
+            for name in names
+        ]
+        database.strategies.get.return_value.get_impact_measures.return_value = []
+        adapter._database_instance = database
+        # scn_1 was run with other impact components, scn_2 can be reused
+        for name, impact_key in [("scn_1", "other_key"), ("scn_2", "impact_key")]:
+            impacts_path = tmp_path / name / "Impacts"
+            impacts_path.mkdir(parents=True)
+            (impacts_path / f"Impacts_detailed_{name}.csv").write_text("")
+            (impacts_path / "impact_record.json").write_text(
+                json.dumps({"impact_engine": "Delft-FIAT", "impact_key": impact_key})
+            )
+        return adapter
+
+    def test_get_delta_run_matches_impact_key(self, delta_adapter: FiatAdapter):
+        # Arrange
+        scenario = Scenario(
+            name="scn_3", event="event", projection="current", strategy="scn_3"
+        )
+
+        # Act
+        baseline, object_ids = delta_adapter._get_delta_run(scenario)
+
+        # Assert
+        assert baseline.name == "scn_2"
+        assert len(object_ids) == 0
+        delta_adapter.database.scenarios.get_many.assert_called_once_with(["scn_2"])
+
+    def test_get_delta_run_without_matching_impact_key(
+        self, delta_adapter: FiatAdapter
+    ):
+        # Arrange
+        delta_adapter.database.scenarios.impact_key.return_value = "changed_key"
+        scenario = Scenario(
+            name="scn_3", event="event", projection="current", strategy="scn_3"
+        )
+
+        # Act
+        baseline, object_ids = delta_adapter._get_delta_run(scenario)
+
+        # Assert
+        assert baseline is None
+        assert object_ids is None
+
+    def test_get_delta_run_ignores_other_engine(
+        self, delta_adapter: FiatAdapter, tmp_path
+    ):
+        # Arrange
+        (tmp_path / "scn_2" / "Impacts" / "impact_record.json").write_text(
+            json.dumps(
+                {
+                    "impact_engine": DamageEngineAdapter.impact_engine,
+                    "impact_key": "impact_key",
+                }
+            )
+        )
+        scenario = Scenario(
+            name="scn_3", event="event", projection="current", strategy="scn_3"
+        )
+
+        # Act
+        baseline, object_ids = delta_adapter._get_delta_run(scenario)
+
+        # Assert
+        assert baseline is None
+        assert object_ids is None
+
+    def test_write_impact_record(self, delta_adapter: FiatAdapter, tmp_path):
+        # Arrange
+        scenario = Scenario(
+            name="scn_2", event="event", projection="current", strategy="scn_2"
+        )
+        delta_adapter._impact_key = "new_key"
+
+        # Act
+        delta_adapter._write_impact_record(scenario)
+
+        # Assert
+        assert read_impact_record(tmp_path / "scn_2" / "Impacts") == {
+            "impact_engine": "Delft-FIAT",
+            "impact_key": "new_key",
+        }
+        delta_adapter._remove_impact_record(scenario)
+        assert read_impact_record(tmp_path / "scn_2" / "Impacts") == {}
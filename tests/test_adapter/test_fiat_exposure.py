@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fiat_toolbox import get_fiat_columns
+
+from flood_adapt.adapter.fiat_exposure import ExposureModifier
+
+_FIAT_COLUMNS = get_fiat_columns()
+STRUCTURE = _FIAT_COLUMNS.max_potential_damage.format(name="structure")
+CONTENT = _FIAT_COLUMNS.max_potential_damage.format(name="content")
+
+
+@pytest.fixture()
+def exposure_db() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            _FIAT_COLUMNS.object_id: [1, 2, 3, 4],
+            _FIAT_COLUMNS.primary_object_type: ["RES", "RES", "COM", "road"],
+            STRUCTURE: [100, 200, 300, 400],
+            CONTENT: [10.0, 20.0, 30.0, 40.0],
+        }
+    )
+
+
+def create_modifier(exposure_db: pd.DataFrame) -> ExposureModifier:
+    return ExposureModifier(
+        object_ids=exposure_db[_FIAT_COLUMNS.object_id].to_numpy(),
+        object_id_column=_FIAT_COLUMNS.object_id,
+        damage_column_pattern=_FIAT_COLUMNS.max_potential_damage,
+    )
+
+
+def test_apply_composes_factors(exposure_db: pd.DataFrame):
+    # Arrange
+    modifier = create_modifier(exposure_db)
+    modifier.multiply(np.array([1, 2, 3]), 1.2)  # economic growth
+    modifier.multiply(np.array([1, 2, 3]), 1.5)  # population growth
+    modifier.multiply(np.array([2]), 0.0)  # buyout
+
+    # Act
+    modifier.apply(exposure_db)
+
+    # Assert
+    np.testing.assert_allclose(exposure_db[STRUCTURE], [180, 0, 540, 400])
+    np.testing.assert_allclose(exposure_db[CONTENT], [18, 0, 54, 40])
+    assert exposure_db[_FIAT_COLUMNS.primary_object_type].tolist() == [
+        "RES",
+        "RES",
+        "COM",
+        "road",
+    ]
+    assert not modifier.has_changes
+
+
+def test_apply_matches_objects_by_id(exposure_db: pd.DataFrame):
+    # Arrange
+    modifier = create_modifier(exposure_db)
+    modifier.multiply(np.array([4]), 2.0)
+    new_object = pd.DataFrame(
+        {_FIAT_COLUMNS.object_id: [5], STRUCTURE: [500], CONTENT: [50.0]}
+    )
+    exposure_db = pd.concat([new_object, exposure_db.iloc[::-1]], ignore_index=True)
+
+    # Act
+    modifier.apply(exposure_db)
+
+    # Assert
+    np.testing.assert_allclose(exposure_db[STRUCTURE], [500, 800, 300, 200, 100])
+
+
+def test_apply_without_changes_leaves_exposure_unchanged(exposure_db: pd.DataFrame):
+    # Arrange
+    expected = exposure_db.copy()
+    modifier = create_modifier(exposure_db)
+
+    # Act
+    modifier.apply(exposure_db)
+
+    # Assert
+    pd.testing.assert_frame_equal(exposure_db, expected)
+
+
+def test_multiply_objects_added_after_creation(exposure_db: pd.DataFrame):
+    # Arrange
+    modifier = create_modifier(exposure_db)
+    new_object = pd.DataFrame(
+        {_FIAT_COLUMNS.object_id: [5], STRUCTURE: [500], CONTENT: [50.0]}
+    )
+    exposure_db = pd.concat([exposure_db, new_object], ignore_index=True)
+
+    # Act
+    modifier.multiply(np.array([1, 5]), 0.0)
+    modifier.apply(exposure_db)
+
+    # Assert
+    np.testing.assert_allclose(exposure_db[STRUCTURE], [0, 200, 300, 400, 0])
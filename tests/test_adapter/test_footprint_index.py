@@ -0,0 +1,190 @@
+import shutil
+from pathlib import Path
+from unittest import mock
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+from fiat_toolbox import get_fiat_columns
+from fiat_toolbox.spatial_output.footprints import Footprints
+
+from flood_adapt.adapter import footprint_index
+from flood_adapt.adapter.footprint_index import FootprintIndex, get_footprint_index
+
+CRS = "EPSG:32617"
+COLUMNS = get_fiat_columns(fiat_version="0.2.1")
+OBJECT_ID = COLUMNS.object_id
+
+
+@pytest.fixture()
+def footprints() -> gpd.GeoDataFrame:
+    return gpd.GeoDataFrame(
+        {"BF_FID": [1, 2, 3]},
+        geometry=[
+            shapely.box(0, 0, 10, 10),
+            shapely.box(20, 0, 30, 10),
+            shapely.box(40, 0, 50, 10),
+        ],
+        crs=CRS,
+    )
+
+
+@pytest.fixture()
+def buildings() -> gpd.GeoDataFrame:
+    # objects 1-3 share footprint 1, object 4 has footprint 2, objects 5 and 6 have no footprint
+    return gpd.GeoDataFrame(
+        {
+            OBJECT_ID: [1, 2, 3, 4, 5, 6],
+            "BF_FID": [1, 1, 1, 2, np.nan, np.nan],
+        },
+        geometry=[
+            shapely.Point(2, 2),
+            shapely.Point(5, 5),
+            shapely.Point(8, 8),
+            shapely.Point(25, 5),
+            shapely.Point(100, 100),
+            shapely.box(60, 0, 70, 10),
+        ],
+        crs=CRS,
+    )
+
+
+@pytest.fixture()
+def results() -> pd.DataFrame:
+    # object 7 is not a building
+    return pd.DataFrame(
+        {
+            OBJECT_ID: [1, 2, 3, 4, 5, 6, 7],
+            COLUMNS.primary_object_type: ["RES", "COM", "RES", "RES", "COM", "RES", "road"],
+            COLUMNS.aggregation_label.format(name="district"): ["B", "A", "A", "C", "C", "D", "D"],
+            COLUMNS.inundation_depth: [0.5, 1.0, np.nan, 2.0, 0.25, 0.1, 1.0],
+            COLUMNS.max_potential_damage.format(name="structure"): [100.0] * 7,
+            COLUMNS.damage.format(name="structure"): [10.0, 20.0, np.nan, 40.0, 5.0, 1.0, 50.0],
+            COLUMNS.total_damage: [10.0, 20.0, 0.0, 40.0, 5.0, 1.0, 50.0],
+        }
+    )  # fmt: skip
+
+
+def test_aggregate(
+    buildings: gpd.GeoDataFrame, footprints: gpd.GeoDataFrame, results: pd.DataFrame
+):
+    # Arrange
+    index = FootprintIndex.build(
+        buildings, OBJECT_ID, footprints=footprints, field_name="BF_FID"
+    )
+
+    # Act
+    gdf = index.aggregate(results, fiat_columns=COLUMNS)
+
+    # Assert
+    assert gdf.crs == footprints.crs
+    assert gdf[OBJECT_ID].tolist() == ["1_2_3", "4", "5", "6"]
+    assert gdf[COLUMNS.primary_object_type].tolist() == ["RES", "RES", "COM", "RES"]
+    assert gdf[COLUMNS.aggregation_label.format(name="district")].tolist() == [
+        "A",
+        "C",
+        "C",
+        "D",
+    ]
+    np.testing.assert_allclose(gdf[COLUMNS.inundation_depth], [0.75, 2.0, 0.25, 0.1])
+    np.testing.assert_allclose(gdf[COLUMNS.total_damage], [30.0, 40.0, 5.0, 1.0])
+    np.testing.assert_allclose(gdf[f"{COLUMNS.total_damage} %"], [10.0, 40.0, 5.0, 1.0])
+    assert gdf.geometry[0].equals(footprints.geometry[0])
+    assert gdf.geometry[1].equals(footprints.geometry[1])
+    # a point without a footprint gets a shape around it, a polygon keeps its geometry
+    assert gdf.geometry[2].contains(buildings.geometry[4])
+    assert gdf.geometry[3].equals(buildings.geometry[5])
+
+
+def test_aggregate_matches_footprints(
+    buildings: gpd.GeoDataFrame, footprints: gpd.GeoDataFrame, results: pd.DataFrame
+):
+    # Arrange
+    index = FootprintIndex.build(
+        buildings, OBJECT_ID, footprints=footprints, field_name="BF_FID"
+    )
+    objects = gpd.GeoDataFrame(
+        results.merge(buildings, on=OBJECT_ID, how="inner"), crs=CRS
+    )
+    expected = Footprints(
+        footprints=footprints, field_name="BF_FID", fiat_columns=COLUMNS
+    )
+    expected.aggregate(objects)
+    expected.calc_normalized_damages()
+
+    # Act
+    gdf = index.aggregate(results, fiat_columns=COLUMNS)
+
+    # Assert
+    # Footprints does not give a geometry to a single point without a footprint
+    expected = pd.DataFrame(expected.results.drop(columns="geometry"))
+    expected[OBJECT_ID] = expected[OBJECT_ID].astype(str)
+    expected = expected.set_index(OBJECT_ID)
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(gdf.drop(columns="geometry")).set_index(OBJECT_ID),
+        expected[gdf.columns.drop([OBJECT_ID, "geometry"])],
+        check_dtype=False,
+    )
+
+
+def test_get_footprint_index_is_saved(
+    tmp_path: Path, buildings: gpd.GeoDataFrame, footprints: gpd.GeoDataFrame
+):
+    # Arrange
+    footprints_path = tmp_path / "footprints.gpkg"
+    footprints.to_file(footprints_path)
+
+    # Act
+    index = get_footprint_index(
+        tmp_path / "geometries", buildings, OBJECT_ID, footprints_path, "BF_FID"
+    )
+    loaded = get_footprint_index(
+        tmp_path / "geometries", buildings, OBJECT_ID, footprints_path, "BF_FID"
+    )
+
+    # Assert
+    assert len(list((tmp_path / "geometries").iterdir())) == 1
+    pd.testing.assert_frame_equal(loaded.objects, index.objects)
+    assert loaded.geometries.geom_equals(index.geometries).all()
+    assert loaded.geometries.crs == index.geometries.crs
+
+
+def test_key_depends_on_footprints_contents(
+    tmp_path: Path, buildings: gpd.GeoDataFrame, footprints: gpd.GeoDataFrame
+):
+    # Arrange
+    footprints_path = tmp_path / "footprints.gpkg"
+    footprints.to_file(footprints_path)
+    # a copy of the database in another location
+    moved_path = tmp_path / "moved" / "footprints.gpkg"
+    moved_path.parent.mkdir()
+    shutil.copy(footprints_path, moved_path)
+    changed_path = tmp_path / "changed.gpkg"
+    footprints.iloc[:2].to_file(changed_path)
+
+    # Act
+    key = FootprintIndex.get_key(buildings, OBJECT_ID, footprints_path, "BF_FID")
+    moved_key = FootprintIndex.get_key(buildings, OBJECT_ID, moved_path, "BF_FID")
+    changed_key = FootprintIndex.get_key(buildings, OBJECT_ID, changed_path, "BF_FID")
+
+    # Assert
+    assert key == moved_key
+    assert key != changed_key
+
+
+def test_old_indexes_are_removed(tmp_path: Path, buildings: gpd.GeoDataFrame):
+    # Arrange
+    index_dir = tmp_path / "geometries"
+
+    # Act
+    with mock.patch.object(footprint_index, "MAX_SAVED_INDEXES", 2):
+        for n in range(3):
+            get_footprint_index(index_dir, buildings.iloc[n:], OBJECT_ID)
+
+    # Assert
+    kept = [FootprintIndex.get_key(buildings.iloc[n:], OBJECT_ID) for n in [1, 2]]
+    assert sorted(path.name for path in index_dir.iterdir()) == sorted(
+        f"footprint_index_{key}" for key in kept
+    )
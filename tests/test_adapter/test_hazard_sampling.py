@@ -0,0 +1,180 @@
+from pathlib import Path
+from unittest import mock
+
+import geopandas as gpd
+import numpy as np
+import pytest
+import rasterio
+import shapely
+import xarray as xr
+from rasterio.transform import Affine
+
+from flood_adapt.adapter import hazard_sampling
+from flood_adapt.adapter.hazard_sampling import HazardSampleCache, sample_hazard_map
+
+HEIGHT, WIDTH = 10, 8
+CRS = "EPSG:32617"
+
+
+@pytest.fixture()
+def depth_map(tmp_path: Path) -> Path:
+    # pixel (row, col) has value 10 * row + col, with a dry pixel at (2, 2)
+    data = (10 * np.arange(HEIGHT)[:, None] + np.arange(WIDTH)[None, :]).astype("f4")
+    data[2, 2] = -999.0
+    path = tmp_path / "FloodMap.tif"
+    with rasterio.open(
+        path,
+        "w",
+        driver="GTiff",
+        height=HEIGHT,
+        width=WIDTH,
+        count=1,
+        dtype="float32",
+        crs=CRS,
+        transform=Affine(1, 0, 0, 0, -1, HEIGHT),
+        nodata=-999.0,
+    ) as dst:
+        dst.write(data, 1)
+    return path
+
+
+@pytest.fixture()
+def exposure() -> gpd.GeoDataFrame:
+    return gpd.GeoDataFrame(
+        {"object_id": [1, 2, 3, 4]},
+        geometry=[
+            shapely.Point(3.5, 9.5),  # row 0, col 3
+            shapely.box(1, 6, 3, 8),  # rows 2-3, cols 1-2, centroid in row 3, col 2
+            shapely.Point(100, 100),  # outside the map
+            shapely.box(5.1, 0.1, 5.2, 0.2),  # covers no pixel center, row 9, col 5
+        ],
+        crs=CRS,
+    )
+
+
+def test_sample_centroids(depth_map: Path, exposure: gpd.GeoDataFrame):
+    values = sample_hazard_map(depth_map, exposure.geometry, np.zeros(4, dtype=bool))
+
+    np.testing.assert_array_equal(values, [3, 32, np.nan, 95])
+
+
+@pytest.mark.parametrize("area_method, expected", [("mean", 28), ("max", 32)])
+def test_sample_area(
+    depth_map: Path, exposure: gpd.GeoDataFrame, area_method: str, expected: float
+):
+    values = sample_hazard_map(
+        depth_map,
+        exposure.geometry,
+        np.array([False, True, False, True]),
+        area_method=area_method,
+    )
+
+    # pixels 21, 31 and 32 are wet, pixel 22 is dry and ignored
+    np.testing.assert_allclose(values, [3, expected, np.nan, 95])
+
+
+@pytest.mark.parametrize(
+    "area_method, expected", [("mean", [28, 28, 88 / 3]), ("max", [32, 32, 33])]
+)
+def test_sample_overlapping_areas(
+    depth_map: Path, area_method: str, expected: list[float]
+):
+    # Arrange
+    geometries = gpd.GeoSeries(
+        [
+            shapely.box(1, 6, 3, 8),  # pixels 21, 22 (dry), 31 and 32
+            shapely.box(1, 6, 3, 8),  # identical, e.g. another unit of the same building
+            shapely.box(2, 6, 4, 8),  # overlapping, pixels 22 (dry), 23, 32 and 33
+        ],
+        crs=CRS,
+    )
+
+    # Act
+    values = sample_hazard_map(
+        depth_map, geometries, np.ones(3, dtype=bool), area_method=area_method
+    )
+
+    # Assert
+    np.testing.assert_allclose(values, expected)
+
+
+def test_sample_netcdf(tmp_path: Path, exposure: gpd.GeoDataFrame):
+    # Arrange
+    da = xr.DataArray(
+        np.arange(HEIGHT * WIDTH, dtype="f4").reshape(HEIGHT, WIDTH),
+        coords={"y": HEIGHT - 0.5 - np.arange(HEIGHT), "x": 0.5 + np.arange(WIDTH)},
+        dims=("y", "x"),
+        name="zsmax",
+    )
+    path = tmp_path / "max_water_level_map.nc"
+    da.to_netcdf(path)
+
+    # Act
+    values = sample_hazard_map(path, exposure.geometry, np.zeros(4, dtype=bool))
+
+    # Assert
+    np.testing.assert_array_equal(values, [3, 26, np.nan, 77])
+
+
+def test_cache_samples_once(
+    tmp_path: Path, depth_map: Path, exposure: gpd.GeoDataFrame
+):
+    # Arrange
+    cache = HazardSampleCache(tmp_path / "cache")
+
+    # Act
+    with mock.patch.object(
+        hazard_sampling,
+        "sample_hazard_map",
+        wraps=hazard_sampling.sample_hazard_map,
+    ) as sample:
+        first = cache.get_samples([depth_map], exposure, "object_id")
+        second = cache.get_samples([depth_map], exposure, "object_id")
+
+    # Assert
+    assert sample.call_count == 1
+    assert first.columns.tolist() == ["FloodMap"]
+    assert first.index.tolist() == [1, 2, 3, 4]
+    np.testing.assert_array_equal(first.to_numpy(), second.to_numpy())
+
+
+def test_cache_evicts_unreferenced_samples(
+    tmp_path: Path, depth_map: Path, exposure: gpd.GeoDataFrame
+):
+    # Arrange
+    cache = HazardSampleCache(tmp_path / "cache")
+    cache.get_samples([depth_map], exposure, "object_id", owner="scn_1")
+    cache.get_samples([depth_map], exposure, "object_id", owner="scn_2")
+    moved = exposure.copy()
+    moved.loc[0, "geometry"] = shapely.Point(4.5, 9.5)
+    cache.get_samples([depth_map], moved, "object_id", owner="scn_3")
+
+    # Act & Assert
+    # still used by scn_2
+    cache.release("scn_1")
+    assert len(list(cache.cache_dir.glob("*.npz"))) == 2
+
+    cache.release("scn_2")
+    assert len(list(cache.cache_dir.glob("*.npz"))) == 1
+
+    # a scenario that samples another hazard releases its previous samples
+    cache.get_samples([depth_map], exposure, "object_id", owner="scn_3")
+    assert len(list(cache.cache_dir.glob("*.npz"))) == 1
+
+    cache.prune([])
+    assert not list(cache.cache_dir.glob("*.npz"))
+
+
+def test_cache_key_changes_with_geometry(depth_map: Path, exposure: gpd.GeoDataFrame):
+    use_area = np.zeros(4, dtype=bool)
+    key = HazardSampleCache.get_key(
+        [depth_map], exposure, "object_id", use_area, "mean"
+    )
+
+    moved = exposure.copy()
+    moved.loc[0, "geometry"] = shapely.Point(4.5, 9.5)
+    moved_key = HazardSampleCache.get_key(
+        [depth_map], moved, "object_id", use_area, "mean"
+    )
+
+    assert key != moved_key
@@ -0,0 +1,152 @@
+from pathlib import Path
+
+import geopandas as gpd
+import pytest
+import shapely
+
+from flood_adapt.adapter.impact_geometries import (
+    GeometryStore,
+    copy_spatial_output,
+    export_spatial_outputs,
+    read_spatial_output,
+    spatial_output_exists,
+)
+
+CRS = "EPSG:32617"
+
+
+@pytest.fixture()
+def impacts() -> gpd.GeoDataFrame:
+    return gpd.GeoDataFrame(
+        {"Object ID": [1, 2, 3], "Total Damage": [10.0, 0.0, 25.5]},
+        geometry=[
+            shapely.box(0, 0, 1, 1),
+            shapely.Point(5, 5),
+            shapely.box(0, 0, 1, 1),
+        ],
+        crs=CRS,
+    )
+
+
+def test_write_and_read(tmp_path: Path, impacts: gpd.GeoDataFrame):
+    # Arrange
+    store = GeometryStore(tmp_path / "static" / "geometries")
+    output_path = tmp_path / "output" / "Impacts_roads_scn"
+
+    # Act
+    path = store.write(impacts, output_path)
+    gdf = read_spatial_output(output_path)
+
+    # Assert
+    assert path == output_path.with_suffix(".parquet")
+    assert spatial_output_exists(output_path)
+    assert gdf.crs == impacts.crs
+    assert gdf.columns.tolist() == impacts.columns.tolist()
+    assert gdf.geom_equals(impacts.geometry).all()
+    assert gdf["Total Damage"].tolist() == impacts["Total Damage"].tolist()
+
+
+def test_geometries_are_stored_once(tmp_path: Path, impacts: gpd.GeoDataFrame):
+    # Arrange
+    store = GeometryStore(tmp_path / "geometries")
+    other = impacts.assign(**{"Total Damage": [1.0, 2.0, 3.0]})
+
+    # Act
+    store.write(impacts, tmp_path / "scn1" / "Impacts_roads_scn1")
+    store.write(other, tmp_path / "scn2" / "Impacts_roads_scn2")
+
+    # Assert
+    geometry_files = list(store.geometry_dir.glob("*.parquet"))
+    assert len(geometry_files) == 1
+    # the duplicate geometry is only stored once
+    assert len(gpd.read_parquet(geometry_files[0])) == 2
+    gdf = read_spatial_output(tmp_path / "scn2" / "Impacts_roads_scn2", crs=4326)
+    assert gdf.crs.to_epsg() == 4326
+    assert gdf["Total Damage"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_copy_spatial_output(tmp_path: Path, impacts: gpd.GeoDataFrame):
+    # Arrange
+    store = GeometryStore(tmp_path / "static" / "geometries")
+    src = tmp_path / "output" / "scn1" / "Impacts_roads_scn1"
+    dst = tmp_path / "output" / "scn2" / "Impacts" / "Impacts_roads_scn2"
+    dst.parent.mkdir(parents=True)
+    store.write(impacts, src)
+
+    # Act
+    copy_spatial_output(src, dst)
+
+    # Assert
+    gdf = read_spatial_output(dst)
+    assert gdf.geom_equals(impacts.geometry).all()
+
+
+def test_unreferenced_geometries_are_evicted(tmp_path: Path, impacts: gpd.GeoDataFrame):
+    # Arrange
+    store = GeometryStore(tmp_path / "geometries")
+    other = impacts.assign(geometry=impacts.geometry.translate(10, 10))
+    scn1 = store.write(impacts, tmp_path / "scn1" / "Impacts_roads_scn1", owner="scn1")
+    scn2 = store.write(other, tmp_path / "scn2" / "Impacts_roads_scn2", owner="scn2")
+    # scn3 reuses the roads of scn1, like a delta run
+    scn3 = tmp_path / "scn3" / "Impacts_roads_scn3"
+    scn3.parent.mkdir()
+    copy_spatial_output(scn1, scn3)
+    store.add_reference("scn3", scn3)
+
+    # Act & Assert
+    assert len(list(store.geometry_dir.glob("*.parquet"))) == 2
+    store.release("scn1")
+    assert read_spatial_output(scn3).geom_equals(impacts.geometry).all()
+    store.prune(["scn2"])
+    assert len(list(store.geometry_dir.glob("*.parquet"))) == 1
+    assert read_spatial_output(scn2).geom_equals(other.geometry).all()
+
+
+def test_rewritten_output_evicts_previous_geometries(
+    tmp_path: Path, impacts: gpd.GeoDataFrame
+):
+    # Arrange
+    store = GeometryStore(tmp_path / "geometries")
+    output_path = tmp_path / "scn1" / "Impacts_roads_scn1"
+    store.write(impacts, output_path, owner="scn1")
+    other = impacts.assign(geometry=impacts.geometry.translate(10, 10))
+
+    # Act
+    store.write(other, output_path, owner="scn1")
+
+    # Assert
+    assert len(list(store.geometry_dir.glob("*.parquet"))) == 1
+    assert read_spatial_output(output_path).geom_equals(other.geometry).all()
+
+
+def test_export_spatial_outputs(tmp_path: Path, impacts: gpd.GeoDataFrame):
+    # Arrange
+    store = GeometryStore(tmp_path / "static" / "geometries")
+    impacts_path = tmp_path / "output" / "scn" / "Impacts"
+    store.write(impacts, impacts_path / "Impacts_roads_scn")
+    impacts.drop(columns="geometry").to_parquet(
+        impacts_path / "Impacts_detailed_scn.parquet"
+    )
+
+    # Act
+    paths = export_spatial_outputs(impacts_path, tmp_path / "export")
+
+    # Assert
+    assert paths == [tmp_path / "export" / "Impacts_roads_scn.gpkg"]
+    gdf = gpd.read_file(paths[0])
+    assert gdf.crs == impacts.crs
+    assert gdf.geom_equals(impacts.geometry).all()
+
+
+def test_read_geopackage(tmp_path: Path, impacts: gpd.GeoDataFrame):
+    # Arrange
+    path = tmp_path / "Impacts_building_footprints_scn.gpkg"
+    impacts.to_file(path, driver="GPKG")
+
+    # Act
+    gdf = read_spatial_output(tmp_path / "Impacts_building_footprints_scn", crs=4326)
+
+    # Assert
+    assert spatial_output_exists(path)
+    assert gdf.crs.to_epsg() == 4326
+    assert gdf["Object ID"].tolist() == [1, 2, 3]
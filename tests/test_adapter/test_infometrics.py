@@ -0,0 +1,178 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import tomli_w
+from fiat_toolbox.metrics_writer.fiat_write_metrics_file import (
+    MetricsFileWriter,
+    sql_struct,
+)
+
+from flood_adapt.adapter.infometrics import MetricsEvaluator, UnsupportedQueryError
+
+AGGR_FMT = "Aggregation Label: {name}"
+
+QUERIES = [
+    {"name": "Count", "select": "COUNT(*)", "filter": ""},
+    {
+        "name": "TotalDamage",
+        "select": "SUM(`Total Damage`)",
+        "filter": "`Total Damage` > 0",
+    },
+    {
+        "name": "ResidentialFlooded",
+        "select": "COUNT(*)",
+        "filter": "`Primary Object Type` IN ('RES', 'RES2') AND `Inundation Depth` >= 0.5",
+    },
+    {
+        "name": "NotResidential",
+        "select": "COUNT(*)",
+        "filter": "NOT `Primary Object Type` IN ('RES') OR `SVI` IS NULL",
+    },
+    {
+        "name": "DamageNotEqual",
+        "select": "SUM(`Total Damage`)*0.001",
+        "filter": "(`SVI` <> 0.5) AND NOT (`Inundation Depth` < 0.2)",
+    },
+    {"name": "AverageDepth", "select": "AVG(`Inundation Depth`)", "filter": ""},
+    {
+        "name": "MaxDepth",
+        "select": "MAX(`Inundation Depth`)",
+        "filter": "`SVI` >= 0.3",
+    },
+    {
+        "name": "MaxObjectId",
+        "select": "MAX(`Object ID`)",
+        "filter": "`Inundation Depth` > 0.2",
+    },
+    {"name": "MinObjectId", "select": "MIN(`Object ID`)", "filter": ""},
+    {"name": "SviCount", "select": "COUNT(`SVI`)", "filter": ""},
+    {"name": "Precedence", "select": "SUM(`Total Damage`)+1*2", "filter": ""},
+    {
+        "name": "PrecedenceMixed",
+        "select": "SUM(`Total Damage`)*2-10/4*2+3",
+        "filter": "`Total Damage` > 0",
+    },
+    {"name": "NoMatch", "select": "SUM(`Total Damage`)", "filter": "`SVI` > 10"},
+    {
+        "name": "Fallback",
+        "select": "COUNT(*)",
+        "filter": "`Primary Object Type` LIKE 'RES%'",
+    },
+]
+
+
+@pytest.fixture()
+def table() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Object ID": [1, 2, 3, 4, 5, 6],
+            "Primary Object Type": ["RES", "RES", "COM", "RES2", "COM", "RES"],
+            "Inundation Depth": [0.1, 0.6, np.nan, 1.2, 0.4, 0.5],
+            "Total Damage": [10.0, 50.0, 0.0, 120.0, np.nan, 30.0],
+            "SVI": [0.2, np.nan, 0.5, 0.8, 0.5, 0.3],
+            AGGR_FMT.format(name="district"): ["A", "A", "B", "B", None, "C"],
+            AGGR_FMT.format(name="ward"): ["1", "1", "1", "2", "2", "2"],
+        }
+    )
+
+
+@pytest.fixture()
+def config_path(tmp_path: Path) -> Path:
+    path = tmp_path / "mandatory_metrics_config.toml"
+    config = {
+        "aggregateBy": ["district", "ward"],
+        "queries": [
+            {"long_name": q["name"], "description": q["name"], **q} for q in QUERIES
+        ],
+    }
+    with open(path, "wb") as f:
+        tomli_w.dump(config, f)
+    return path
+
+
+def test_evaluate_matches_sql(table: pd.DataFrame, config_path: Path):
+    # Arrange
+    writer = MetricsFileWriter(config_path, aggregation_label_fmt=AGGR_FMT)
+    evaluator = MetricsEvaluator(table, aggregation_label_fmt=AGGR_FMT)
+
+    # Act
+    metrics = evaluator.evaluate(writer._read_metrics_file(include_aggregates=False))
+    aggregate_metrics = {
+        aggregate: evaluator.evaluate(queries, aggregate=aggregate)
+        for aggregate, queries in writer._read_metrics_file(
+            include_aggregates=True
+        ).items()
+    }
+
+    # Assert
+    expected = writer._parse_metrics(table, include_aggregates=False)
+    assert metrics["Precedence"] == 212.0
+    assert isinstance(metrics["MaxObjectId"], int)
+    assert isinstance(metrics["MinObjectId"], int)
+    pd.testing.assert_series_equal(
+        pd.Series(metrics, dtype=float).fillna(0),
+        pd.Series(expected, dtype=float).fillna(0),
+    )
+    expected_aggregates = writer._parse_metrics(table, include_aggregates=True)
+    for aggregate, expected_metrics in expected_aggregates.items():
+        for name, expected_values in expected_metrics.items():
+            assert aggregate_metrics[aggregate][name].keys() == expected_values.keys()
+            np.testing.assert_allclose(
+                list(aggregate_metrics[aggregate][name].values()),
+                list(expected_values.values()),
+            )
+
+
+def test_write_metrics_files_matches_sql(
+    tmp_path: Path, table: pd.DataFrame, config_path: Path
+):
+    # Arrange
+    evaluator = MetricsEvaluator(table, aggregation_label_fmt=AGGR_FMT)
+    writer = MetricsFileWriter(config_path, aggregation_label_fmt=AGGR_FMT)
+    expected_path = tmp_path / "expected" / "Infometrics_test.csv"
+    expected_path.parent.mkdir()
+
+    # Act
+    paths = evaluator.write_metrics_files(
+        config_path, tmp_path / "Infometrics_test.csv"
+    )
+    writer.parse_metrics_to_file(table, expected_path, write_aggregate=None)
+    writer.parse_metrics_to_file(table, expected_path, write_aggregate="all")
+
+    # Assert
+    assert sorted(paths) == ["district", "ward"]
+    for path in [tmp_path / "Infometrics_test.csv", *paths.values()]:
+        pd.testing.assert_frame_equal(
+            pd.read_csv(path, index_col=0),
+            pd.read_csv(expected_path.parent / path.name, index_col=0),
+            check_dtype=False,
+        )
+
+
+@pytest.mark.parametrize(
+    "select, filter",
+    [
+        ("SUM(`Total Damage`) + SUM(`SVI`)", ""),
+        ("COUNT(*)", "`Primary Object Type` LIKE 'RES%'"),
+        ("COUNT(*)", "`Primary Object Type` > 1"),
+        ("COUNT(*)", "`Unknown` > 1"),
+    ],
+)
+def test_unsupported_queries(table: pd.DataFrame, select: str, filter: str):
+    # Arrange
+    evaluator = MetricsEvaluator(table, aggregation_label_fmt=AGGR_FMT)
+    codes, labels = evaluator._get_groups(None)
+    query = sql_struct(
+        name="test",
+        long_name="test",
+        description="test",
+        select=select,
+        filter=filter,
+        groupby="",
+    )
+
+    # Act & Assert
+    with pytest.raises(UnsupportedQueryError):
+        evaluator._evaluate_query(query, codes=codes, n_groups=len(labels))
@@ -0,0 +1,174 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from flood_adapt.adapter.model_run import SFINCS_PROGRESS_PATTERN, ModelRun
+
+
+def python_model_run(tmp_path: Path, script: str, **kwargs) -> ModelRun:
+    lines = kwargs.pop("lines", [])
+    return ModelRun(
+        args=[sys.executable, "-u", "-c", script],
+        cwd=tmp_path,
+        on_line=lines.append,
+        **kwargs,
+    )
+
+
+def test_run_streams_output_and_progress(tmp_path: Path):
+    # Arrange
+    script = (
+        "import sys\n"
+        "print('Welcome to SFINCS')\n"
+        "for p in (0, 50, 100):\n"
+        "    print(f'  {p}% complete,       1.0 s remaining ...')\n"
+        "print('error message', file=sys.stderr)\n"
+    )
+    lines, progress = [], []
+
+    # Act
+    run = python_model_run(
+        tmp_path,
+        script,
+        lines=lines,
+        progress_pattern=SFINCS_PROGRESS_PATTERN,
+        on_progress=progress.append,
+        tail_size=2,
+    )
+    success = run.run()
+
+    # Assert
+    assert success
+    assert run.returncode == 0
+    assert run.failure_reason is None
+    assert lines[0] == "Welcome to SFINCS"
+    assert "error message" in lines
+    assert progress == [0.0, 50.0, 100.0]
+    assert run.progress == 100.0
+    assert len(run.tail) == 2
+
+
+def test_run_failure(tmp_path: Path):
+    run = python_model_run(tmp_path, "raise SystemExit(3)")
+
+    assert not run.run()
+    assert run.returncode == 3
+    assert "return code 3" in run.failure_reason
+
+
+def test_run_timeout(tmp_path: Path):
+    # Arrange
+    run = python_model_run(tmp_path, "import time; time.sleep(30)", timeout=0.5)
+
+    # Act
+    start = time.monotonic()
+    success = run.run()
+
+    # Assert
+    assert not success
+    assert run.timed_out
+    assert "did not finish within" in run.failure_reason
+    assert time.monotonic() - start < 10
+
+
+def test_cancel_background_run(tmp_path: Path):
+    # Arrange
+    run = python_model_run(
+        tmp_path, "import time\nprint('started')\ntime.sleep(30)"
+    ).start()
+    while not run.tail:
+        time.sleep(0.05)
+
+    # Act
+    run.cancel()
+
+    # Assert
+    assert not run.result(timeout=10)
+    assert run.cancelled
+    assert run.failure_reason == "the run was cancelled"
+
+
+def test_on_exit_determines_result(tmp_path: Path):
+    # Arrange
+    def on_exit(run: ModelRun) -> bool:
+        raise RuntimeError(f"failed: {run.failure_reason}")
+
+    run = python_model_run(tmp_path, "raise SystemExit(1)", on_exit=on_exit)
+
+    # Act & Assert
+    with pytest.raises(RuntimeError, match="return code 1"):
+        run.run()
+
+
+def test_on_exit_called_when_popen_raises(tmp_path: Path):
+    # Arrange
+    finished = []
+
+    def on_exit(run: ModelRun) -> bool:
+        finished.append(run.failure_reason)
+        return False
+
+    run = python_model_run(tmp_path, "pass", on_exit=on_exit)
+
+    # Act
+    with mock.patch("subprocess.Popen", side_effect=PermissionError("not executable")):
+        success = run.run()
+
+    # Assert
+    assert not success
+    assert isinstance(run.error, PermissionError)
+    assert finished == ["the model could not be run: not executable"]
+
+
+def test_popen_error_raised_without_on_exit(tmp_path: Path):
+    # Arrange
+    run = python_model_run(tmp_path, "pass")
+
+    # Act & Assert
+    with mock.patch("subprocess.Popen", side_effect=PermissionError("not executable")):
+        with pytest.raises(PermissionError, match="not executable"):
+            run.run()
+
+
+def test_concurrent_runs_write_own_log_file(tmp_path: Path):
+    # Arrange
+    runs = []
+    for name in ["event_1", "event_2"]:
+        (tmp_path / name).mkdir()
+        runs.append(
+            python_model_run(
+                tmp_path / name,
+                f"import time\nfor i in range(3):\n    print('{name}', i)\n    time.sleep(0.05)",
+                log_file=tmp_path / name / "sfincs_model.log",
+            )
+        )
+
+    # Act
+    for run in runs:
+        run.start()
+    results = [run.result(timeout=10) for run in runs]
+
+    # Assert
+    assert all(results)
+    for name in ["event_1", "event_2"]:
+        log = (tmp_path / name / "sfincs_model.log").read_text().splitlines()
+        assert log == [f"{name} {i}" for i in range(3)]
+
+
+def test_wait_async(tmp_path: Path):
+    run = python_model_run(tmp_path, "print('done')").start()
+
+    assert asyncio.run(run.wait_async())
+    assert run.done()
+
+
+def test_run_can_only_be_started_once(tmp_path: Path):
+    run = python_model_run(tmp_path, "pass")
+    run.run()
+
+    with pytest.raises(RuntimeError, match="only be started once"):
+        run.start()
@@ -23,6 +23,7 @@ from flood_adapt.config.hazard import (
 )
 from flood_adapt.dbs_classes.database import Database
 from flood_adapt.dbs_classes.interface.database import IDatabase
+from flood_adapt.misc.utils import modified_environ
 from flood_adapt.objects.events.hurricane import TranslationModel
 from flood_adapt.objects.events.synthetic import (
     SyntheticEvent,
@@ -1381,6 +1382,113 @@ def test_existing_forcings_in_template_raises(test_db, request, forcing_fixture_
     )
 
 
+class TestMaterialize:
+    def _static_files(self, adapter: SfincsAdapter) -> dict[str, Path]:
+        return {
+            key: Path(adapter._model.get_config(key, abs_path=True))
+            for key in SfincsAdapter._STATIC_FILE_KEYS
+            if adapter._model.get_config(key) is not None
+        }
+
+    def test_materialize_links_static_files(
+        self, default_sfincs_adapter: SfincsAdapter, tmp_path: Path
+    ):
+        # Arrange
+        template_files = self._static_files(default_sfincs_adapter)
+        template_root = default_sfincs_adapter.get_model_root()
+        sim_path = tmp_path / "simulation"
+
+        # Act
+        default_sfincs_adapter.materialize(sim_path)
+
+        # Assert
+        assert default_sfincs_adapter.get_model_root() == sim_path
+        assert template_files
+        for template_file in template_files.values():
+            sim_file = sim_path / template_file.relative_to(template_root)
+            assert sim_file.exists()
+            assert sim_file.samefile(template_file)
+
+    def test_write_modified_does_not_modify_template(
+        self, default_sfincs_adapter: SfincsAdapter, tmp_path: Path
+    ):
+        # Arrange
+        template_files = self._static_files(default_sfincs_adapter)
+        template_root = default_sfincs_adapter.get_model_root()
+        template_content = {
+            key: file.read_bytes() for key, file in template_files.items()
+        }
+        sim_path = tmp_path / "simulation"
+        default_sfincs_adapter.materialize(sim_path)
+        default_sfincs_adapter._grid_modified = True
+
+        # Act
+        default_sfincs_adapter.write_modified()
+
+        # Assert
+        for key, template_file in template_files.items():
+            assert template_file.read_bytes() == template_content[key]
+            sim_file = sim_path / template_file.relative_to(template_root)
+            assert sim_file.samefile(template_file) == (key == "sbgfile")
+        assert (sim_path / "sfincs.inp").exists()
+
+
+class TestRunRiskScenario:
+    @pytest.fixture()
+    def risk_scenario(self, test_db: IDatabase) -> Tuple[Scenario, list[str]]:
+        scn = test_db.scenarios.get("current_test_set_no_measures")
+        event_set = test_db.events.get(scn.event, load_all=True)
+        return scn, [sub_event.name for sub_event in event_set._events]
+
+    def test_run_risk_scenario_executes_all_sub_events(
+        self, default_sfincs_adapter: SfincsAdapter, risk_scenario
+    ):
+        # Arrange
+        scn, sub_events = risk_scenario
+
+        # Act
+        with (
+            mock.patch.object(SfincsAdapter, "preprocess"),
+            mock.patch.object(
+                SfincsAdapter, "execute", return_value=True
+            ) as mock_execute,
+            mock.patch.object(SfincsAdapter, "calculate_rp_floodmaps") as mock_rp,
+            modified_environ(SFINCS_MAX_WORKERS=str(len(sub_events))),
+        ):
+            default_sfincs_adapter._run_risk_scenario(scn)
+
+        # Assert
+        executed = {call.args[0].parent.name for call in mock_execute.call_args_list}
+        assert executed == set(sub_events)
+        mock_rp.assert_called_once_with(scn)
+
+    def test_run_risk_scenario_reports_failed_sub_events(
+        self, default_sfincs_adapter: SfincsAdapter, risk_scenario
+    ):
+        # Arrange
+        scn, sub_events = risk_scenario
+        failing = sub_events[0]
+
+        def fake_execute(path: Path, strict: bool = True) -> bool:
+            return path.parent.name != failing
+
+        # Act
+        with (
+            mock.patch.object(SfincsAdapter, "preprocess"),
+            mock.patch.object(
+                SfincsAdapter, "execute", side_effect=fake_execute
+            ) as mock_execute,
+            mock.patch.object(SfincsAdapter, "calculate_rp_floodmaps") as mock_rp,
+            modified_environ(SFINCS_MAX_WORKERS="2"),
+        ):
+            with pytest.raises(RuntimeError, match=failing):
+                default_sfincs_adapter._run_risk_scenario(scn)
+
+        # Assert
+        assert mock_execute.call_count == len(sub_events)
+        mock_rp.assert_not_called()
+
+
 @pytest.mark.skipif(
     not IS_WINDOWS,
     reason="Only run on windows where we have a working sfincs binary",
@@ -1646,3 +1754,83 @@ class TestPostProcessing:
                 rp_maps[i + 1].to_numpy()[mask_valid]
                 >= rp_maps[i].to_numpy()[mask_valid]
             ), f"Return period map at index {i + 1} should have values greater than or equal to index {i}"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100_000])
+def test_calc_rp_maps_matches_per_cell_interpolation(chunk_size):
+    # Arrange
+    rng = np.random.default_rng(0)
+    n_events, n_cells = 10, 500
+    coords = {"z": np.arange(n_cells)}
+    zb = rng.normal(size=n_cells)
+    floodmaps = []
+    for _ in range(n_events):
+        zsmax = np.round(zb + rng.gamma(1.0, 1.0, size=n_cells), 1)  # include ties
+        zsmax[rng.random(n_cells) < 0.3] = np.nan
+        floodmaps.append(xr.DataArray(zsmax, dims=["z"], coords=coords))
+    frequencies = list(rng.uniform(1e-3, 0.5, size=n_events))
+    mask = xr.DataArray(rng.integers(0, 2, size=n_cells), dims=["z"], coords=coords)
+    return_periods = [1, 2, 5, 10, 25, 50, 100]
+
+    # Reference: interpolate every valid cell separately
+    zs = np.stack([floodmap.to_numpy() for floodmap in floodmaps])
+    zs = np.where(np.isnan(zs), np.tile(zb, (n_events, 1)), zs)
+    freq = np.tile(frequencies, (n_cells, 1)).transpose()
+    sort_index = zs.argsort(axis=0)
+    sorted_prob = np.flipud(np.take_along_axis(freq, sort_index, axis=0))
+    sorted_zs = np.flipud(np.take_along_axis(zs, sort_index, axis=0))
+    rp_zs = 1.0 / np.cumsum(sorted_prob, axis=0)
+    expected = np.tile(zb, (len(return_periods), 1))
+    for jj in np.where(mask == 1)[0]:
+        expected[:, jj] = np.interp(
+            np.log10(return_periods),
+            np.log10(rp_zs[::-1, jj]),
+            sorted_zs[::-1, jj],
+            left=0,
+        )
+    expected[:, np.all(np.isnan(np.stack(floodmaps)), axis=0)] = np.nan
+    expected[expected - zb < 10e-10] = np.nan
+
+    # Act
+    rp_maps = SfincsAdapter.calc_rp_maps(
+        floodmaps=floodmaps,
+        frequencies=frequencies,
+        zb=xr.DataArray(zb, dims=["z"], coords=coords),
+        mask=mask,
+        return_periods=return_periods,
+        chunk_size=chunk_size,
+    )
+
+    # Assert
+    actual = np.stack([rp_map.to_numpy() for rp_map in rp_maps])
+    np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.parametrize("tile_size", [1, 8, 1_000_000])
+def test_calc_rp_maps_tiled_matches_calc_rp_maps(tile_size):
+    # Arrange
+    rng = np.random.default_rng(0)
+    n_events = 5
+    coords = {"y": np.arange(6)[::-1], "x": np.arange(4)}
+    zb = xr.DataArray(rng.normal(size=(6, 4)), dims=["y", "x"], coords=coords)
+    floodmaps = []
+    for _ in range(n_events):
+        zsmax = zb.to_numpy() + rng.gamma(1.0, 1.0, size=(6, 4))
+        zsmax[rng.random((6, 4)) < 0.3] = np.nan
+        floodmaps.append(xr.DataArray(zsmax, dims=["y", "x"], coords=coords))
+    frequencies = list(rng.uniform(1e-3, 0.5, size=n_events))
+    mask = xr.DataArray(rng.integers(0, 2, size=(6, 4)), dims=["y", "x"], coords=coords)
+    return_periods = [1, 2, 5, 10, 25, 50, 100]
+
+    # Act
+    expected = SfincsAdapter.calc_rp_maps(
+        floodmaps, frequencies, zb, mask, return_periods
+    )
+    actual = SfincsAdapter._calc_rp_maps_tiled(
+        floodmaps, frequencies, zb, mask, return_periods, tile_size=tile_size
+    )
+
+    # Assert
+    assert len(actual) == len(expected)
+    for rp_actual, rp_expected in zip(actual, expected):
+        xr.testing.assert_identical(rp_actual, rp_expected)
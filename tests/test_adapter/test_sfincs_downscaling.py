@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+import rasterio
+import xarray as xr
+from rasterio.transform import Affine
+
+from flood_adapt.adapter.sfincs_downscaling import IndexDownscaler
+
+N, M = 6, 5  # sfincs grid cells in y and x direction
+REFINEMENT = 4  # dem pixels per sfincs cell in each direction
+INDEX_NODATA = 2147483647
+
+
+@pytest.fixture()
+def dem_and_index(tmp_path):
+    rng = np.random.default_rng(0)
+    height, width = N * REFINEMENT, M * REFINEMENT
+    transform = Affine(1, 0, 0, 0, -1, height)
+
+    dem = rng.uniform(-1, 2, size=(height, width)).astype(np.float32)
+    dem[0, 0] = -9999.0  # nodata pixel
+
+    # cell index as created by make_index_cog: m * nmax + n, with n counted from the bottom
+    rows, cols = np.mgrid[0:height, 0:width]
+    n = (height - 1 - rows) // REFINEMENT
+    m = cols // REFINEMENT
+    index = (m * N + n).astype(np.uint32)
+    index[-1, -1] = INDEX_NODATA  # pixel outside the sfincs grid
+
+    profile = {
+        "driver": "GTiff",
+        "height": height,
+        "width": width,
+        "count": 1,
+        "crs": "EPSG:32617",
+        "transform": transform,
+    }
+    dem_path = tmp_path / "dem.tif"
+    with rasterio.open(
+        dem_path, "w", dtype=np.float32, nodata=-9999.0, **profile
+    ) as dst:
+        dst.write(dem, 1)
+    index_path = tmp_path / "index.tif"
+    with rasterio.open(
+        index_path, "w", dtype=np.uint32, nodata=INDEX_NODATA, **profile
+    ) as dst:
+        dst.write(index, 1)
+
+    zsmax = xr.DataArray(
+        rng.uniform(0, 2, size=(N, M)).astype(np.float32), dims=("y", "x")
+    )
+    zsmax[2, 3] = np.nan  # dry cell
+
+    # expected depths, computed per pixel from the cell it lies in
+    expected = zsmax.to_numpy()[n, m] - dem
+    expected[0, 0] = np.nan
+    expected[-1, -1] = np.nan
+    expected[~(expected > 0.01)] = np.nan
+
+    return dem_path, index_path, zsmax, expected
+
+
+@pytest.mark.parametrize("block_size", [3, 7, 2048])
+def test_write_floodmaps_gathers_water_levels_per_pixel(
+    dem_and_index, tmp_path, block_size
+):
+    # Arrange
+    dem_path, index_path, zsmax, expected = dem_and_index
+    floodmap_fns = [tmp_path / "floodmap_1.tif", tmp_path / "floodmap_2.tif"]
+
+    # Act
+    IndexDownscaler(
+        dem_path=dem_path, index_path=index_path, block_size=block_size
+    ).write_floodmaps(
+        zsmax_maps=[zsmax, zsmax + 1.0], floodmap_fns=floodmap_fns, hmin=0.01
+    )
+
+    # Assert
+    with rasterio.open(floodmap_fns[0]) as src:
+        np.testing.assert_allclose(src.read(1), expected, rtol=1e-6)
+        assert np.isnan(src.nodata)
+    with rasterio.open(floodmap_fns[1]) as src:
+        wet = ~np.isnan(expected)
+        np.testing.assert_allclose(src.read(1)[wet], expected[wet] + 1.0, rtol=1e-6)
+
+
+def test_write_floodmaps_dem_conversion(dem_and_index, tmp_path):
+    # Arrange
+    dem_path, index_path, zsmax, _ = dem_and_index
+    floodmap_fn = tmp_path / "floodmap.tif"
+    with rasterio.open(dem_path) as src:
+        dem = src.read(1, masked=True).filled(np.nan)
+
+    # Act
+    IndexDownscaler(
+        dem_path=dem_path, index_path=index_path, dem_conversion=0.5
+    ).write_floodmaps(zsmax_maps=[zsmax], floodmap_fns=[floodmap_fn], hmin=-np.inf)
+
+    # Assert
+    with rasterio.open(floodmap_fn) as src:
+        h = src.read(1)
+    with rasterio.open(index_path) as src:
+        cells = src.read(1).astype(np.int64)
+    valid = (cells != INDEX_NODATA) & ~np.isnan(dem)
+    zs = zsmax.to_numpy().flatten("F")[cells[valid]]
+    np.testing.assert_allclose(h[valid], zs - 0.5 * dem[valid], rtol=1e-6)
+
+
+def test_index_shape_mismatch_raises(dem_and_index, tmp_path):
+    # Arrange
+    dem_path, _, _, _ = dem_and_index
+    index_path = tmp_path / "wrong_index.tif"
+    with rasterio.open(
+        index_path,
+        "w",
+        driver="GTiff",
+        height=2,
+        width=2,
+        count=1,
+        dtype=np.uint32,
+        crs="EPSG:32617",
+        transform=Affine(1, 0, 0, 0, -1, 2),
+    ) as dst:
+        dst.write(np.zeros((2, 2), dtype=np.uint32), 1)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="does not match DEM shape"):
+        IndexDownscaler(dem_path=dem_path, index_path=index_path)
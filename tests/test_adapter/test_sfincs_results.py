@@ -0,0 +1,135 @@
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from flood_adapt.adapter.sfincs_adapter import SfincsAdapter
+from flood_adapt.adapter.sfincs_results import SfincsResultReader
+
+NMAX, MMAX = 3, 4
+
+
+@pytest.fixture()
+def sim_path(tmp_path: Path) -> Path:
+    (tmp_path / "sfincs.inp").write_text(
+        "\n".join(
+            [
+                f"mmax = {MMAX}",
+                f"nmax = {NMAX}",
+                "dx = 10",
+                "dy = 10",
+                "x0 = 100",
+                "y0 = 200",
+                "rotation = 0",
+                "epsg = 32617",
+            ]
+        )
+    )
+
+    timemax = pd.date_range("2023-01-01", periods=2, freq="h")
+    ds_map = xr.Dataset(
+        {
+            "zsmax": (
+                ("timemax", "n", "m"),
+                np.arange(2 * NMAX * MMAX, dtype="f4").reshape(2, NMAX, MMAX),
+            ),
+            "zb": (("n", "m"), np.ones((NMAX, MMAX), dtype="f4")),
+            "zs": (("time", "n", "m"), np.zeros((5, NMAX, MMAX), dtype="f4")),
+            "x": (("n", "m"), np.zeros((NMAX, MMAX))),
+            "y": (("n", "m"), np.zeros((NMAX, MMAX))),
+        },
+        coords={"timemax": timemax, "time": pd.date_range("2023-01-01", periods=5)},
+    ).set_coords(["x", "y"])
+    ds_map.to_netcdf(tmp_path / "sfincs_map.nc")
+
+    ds_his = xr.Dataset(
+        {
+            "point_zs": (("time", "stations"), np.linspace(0, 1, 10).reshape(5, 2)),
+            "point_x": ("stations", [110.0, 120.0]),
+            "point_y": ("stations", [210.0, 220.0]),
+        },
+        coords={"time": pd.date_range("2023-01-01", periods=5)},
+    )
+    ds_his.to_netcdf(tmp_path / "sfincs_his.nc")
+    return tmp_path
+
+
+def test_get_zsmax_returns_maximum_on_model_grid(sim_path: Path):
+    with SfincsResultReader(sim_path) as results:
+        zsmax = results.get_zsmax().load()
+
+    assert zsmax.dims == ("y", "x")
+    assert zsmax.shape == (NMAX, MMAX)
+    np.testing.assert_array_equal(
+        zsmax.to_numpy(), np.arange(NMAX * MMAX).reshape(NMAX, MMAX) + NMAX * MMAX
+    )
+    np.testing.assert_allclose(zsmax["x"], 100 + 5 + 10 * np.arange(MMAX))
+    np.testing.assert_allclose(zsmax["y"], 200 + 5 + 10 * np.arange(NMAX))
+    assert zsmax.raster.crs.to_epsg() == 32617
+    assert zsmax.attrs["units"] == "m"
+
+
+def test_results_are_cached(sim_path: Path):
+    with SfincsResultReader(sim_path) as results:
+        assert results.get_zsmax() is results.get_zsmax()
+        assert results.get_point_zs() is results.get_point_zs()
+
+
+def test_get_point_zs(sim_path: Path):
+    with SfincsResultReader(sim_path) as results:
+        da = results.get_point_zs()
+
+    assert da.shape == (5, 2)
+    np.testing.assert_array_equal(da.point_x, [110.0, 120.0])
+    np.testing.assert_array_equal(da.point_y, [210.0, 220.0])
+
+
+def test_missing_output_raises(sim_path: Path):
+    (sim_path / "sfincs_his.nc").unlink()
+
+    with SfincsResultReader(sim_path) as results:
+        with pytest.raises(FileNotFoundError):
+            results.get_point_zs()
+
+
+def test_tiled_rp_maps_only_read_tiles_of_zsmax(sim_path: Path):
+    # Arrange
+    pytest.importorskip("netCDF4")
+    netcdf4_backend = pytest.importorskip("xarray.backends.netCDF4_")
+    wrapper = netcdf4_backend.NetCDF4ArrayWrapper
+    original_getitem = wrapper._getitem
+    read_shapes = []
+
+    def _getitem(self, key):
+        array = original_getitem(self, key)
+        if self.variable_name == "zsmax":
+            read_shapes.append(np.shape(array))
+        return array
+
+    # Act
+    with SfincsResultReader(sim_path) as results:
+        zb = results.get_zb()
+        with mock.patch.object(wrapper, "_getitem", _getitem):
+            rp_maps = SfincsAdapter._calc_rp_maps_tiled(
+                floodmaps=[results.get_zsmax_intervals()],
+                frequencies=[0.1],
+                zb=zb,
+                mask=xr.ones_like(zb, dtype=int),
+                return_periods=[10],
+                tile_size=MMAX,
+                reduce_dim="timemax",
+            )
+        expected = SfincsAdapter.calc_rp_maps(
+            floodmaps=[results.get_zsmax().load()],
+            frequencies=[0.1],
+            zb=zb,
+            mask=xr.ones_like(zb, dtype=int),
+            return_periods=[10],
+        )
+
+    # Assert
+    assert read_shapes == [(2, 1, MMAX)] * NMAX
+    xr.testing.assert_allclose(rp_maps[0], expected[0])
@@ -237,6 +237,19 @@ def test_true_booleans_persisted(
     assert s.use_binaries is True
 
 
+def test_sfincs_max_workers_persisted():
+    Settings(SFINCS_MAX_WORKERS=4).export_to_env()
+
+    s = Settings()
+    assert os.getenv("SFINCS_MAX_WORKERS") == "4"
+    assert s.sfincs_max_workers == 4
+
+
+def test_invalid_sfincs_max_workers_raises():
+    with pytest.raises(ValidationError):
+        Settings(SFINCS_MAX_WORKERS=0)
+
+
 def test_get_sfincs_version_success(
     fake_binaries: tuple[Path, Path],
     mock_subprocess_run: Callable[..., None],
@@ -1,13 +1,15 @@
 import shutil
 from os import listdir
 from pathlib import Path
+from unittest import mock
 
 import pytest
 
 from flood_adapt.config.config import Settings
 from flood_adapt.config.site import Site
 from flood_adapt.dbs_classes.database import Database
-from flood_adapt.misc.exceptions import IsStandardObjectError
+from flood_adapt.misc.exceptions import DoesNotExistError, IsStandardObjectError
+from flood_adapt.misc.utils import write_finished_file
 from flood_adapt.workflows.benefit_runner import Benefit, BenefitRunner
 
 
@@ -106,6 +108,153 @@ def test_cleanup_InputExists_RunNotFinished_OutputRemoved():
     dbs.shutdown()
 
 
+def test_cleanup_FastOpen_OutputRemovedInBackground(monkeypatch):
+    # Arrange
+    monkeypatch.setenv("FAST_DATABASE_OPEN", "True")
+    input_path = Settings().database_path / "input" / "scenarios" / "test123"
+    if input_path.exists():
+        shutil.rmtree(input_path)
+
+    output_path = Settings().database_path / "output" / "scenarios" / "test123"
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    # Act
+    dbs = Database(Settings().database_root, Settings().database_name)
+    dbs.wait_for_cleanup()
+
+    # Assert
+    assert not output_path.exists()
+
+    # Cleanup singleton
+    dbs.shutdown()
+
+
+def test_cleanup_NoSimulations_ModelsNotCreated(tmp_path):
+    # Arrange
+    db = object.__new__(Database)
+    db._scenarios = mock.Mock(
+        input_path=tmp_path / "input", output_path=tmp_path / "output"
+    )
+    db._static = mock.Mock()
+    db.hazard_store = mock.Mock()
+    db.hazard_samples = mock.Mock()
+    db.geometries = mock.Mock()
+    db.output_path = tmp_path / "db_output"
+    db._events = mock.Mock(input_path=tmp_path / "input" / "events")
+    db._site = mock.Mock()
+    db._site.sfincs.config.save_simulation = False
+    db._site.fiat.config.save_simulation = False
+
+    (tmp_path / "input" / "scn_1").mkdir(parents=True)
+    write_finished_file(tmp_path / "output" / "scn_1" / "Flooding")
+    write_finished_file(tmp_path / "output" / "scn_1")
+
+    # Act
+    db.cleanup()
+
+    # Assert
+    assert (tmp_path / "output" / "scn_1").is_dir()
+    db._static.get_overland_sfincs_model.assert_not_called()
+    db._static.get_fiat_model.assert_not_called()
+
+
+@pytest.fixture()
+def cleanup_db(tmp_path) -> Database:
+    db = object.__new__(Database)
+    db._scenarios = mock.Mock(
+        input_path=tmp_path / "input", output_path=tmp_path / "output"
+    )
+    db._static = mock.Mock()
+    db.hazard_store = mock.Mock()
+    db.hazard_samples = mock.Mock()
+    db.geometries = mock.Mock()
+    db.output_path = tmp_path / "db_output"
+    db._events = mock.Mock(input_path=tmp_path / "input" / "events")
+    db._site = mock.Mock()
+    db._site.sfincs.config.save_simulation = False
+    db._site.sfincs.config.overland_model.name = "overland"
+    db._site.sfincs.config.offshore_model.name = "offshore"
+    db._site.fiat.config.save_simulation = False
+
+    for scn in ["scn_1", "scn_2"]:
+        (tmp_path / "input" / scn).mkdir(parents=True)
+        write_finished_file(tmp_path / "output" / scn)
+    return db
+
+
+def test_cleanup_Simulations_RemovedWithoutModels(cleanup_db: Database, tmp_path):
+    # Arrange
+    single = tmp_path / "output" / "scn_1"
+    risk = tmp_path / "output" / "scn_2"
+    for sim_path in [
+        single / "Flooding" / "simulations" / "overland",
+        single / "Flooding" / "simulations" / "offshore",
+        single / "Impacts" / "fiat_model",
+        risk / "Flooding" / "simulations" / "event_0001" / "overland",
+        risk / "Flooding" / "simulations" / "event_0002" / "overland",
+    ]:
+        sim_path.mkdir(parents=True)
+    (single / "Impacts" / "Impacts_detailed_scn_1.csv").write_text("")
+
+    # Act
+    cleanup_db.cleanup()
+
+    # Assert
+    assert not (single / "Flooding" / "simulations").exists()
+    assert not (single / "Impacts" / "fiat_model").exists()
+    assert (single / "Impacts" / "Impacts_detailed_scn_1.csv").exists()
+    assert not (risk / "Flooding" / "simulations").exists()
+    assert (risk / "Flooding").is_dir()
+    cleanup_db._static.get_overland_sfincs_model.assert_not_called()
+    cleanup_db._static.get_fiat_model.assert_not_called()
+    cleanup_db._scenarios.get.assert_not_called()
+
+
+def test_cleanup_FailingScenario_OtherScenariosCleanedUp(
+    cleanup_db: Database, tmp_path
+):
+    # Arrange
+    for scn in ["scn_1", "scn_2"]:
+        (tmp_path / "output" / scn / "Impacts" / "fiat_model").mkdir(parents=True)
+    delete_simulations = cleanup_db._delete_simulations
+
+    def _delete_simulations(scenario_name: str):
+        if scenario_name == "scn_1":
+            raise DoesNotExistError(scenario_name, "Scenario")
+        delete_simulations(scenario_name)
+
+    # Act
+    with mock.patch.object(
+        cleanup_db, "_delete_simulations", side_effect=_delete_simulations
+    ):
+        cleanup_db.cleanup()
+
+    # Assert
+    assert (tmp_path / "output" / "scn_1" / "Impacts" / "fiat_model").exists()
+    assert not (tmp_path / "output" / "scn_2" / "Impacts" / "fiat_model").exists()
+    cleanup_db.hazard_samples.prune.assert_called_once_with({"scn_1", "scn_2"})
+
+
+def test_cleanup_DeletedEvent_OffshoreCacheRemoved(cleanup_db: Database, tmp_path):
+    # Arrange
+    (tmp_path / "input" / "events" / "event_1").mkdir(parents=True)
+    offshore_path = tmp_path / "db_output" / "offshore"
+    for cache_path in [
+        offshore_path / "event_1" / "key_1.csv",
+        offshore_path / "event_2" / "key_2.csv",
+        offshore_path / "key_3.csv",
+    ]:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text("")
+
+    # Act
+    cleanup_db.cleanup()
+
+    # Assert
+    assert sorted(path.name for path in offshore_path.iterdir()) == ["event_1"]
+    assert (offshore_path / "event_1" / "key_1.csv").exists()
+
+
 def test_migrate_deprecated_tiles_keeps_tiles(tmp_path):
     # Arrange
     db = object.__new__(Database)
@@ -0,0 +1,343 @@
+import os
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from flood_adapt.adapter.sfincs_offshore import OffshoreSfincsHandler
+from flood_adapt.dbs_classes.dbs_benefit import DbsBenefit
+from flood_adapt.dbs_classes.dbs_event import DbsEvent
+from flood_adapt.dbs_classes.dbs_projection import DbsProjection
+from flood_adapt.dbs_classes.dbs_scenario import DbsScenario
+from flood_adapt.misc.exceptions import DoesNotExistError
+from flood_adapt.objects.benefits.benefits import Benefit, CurrentSituationModel
+from flood_adapt.objects.projections.projections import (
+    PhysicalProjection,
+    Projection,
+    SocioEconomicChange,
+)
+from flood_adapt.objects.scenarios.scenarios import Scenario
+
+
+@pytest.fixture()
+def projections(tmp_path: Path) -> DbsProjection:
+    database = mock.Mock(
+        base_path=tmp_path,
+        input_path=tmp_path / "input",
+        output_path=tmp_path / "output",
+    )
+    # no scenarios use the projection
+    database.scenarios.get_dependents.return_value = {}
+    dbs = DbsProjection(database)
+    dbs.input_path.mkdir(parents=True)
+    dbs.save(
+        Projection(
+            name="projection_1",
+            physical_projection=PhysicalProjection(rainfall_multiplier=1.5),
+            socio_economic_change=SocioEconomicChange(),
+        )
+    )
+    return dbs
+
+
+def test_get_loads_object_once(projections: DbsProjection):
+    # Act
+    with mock.patch.object(
+        Projection, "load_file", wraps=Projection.load_file
+    ) as load_file:
+        first = projections.get("projection_1")
+        second = projections.get("projection_1")
+
+    # Assert
+    assert load_file.call_count == 1
+    assert first == second
+
+
+def test_get_returns_copies(projections: DbsProjection):
+    # Act
+    first = projections.get("projection_1")
+    first.physical_projection.rainfall_multiplier = 3.0
+
+    # Assert
+    assert (
+        projections.get("projection_1").physical_projection.rainfall_multiplier == 1.5
+    )
+
+
+def test_get_reloads_changed_file(projections: DbsProjection):
+    # Arrange
+    projection = projections.get("projection_1")
+    projection.description = "changed outside of the database"
+    toml_path = projections.input_path / "projection_1" / "projection_1.toml"
+    stat = toml_path.stat()
+    projection.save(toml_path)
+    os.utime(toml_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    # Act
+    reloaded = projections.get("projection_1")
+
+    # Assert
+    assert reloaded.description == "changed outside of the database"
+
+
+def test_save_and_delete_invalidate_cache(projections: DbsProjection):
+    # Arrange
+    projection = projections.get("projection_1")
+    projection.physical_projection.rainfall_multiplier = 2.0
+
+    # Act
+    with mock.patch.object(
+        Projection, "load_file", wraps=Projection.load_file
+    ) as load_file:
+        projections.save(projection, overwrite=True)
+        saved = projections.get("projection_1")
+
+    # Assert
+    assert load_file.call_count == 1
+    assert saved.physical_projection.rainfall_multiplier == 2.0
+    projections.delete("projection_1")
+    assert not projections._cache
+
+
+def test_get_many_keeps_order(projections: DbsProjection):
+    # Arrange
+    for i in range(2, 6):
+        projections.copy("projection_1", f"projection_{i}", f"copy {i}")
+    names = ["projection_4", "projection_1", "projection_5", "projection_2"]
+
+    # Act
+    objects = projections.get_many(names)
+
+    # Assert
+    assert [obj.name for obj in objects] == names
+    assert sorted(obj.name for obj in projections.get_all()) == [
+        f"projection_{i}" for i in range(1, 6)
+    ]
+
+
+def test_get_many_missing_object(projections: DbsProjection):
+    # Act & Assert
+    with pytest.raises(DoesNotExistError):
+        projections.get_many(["projection_1", "projection_2"])
+
+
+@pytest.fixture()
+def database(tmp_path: Path) -> mock.Mock:
+    database = mock.Mock(
+        base_path=tmp_path,
+        input_path=tmp_path / "input",
+        output_path=tmp_path / "output",
+    )
+    database.scenarios = DbsScenario(database)
+    database.events = DbsEvent(database)
+    database.benefits = DbsBenefit(database)
+    for dbs in [database.scenarios, database.events, database.benefits]:
+        dbs.input_path.mkdir(parents=True)
+
+    for name, event, strategy in [
+        ("scn_1", "event_1", "no_measures"),
+        ("scn_2", "event_1", "strategy_1"),
+        ("scn_3", "event_2", "no_measures"),
+        # same components as scn_1, the benefit uses the first one
+        ("scn_4", "event_1", "no_measures"),
+    ]:
+        database.scenarios.save(
+            Scenario(name=name, event=event, projection="current", strategy=strategy)
+        )
+    benefit = Benefit(
+        name="benefit_1",
+        event_set="event_1",
+        projection="current",
+        future_year=2050,
+        current_situation=CurrentSituationModel(projection="current", year=2020),
+        strategy="strategy_1",
+        baseline_strategy="no_measures",
+        discount_rate=0.03,
+    )
+    benefit_path = database.benefits.input_path / benefit.name
+    benefit_path.mkdir()
+    benefit.save(benefit_path / f"{benefit.name}.toml")
+    return database
+
+
+def test_get_dependents(database: mock.Mock):
+    # Act
+    dependents = database.scenarios.get_dependents("event")
+
+    # Assert
+    assert {event: sorted(names) for event, names in dependents.items()} == {
+        "event_1": ["scn_1", "scn_2", "scn_4"],
+        "event_2": ["scn_3"],
+    }
+    assert sorted(database.events.check_higher_level_usage("event_1")) == [
+        "scn_1",
+        "scn_2",
+        "scn_4",
+    ]
+    assert database.events.check_higher_level_usage("event_3") == []
+
+
+def test_summaries_only_contain_public_columns(database: mock.Mock):
+    # Act
+    benefits = database.benefits.summarize_objects()
+    scenarios = database.scenarios.summarize_objects()
+
+    # Assert
+    assert list(benefits) == ["name", "description", "path", "last_modification_date"]
+    assert list(scenarios) == [
+        "name",
+        "description",
+        "path",
+        "last_modification_date",
+        "Projection",
+        "Event",
+        "Strategy",
+        "finished",
+    ]
+
+
+def test_scenario_usage_in_benefits(database: mock.Mock):
+    # Arrange
+    scenarios = database.scenarios
+    first = next(
+        name
+        for name in scenarios.summarize_objects()["name"]
+        if name in ["scn_1", "scn_4"]
+    )
+
+    # Act & Assert
+    # the current and future scenarios have the same projection, so every used scenario is used twice
+    assert scenarios.check_higher_level_usage(first) == ["benefit_1"] * 2
+    assert scenarios.check_higher_level_usage("scn_2") == ["benefit_1"] * 2
+    assert scenarios.check_higher_level_usage("scn_3") == []
+    assert (
+        scenarios.check_higher_level_usage("scn_4" if first == "scn_1" else "scn_1")
+        == []
+    )
+
+
+def test_scenario_delete_waits_for_cleanup(database: mock.Mock):
+    # Arrange
+    output_path = database.scenarios.output_path / "scn_3"
+    output_path.mkdir(parents=True)
+    # the background cleanup must be done before the output is removed
+    database.wait_for_cleanup.reset_mock()
+    database.wait_for_cleanup.side_effect = lambda: _assert_exists(output_path)
+
+    # Act
+    database.scenarios.delete("scn_3")
+
+    # Assert
+    database.wait_for_cleanup.assert_called_once()
+    database.hazard_store.release.assert_called_once_with("scn_3")
+    database.hazard_samples.release.assert_called_once_with("scn_3")
+    assert not output_path.exists()
+
+
+def _assert_exists(path: Path):
+    assert path.exists()
+
+
+def test_event_delete_removes_offshore_cache(database: mock.Mock):
+    # Arrange
+    event_path = database.events.input_path / "event_3" / "event_3.toml"
+    event_path.parent.mkdir()
+    event_path.write_text("")
+    cache_path = database.output_path / "offshore" / "event_3" / "key.csv"
+    cache_path.parent.mkdir(parents=True)
+    cache_path.write_text("")
+    other_cache_path = database.output_path / "offshore" / "event_1" / "key.csv"
+    other_cache_path.parent.mkdir(parents=True)
+    other_cache_path.write_text("")
+
+    # Act
+    database.events.delete("event_3")
+
+    # Assert
+    assert not cache_path.parent.exists()
+    assert other_cache_path.exists()
+
+
+def test_impact_key_changes_with_impact_components(tmp_path: Path):
+    # Arrange
+    database = mock.Mock(
+        base_path=tmp_path,
+        input_path=tmp_path / "input",
+        output_path=tmp_path / "output",
+        static_path=tmp_path / "static",
+    )
+    projection = Projection(
+        name="projection_1",
+        physical_projection=PhysicalProjection(),
+        socio_economic_change=SocioEconomicChange(economic_growth=1.0),
+    )
+    database.projections.get.return_value = projection
+    exposure_path = tmp_path / "static" / "templates" / "fiat" / "exposure.csv"
+    exposure_path.parent.mkdir(parents=True)
+    exposure_path.write_text("object_id,max_damage\n1,100\n")
+    scenarios = DbsScenario(database)
+    scenario = Scenario(
+        name="scn_1", event="event_1", projection="projection_1", strategy="s"
+    )
+
+    with mock.patch.object(DbsScenario, "hazard_key", return_value="hazard"):
+        key = scenarios.impact_key(scenario)
+
+        # Act
+        projection.socio_economic_change.economic_growth = 2.0
+        projection_key = scenarios.impact_key(scenario)
+        projection.socio_economic_change.economic_growth = 1.0
+        exposure_path.write_text("object_id,max_damage\n1,200\n")
+        template_key = scenarios.impact_key(scenario)
+
+    # Assert
+    assert len({key, projection_key, template_key}) == 3
+
+
+@pytest.mark.parametrize("requires_offshore_run", [True, False])
+def test_hazard_key_changes_with_hazard_templates(
+    tmp_path: Path, requires_offshore_run: bool
+):
+    # Arrange
+    database = mock.Mock(
+        base_path=tmp_path,
+        input_path=tmp_path / "input",
+        output_path=tmp_path / "output",
+        static_path=tmp_path / "static",
+    )
+    database.projections.get.return_value = Projection(
+        name="projection_1",
+        physical_projection=PhysicalProjection(),
+        socio_economic_change=SocioEconomicChange(),
+    )
+    database.strategies.get.return_value.get_hazard_strategy.return_value.get_measures.return_value = []
+    database.site.sfincs.config.overland_model.name = "overland"
+    database.site.sfincs.config.offshore_model.name = "offshore"
+    templates_path = tmp_path / "static" / "templates"
+    for model in ["overland", "offshore"]:
+        (templates_path / model).mkdir(parents=True)
+        (templates_path / model / "sfincs.inp").write_text("mmax = 10\n")
+    scenarios = DbsScenario(database)
+    scenario = Scenario(
+        name="scn_1", event="event_1", projection="projection_1", strategy="s"
+    )
+
+    with (
+        mock.patch.object(DbsScenario, "_event_fingerprint", return_value={}),
+        mock.patch.object(
+            OffshoreSfincsHandler,
+            "requires_offshore_run",
+            return_value=requires_offshore_run,
+        ),
+    ):
+        key = scenarios.hazard_key(scenario)
+
+        # Act
+        (templates_path / "offshore" / "sfincs.inp").write_text("mmax = 200\n")
+        offshore_key = scenarios.hazard_key(scenario)
+        (templates_path / "overland" / "sfincs.inp").write_text("mmax = 200\n")
+        overland_key = scenarios.hazard_key(scenario)
+
+    # Assert
+    assert (key != offshore_key) == requires_offshore_run
+    assert offshore_key != overland_key
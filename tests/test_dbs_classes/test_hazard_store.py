@@ -0,0 +1,103 @@
+from pathlib import Path
+
+import pytest
+
+from flood_adapt.dbs_classes.hazard_store import HazardStore
+
+
+@pytest.fixture()
+def flooding_path(tmp_path: Path) -> Path:
+    flooding = tmp_path / "scenarios" / "scn_1" / "Flooding"
+    (flooding / "simulations" / "overland").mkdir(parents=True)
+    (flooding / "simulations" / "overland" / "sfincs_map.nc").write_text("simulation")
+    (flooding / "FloodMap_scn_1.tif").write_text("floodmap")
+    (flooding / "max_water_level_map.nc").write_text("water levels")
+    return flooding
+
+
+def test_add_stores_results_without_simulations(tmp_path: Path, flooding_path: Path):
+    # Arrange
+    store = HazardStore(tmp_path / "hazards")
+
+    # Act
+    store.add("key", flooding_path)
+
+    # Assert
+    assert store.contains("key")
+    assert not store.contains("other_key")
+    stored = store.get_path("key")
+    assert (stored / "FloodMap_scn_1.tif").samefile(
+        flooding_path / "FloodMap_scn_1.tif"
+    )
+    assert not (stored / "simulations").exists()
+
+
+def test_link_exposes_results_in_scenario(tmp_path: Path, flooding_path: Path):
+    # Arrange
+    store = HazardStore(tmp_path / "hazards")
+    store.add("key", flooding_path)
+    new_flooding_path = tmp_path / "scenarios" / "scn_2" / "Flooding"
+
+    # Act
+    store.link("key", new_flooding_path)
+
+    # Assert
+    assert sorted(p.name for p in new_flooding_path.iterdir()) == [
+        "FloodMap_scn_1.tif",
+        "max_water_level_map.nc",
+    ]
+    assert (new_flooding_path / "max_water_level_map.nc").read_text() == "water levels"
+
+
+def test_add_existing_key_keeps_stored_results(tmp_path: Path, flooding_path: Path):
+    # Arrange
+    store = HazardStore(tmp_path / "hazards")
+    store.add("key", flooding_path)
+    other_flooding_path = tmp_path / "other"
+    other_flooding_path.mkdir()
+    (other_flooding_path / "other.tif").write_text("other")
+
+    # Act
+    store.add("key", other_flooding_path)
+
+    # Assert
+    assert not (store.get_path("key") / "other.tif").exists()
+
+
+def test_link_unknown_key_raises(tmp_path: Path):
+    store = HazardStore(tmp_path / "hazards")
+
+    with pytest.raises(ValueError, match="No hazard results stored"):
+        store.link("key", tmp_path / "Flooding")
+
+
+def test_unreferenced_results_are_evicted(tmp_path: Path, flooding_path: Path):
+    # Arrange
+    store = HazardStore(tmp_path / "hazards")
+    store.add("key", flooding_path, owner="scn_1")
+    store.link("key", tmp_path / "scenarios" / "scn_2" / "Flooding", owner="scn_2")
+    store.add("other_key", flooding_path, owner="scn_3")
+
+    # Act & Assert
+    store.release("scn_1")
+    assert store.contains("key")
+    store.prune(["scn_1", "scn_3"])
+    assert not store.contains("key")
+    assert store.contains("other_key")
+    # the results of the scenarios that linked them are kept
+    assert (flooding_path / "FloodMap_scn_1.tif").read_text() == "floodmap"
+
+
+def test_rerun_with_other_hazard_evicts_previous_results(
+    tmp_path: Path, flooding_path: Path
+):
+    # Arrange
+    store = HazardStore(tmp_path / "hazards")
+    store.add("key", flooding_path, owner="scn_1")
+
+    # Act
+    store.add("other_key", flooding_path, owner="scn_1")
+
+    # Assert
+    assert not store.get_path("key").exists()
+    assert store.contains("other_key")
@@ -0,0 +1,114 @@
+import os
+from pathlib import Path
+from unittest import mock
+
+import pytest
+import tomli_w
+
+from flood_adapt.dbs_classes import object_index
+from flood_adapt.dbs_classes.object_index import ObjectIndex
+
+FIELDS = ["name", "description", "event"]
+
+
+def write_object(input_path: Path, name: str, **fields) -> Path:
+    toml_path = input_path / name / f"{name}.toml"
+    toml_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(toml_path, "wb") as f:
+        tomli_w.dump({"name": name, **fields}, f)
+    return toml_path
+
+
+@pytest.fixture()
+def input_path(tmp_path: Path) -> Path:
+    path = tmp_path / "input" / "scenarios"
+    write_object(path, "scn_1", description="first", event="event_1")
+    write_object(path, "scn_2", event="event_2")
+    # a folder without a toml file is not an object
+    (path / "broken").mkdir()
+    return path
+
+
+def test_get_summaries(tmp_path: Path, input_path: Path):
+    # Arrange
+    index = ObjectIndex(tmp_path / "object_index.sqlite")
+
+    # Act
+    summaries = index.get_summaries("scenarios", input_path, FIELDS)
+
+    # Assert
+    fields = {values["name"]: values for _, _, values in summaries}
+    assert fields == {
+        "scn_1": {"name": "scn_1", "description": "first", "event": "event_1"},
+        "scn_2": {"name": "scn_2", "description": "", "event": "event_2"},
+    }
+    assert sorted(path.name for path, _, _ in summaries) == [
+        "scn_1.toml",
+        "scn_2.toml",
+    ]
+
+
+def test_get_summaries_only_parses_changed_files(tmp_path: Path, input_path: Path):
+    # Arrange
+    index = ObjectIndex(tmp_path / "object_index.sqlite")
+    index.get_summaries("scenarios", input_path, FIELDS)
+    toml_path = write_object(input_path, "scn_2", event="event_3")
+    stat = toml_path.stat()
+    os.utime(toml_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    # Act
+    with mock.patch.object(
+        object_index, "_read_fields", wraps=object_index._read_fields
+    ) as read_fields:
+        summaries = index.get_summaries("scenarios", input_path, FIELDS)
+
+    # Assert
+    assert read_fields.call_count == 1
+    assert read_fields.call_args.args[0] == toml_path
+    events = {values["name"]: values["event"] for _, _, values in summaries}
+    assert events == {"scn_1": "event_1", "scn_2": "event_3"}
+
+
+def test_removed_objects_are_not_listed(tmp_path: Path, input_path: Path):
+    # Arrange
+    index = ObjectIndex(tmp_path / "object_index.sqlite")
+    index.get_summaries("scenarios", input_path, FIELDS)
+
+    # Act
+    (input_path / "scn_1" / "scn_1.toml").unlink()
+    index.remove("scenarios", "scn_1")
+    summaries = index.get_summaries("scenarios", input_path, FIELDS)
+
+    # Assert
+    assert [values["name"] for _, _, values in summaries] == ["scn_2"]
+
+
+def test_update_indexes_saved_object(tmp_path: Path, input_path: Path):
+    # Arrange
+    index = ObjectIndex(tmp_path / "object_index.sqlite")
+    toml_path = write_object(input_path, "scn_3", event="event_3")
+
+    # Act
+    index.update("scenarios", toml_path, FIELDS)
+    with mock.patch.object(
+        object_index, "_read_fields", wraps=object_index._read_fields
+    ) as read_fields:
+        summaries = index.get_summaries("scenarios", input_path, FIELDS)
+
+    # Assert
+    # only the objects that existed before the index was used are parsed
+    assert read_fields.call_count == 2
+    assert "scn_3" in [values["name"] for _, _, values in summaries]
+
+
+def test_unusable_index_falls_back_to_parsing(tmp_path: Path, input_path: Path):
+    # Arrange
+    index_path = tmp_path / "object_index.sqlite"
+    index_path.mkdir()
+    index = ObjectIndex(index_path)
+
+    # Act
+    summaries = index.get_summaries("scenarios", input_path, FIELDS)
+
+    # Assert
+    assert len(summaries) == 2
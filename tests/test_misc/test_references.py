@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from flood_adapt.misc.references import ReferenceCounter
+
+
+class _Store:
+    def __init__(self, path: Path):
+        self.path = path
+        self.evicted: list[set[str]] = []
+        self.references = ReferenceCounter(path / "references", self.evicted.append)
+
+
+def test_release_keeps_keys_referenced_by_other_owners(tmp_path: Path):
+    # Arrange
+    store = _Store(tmp_path)
+    store.references.set_reference("scn1", "a")
+    store.references.set_reference("scn2", "a")
+    store.references.set_reference("scn2", "b", name="output")
+
+    # Act
+    store.references.release("scn2")
+
+    # Assert
+    assert store.references.referenced() == {"a"}
+    assert store.evicted == [{"a"}]
+
+
+def test_set_other_key_evicts_previous_key(tmp_path: Path):
+    # Arrange
+    store = _Store(tmp_path)
+    store.references.set_reference("scn1", "a", name="output")
+
+    # Act
+    store.references.set_reference("scn1", "a", name="output")
+    store.references.set_reference("scn1", "b", name="output")
+
+    # Assert
+    assert store.evicted == [{"b"}]
+
+
+def test_prune_removes_references_of_missing_owners(tmp_path: Path):
+    # Arrange
+    store = _Store(tmp_path)
+    store.references.set_reference("scn1", "a")
+    store.references.set_reference("scn2", "b")
+    store.references.set_reference("scn3", "c", name="output")
+
+    # Act
+    store.references.prune(["scn1"])
+
+    # Assert
+    assert store.references.referenced() == {"a"}
+    assert store.evicted == [{"a"}]
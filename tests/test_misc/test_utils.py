@@ -2,7 +2,7 @@ from unittest import mock
 
 import pytest
 
-from flood_adapt.misc.utils import save_file_to_database
+from flood_adapt.misc.utils import link_or_copy, save_file_to_database
 
 
 @pytest.fixture
@@ -56,3 +56,61 @@ class TestSaveFileToDatabase:
                 f"Failed to save external file to the database {not_exists_src_file} as it does not exist."
                 in str(excinfo.value)
             )
+
+
+class TestLinkOrCopy:
+    def test_link_or_copy_creates_hard_link(self, tmp_path):
+        # Arrange
+        src_file = tmp_path / "source.txt"
+        src_file.write_text("test content")
+        dst_file = tmp_path / "destination.txt"
+
+        # Act
+        link_or_copy(src_file, dst_file)
+
+        # Assert
+        assert dst_file.samefile(src_file)
+
+    def test_link_or_copy_replaces_existing_file(self, tmp_path):
+        # Arrange
+        src_file = tmp_path / "source.txt"
+        src_file.write_text("test content")
+        dst_file = tmp_path / "destination.txt"
+        dst_file.write_text("old content")
+
+        # Act
+        link_or_copy(src_file, dst_file)
+
+        # Assert
+        assert dst_file.read_text() == "test content"
+
+    def test_link_or_copy_falls_back_to_copy(self, tmp_path):
+        # Arrange
+        src_file = tmp_path / "source.txt"
+        src_file.write_text("test content")
+        dst_file = tmp_path / "destination.txt"
+
+        # Act
+        with mock.patch("os.link", side_effect=OSError("not supported")):
+            link_or_copy(src_file, dst_file)
+
+        # Assert
+        assert dst_file.read_text() == "test content"
+        assert not dst_file.samefile(src_file)
+
+    def test_link_or_copy_warns_once_about_copy_fallback(self, tmp_path):
+        # Arrange
+        src_file = tmp_path / "source.txt"
+        src_file.write_text("test content")
+
+        # Act
+        with (
+            mock.patch("os.link", side_effect=OSError("not supported")),
+            mock.patch("flood_adapt.misc.utils._warned_copy_fallback", False),
+            mock.patch("flood_adapt.misc.utils.logger") as logger,
+        ):
+            link_or_copy(src_file, tmp_path / "destination_1.txt")
+            link_or_copy(src_file, tmp_path / "destination_2.txt")
+
+        # Assert
+        logger.warning.assert_called_once()
@@ -1,3 +1,5 @@
+from unittest import mock
+
 import pandas as pd
 import pytest
 
@@ -94,3 +96,86 @@ class TestOffshoreSfincsHandler:
 
         # Assert
         assert isinstance(wl_df, pd.DataFrame)
+
+
+class TestOffshoreCache:
+    def test_cache_key_ignores_strategy_and_socio_economic_change(
+        self, setup_offshore_scenario: tuple[IDatabase, Scenario, HistoricalEvent]
+    ):
+        # Arrange
+        _, scenario, event = setup_offshore_scenario
+        other = scenario.model_copy(
+            update={
+                "name": "other",
+                "projection": "pop_growth_new_20",
+                "strategy": "strategy_comb",
+            }
+        )
+
+        # Act
+        key = OffshoreSfincsHandler(scenario=scenario, event=event).get_cache_key()
+        other_key = OffshoreSfincsHandler(scenario=other, event=event).get_cache_key()
+
+        # Assert
+        assert key == other_key
+
+    def test_cache_key_changes_with_sea_level_rise(
+        self, setup_offshore_scenario: tuple[IDatabase, Scenario, HistoricalEvent]
+    ):
+        # Arrange
+        _, scenario, event = setup_offshore_scenario
+        other = scenario.model_copy(
+            update={"name": "other", "projection": "all_projections"}
+        )
+
+        # Act
+        key = OffshoreSfincsHandler(scenario=scenario, event=event).get_cache_key()
+        other_key = OffshoreSfincsHandler(scenario=other, event=event).get_cache_key()
+
+        # Assert
+        assert key != other_key
+
+    def test_get_resulting_waterlevels_reads_cache_without_running(
+        self, setup_offshore_scenario: tuple[IDatabase, Scenario, HistoricalEvent]
+    ):
+        # Arrange
+        _, scenario, event = setup_offshore_scenario
+        handler = OffshoreSfincsHandler(scenario=scenario, event=event)
+        cached = pd.DataFrame(
+            data={1: [0.1, 0.2], 2: [0.3, 0.4]},
+            index=pd.date_range("2021-01-01", periods=2, freq="10min"),
+        )
+        handler._write_cached_waterlevels(cached, handler._get_cache_path())
+
+        # Act
+        with mock.patch.object(OffshoreSfincsHandler, "run_offshore") as run_offshore:
+            wl_df = handler.get_resulting_waterlevels()
+
+        # Assert
+        run_offshore.assert_not_called()
+        pd.testing.assert_frame_equal(wl_df, cached, check_freq=False)
+
+    def test_cache_key_changes_with_template_model(self, tmp_path):
+        # Arrange
+        handler = object.__new__(OffshoreSfincsHandler)
+        handler._database_instance = mock.Mock(output_path=tmp_path / "output")
+        handler._database_instance.site.sfincs.config.offshore_model = None
+        handler._database_instance.projections.get.return_value.physical_projection.sea_level_rise.convert.return_value = 0.0
+        handler.scenario = Scenario(
+            name="scn", event="event", projection="current", strategy="no_measures"
+        )
+        handler.event = HistoricalEvent(
+            name="event", time=TimeFrame(), forcings={}, mode="single_event"
+        )
+        handler.template_path = tmp_path / "offshore"
+        handler.template_path.mkdir()
+        (handler.template_path / "sfincs.bnd").write_text("0 0\n")
+        key = handler.get_cache_key()
+
+        # Act
+        (handler.template_path / "sfincs.bnd").write_text("0 0\n1 1\n")
+        other_key = handler.get_cache_key()
+
+        # Assert
+        assert key != other_key
+        assert handler._get_cache_path().parent.name == "event"